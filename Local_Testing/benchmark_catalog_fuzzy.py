@@ -0,0 +1,107 @@
+"""
+Catalog Fuzzy Match Benchmark
+Compares ProductCatalog.search_fuzzy (trigram index + edit distance) with
+the previous SequenceMatcher scan over the first 100 candidate models:
+top-1 typo-correction accuracy and per-query latency.
+
+Queries are real model numbers with one or two typos (swapped neighbours,
+wrong / missing / extra character, missing separator).
+
+Usage:
+    python Local_Testing/benchmark_catalog_fuzzy.py
+    python Local_Testing/benchmark_catalog_fuzzy.py --synthetic 57000   # 10x catalog
+    python Local_Testing/benchmark_catalog_fuzzy.py --queries 1000 --typos 2
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.product_catalog import ProductCatalog, JSON_MANIFEST_PATH, FUZZY_MATCH_THRESHOLD
+from benchmark_catalog_prefix import build_synthetic_catalog
+
+
+def scan_fuzzy(catalog, query, threshold=FUZZY_MATCH_THRESHOLD, limit=10, max_candidates=100):
+    """The previous search_fuzzy implementation."""
+    normalized = query.strip().upper()
+    prefix = normalized[:3]
+    relevant_models = [m for m in catalog.all_model_numbers if m.startswith(prefix)]
+    if len(relevant_models) < max_candidates:
+        relevant_models = catalog.all_model_numbers[:max_candidates * 2]
+    candidates = []
+    for model_no in relevant_models[:max_candidates]:
+        ratio = SequenceMatcher(None, normalized, model_no).ratio()
+        if ratio >= threshold:
+            candidates.append((catalog.model_index[model_no], ratio))
+    candidates.sort(key=lambda x: x[1], reverse=True)
+    return candidates[:limit]
+
+
+def add_typo(model_no, rng):
+    chars = list(model_no)
+    i = rng.randrange(len(chars) - 1)
+    kind = rng.choice(["swap", "replace", "delete", "insert", "separator"])
+    if kind == "swap":
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    elif kind == "replace":
+        chars[i] = rng.choice("0123456789ABCDEFGHJKLMNPRSTVW")
+    elif kind == "delete":
+        del chars[i]
+    elif kind == "insert":
+        chars.insert(i, rng.choice("0123456789"))
+    else:
+        chars = [c for c in chars if c not in ".-"] or chars
+    return "".join(chars)
+
+
+def run(name, fn, queries, catalog):
+    latencies, correct = [], 0
+    for query, expected in queries:
+        start = time.perf_counter()
+        results = fn(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        # A hit if the intended model (or a same-text variant) ranks first
+        if results and results[0][0]["model_no"].replace(".", "").replace("-", "") == expected.replace(".", "").replace("-", ""):
+            correct += 1
+    latencies.sort()
+    print(f"{name:<28} {correct / len(queries):>9.1%} {statistics.mean(latencies):>10.3f} "
+          f"{latencies[int(len(latencies) * 0.95)]:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fuzzy model-number matching")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use a synthetic catalog of this size")
+    parser.add_argument("--queries", type=int, default=300, help="Number of typo queries")
+    parser.add_argument("--typos", type=int, default=1, help="Typos per query")
+    args = parser.parse_args()
+
+    if not args.synthetic and os.path.exists(JSON_MANIFEST_PATH):
+        catalog = ProductCatalog()
+        catalog.load_from_json(JSON_MANIFEST_PATH)
+    else:
+        catalog = build_synthetic_catalog(args.synthetic or 5687)
+
+    rng = random.Random(3)
+    models = [m for m in catalog.model_index if len(m) >= 6]
+    queries = []
+    for model_no in rng.sample(models, min(args.queries, len(models))):
+        query = model_no
+        for _ in range(args.typos):
+            query = add_typo(query, rng)
+        queries.append((query, model_no))
+
+    print(f"\nCatalog: {len(catalog.model_index)} models, {len(queries)} queries, {args.typos} typo(s) each\n")
+    print(f"{'matcher':<28} {'top-1':>9} {'mean ms':>10} {'p95 ms':>10}")
+    print("-" * 60)
+    run("SequenceMatcher scan (old)", lambda q: scan_fuzzy(catalog, q), queries, catalog)
+    run("trigram index (new)", lambda q: catalog.search_fuzzy(q), queries, catalog)
+
+
+if __name__ == "__main__":
+    main()
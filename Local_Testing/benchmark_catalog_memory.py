@@ -0,0 +1,204 @@
+"""
+Catalog Memory Benchmark
+Loads the product catalog twice, each in a fresh subprocess:
+
+- dicts:    one Python dict per product (the previous layout)
+- columnar: ProductStore columns + ProductRow views (current layout)
+
+and reports the RSS growth of the load plus lookup latency
+(search_exact_model followed by reading the fields _format_product_summary uses).
+
+Uses data/metadata_manifest.json when present, otherwise writes a synthetic
+manifest with realistic field contents to a temp file.
+
+Usage:
+    python Local_Testing/benchmark_catalog_memory.py
+    python Local_Testing/benchmark_catalog_memory.py --synthetic 57000
+"""
+
+import argparse
+import ctypes
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.product_catalog import CatalogIndexes, ProductCatalog, JSON_MANIFEST_PATH, FINISH_CODE_MAP
+
+# Fields read by product_catalog_tool._format_product_summary(include_details=True)
+SUMMARY_FIELDS = [
+    "model_no", "group_number", "title", "category", "sub_category", "collection",
+    "finish_code", "finish_name", "list_price", "is_active", "is_spare_part",
+    "description", "features", "map_price", "flow_rate_gpm", "height_inches",
+    "length_inches", "width_inches", "weight_lbs", "holes_needed", "is_touch_capable",
+    "warranty", "product_url", "image_url", "spec_sheet_url", "install_manual_url",
+    "parts_diagram_url", "install_video_url",
+]
+
+
+class DictIndexes(CatalogIndexes):
+    """Catalog generation that keeps the normalized dicts, as before the columnar store."""
+
+    def _build_store(self, records):
+        return records
+
+
+class DictCatalog(ProductCatalog):
+    def _build_indexes(self, records, version):
+        return DictIndexes(records, version)
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def release_free_memory() -> None:
+    """Hand freed heap pages back to the OS (glibc) so RSS shows what the catalog keeps."""
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def write_synthetic_manifest(size: int, seed: int = 11) -> str:
+    rng = random.Random(seed)
+    words = ("single handle lavatory faucet thermostatic valve trim kit shower head "
+             "pressure balance ceramic cartridge solid brass construction matching drain").split()
+    categories = ["Showering", "Bathing", "Sink Faucets", "Kitchen", "Bath Accessories", "Spare Parts"]
+    collections = ["Serie 100", "Serie 196", "Serie 243", "Universal Fixtures", "Cascade", "Dorsett"]
+    finishes = list(FINISH_CODE_MAP.items())[:10]
+
+    items = []
+    while len(items) < size:
+        group = f"{rng.choice(['100', '160', 'HS', 'PBV', 'TVH'])}.{rng.randint(1000, 9999)}"
+        for code, name in rng.sample(finishes, rng.randint(1, 5)):
+            model = f"{group}{code}"
+            base = f"https://www.flussofaucets.com/{model.lower()}"
+            meta = {
+                "Model_NO": model,
+                "Common_Group_Number": group,
+                "Main_Model_Number": group,
+                "Item_UPC_Number": str(rng.randint(10 ** 11, 10 ** 12)),
+                "Product_Title": " ".join(rng.choices(words, k=8)).title(),
+                "Description": " ".join(rng.choices(words, k=60)),
+                "Keywords": ", ".join(rng.choices(words, k=10)),
+                "Product_Category": rng.choice(categories),
+                "Sub_Product_Category": rng.choice(["Trim", "Valve", "Accessory"]),
+                "Sub_Sub_Product_Category": "",
+                "Collection": rng.choice(collections),
+                "Style": rng.choice(["Modern", "Transitional", "Traditional"]),
+                "Finish": name,
+                "List_Price": round(rng.uniform(20, 3000), 2),
+                "MAP_Price": round(rng.uniform(20, 3000), 2),
+                "CAD_List_Price": round(rng.uniform(20, 3000), 2),
+                "Flow_Rate_GPM": rng.choice([1.2, 1.5, 1.8, 2.0]),
+                "Holes_Needed_For_Installation": rng.randint(1, 3),
+                "Product_Height_Inches": round(rng.uniform(2, 40), 2),
+                "Product_Length_Inches": round(rng.uniform(2, 40), 2),
+                "Product_Width_Inches": round(rng.uniform(2, 40), 2),
+                "Package_Weight_lbs": round(rng.uniform(1, 30), 2),
+                "IS_Touch_Capable": "FALSE",
+                "Product_Status": "Active",
+                "Is_Spare_Part": "TRUE" if rng.random() < 0.2 else "FALSE",
+                "Is_Special_Finish": "FALSE",
+                "Display_On_Website": "YES",
+                "Can_Sell_Online": "YES",
+                "product_url": base,
+                "Image_URL": f"{base}.jpg",
+                "Collection_URL": "https://www.flussofaucets.com/collections",
+                "Spec_Sheet_Full_URL": f"{base}-spec.pdf",
+                "Installation_manual_Full_URL": f"{base}-install.pdf",
+                "Part_Diagram_Full_URL": f"{base}-parts.pdf",
+                "Spec_Sheet_File_Name": f"{model}-spec.pdf",
+                "Installation_Manual_File_Name": f"{model}-install.pdf",
+                "Parts_Diagram_File_Name": f"{model}-parts.pdf",
+                "Installation_video_Link": "",
+                "Operational_Video_Link": "",
+                "Lifestyle_Video_Link": "",
+                "Warranty": "Limited Lifetime",
+                "Popularity": rng.randint(0, 1000),
+            }
+            for i in range(1, 7):
+                meta[f"Description Bullet {i}"] = " ".join(rng.choices(words, k=7))
+            items.append({"metadata": meta})
+
+    fd, path = tempfile.mkstemp(suffix=".json", prefix="catalog_bench_")
+    with os.fdopen(fd, "w") as f:
+        json.dump(items, f)
+    return path
+
+
+def worker(mode: str, path: str) -> None:
+    """Load the catalog in one layout and print RSS growth and lookup latency as JSON."""
+    gc.collect()
+    before = rss_bytes()
+    catalog = DictCatalog() if mode == "dicts" else ProductCatalog()
+    catalog.load_from_json(path)
+    gc.collect()
+    release_free_memory()
+    after = rss_bytes()
+
+    rng = random.Random(5)
+    models = rng.choices(list(catalog.model_index), k=20000)
+    start = time.perf_counter()
+    for model_no in models:
+        product = catalog.search_exact_model(model_no)
+        for field in SUMMARY_FIELDS:
+            product[field]
+    lookup_us = (time.perf_counter() - start) / len(models) * 1e6
+
+    print(json.dumps({
+        "products": len(catalog.products),
+        "rss_mb": (after - before) / 1024 / 1024,
+        "lookup_us": lookup_us,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark catalog memory: dicts vs columnar store")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use a synthetic manifest of this size")
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    synthetic = None
+    if not args.synthetic and os.path.exists(JSON_MANIFEST_PATH):
+        path = JSON_MANIFEST_PATH
+    else:
+        path = synthetic = write_synthetic_manifest(args.synthetic or 5687)
+
+    try:
+        results = {}
+        for mode in ("dicts", "columnar"):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", mode, path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results[mode] = json.loads(out.strip().splitlines()[-1])
+    finally:
+        if synthetic:
+            os.unlink(synthetic)
+
+    print(f"\nCatalog: {results['columnar']['products']} products ({path})\n")
+    print(f"{'layout':<10} {'RSS growth (MB)':>16} {'lookup + 28 fields (us)':>25}")
+    print("-" * 53)
+    for mode, r in results.items():
+        print(f"{mode:<10} {r['rss_mb']:>16.1f} {r['lookup_us']:>25.2f}")
+
+
+if __name__ == "__main__":
+    main()
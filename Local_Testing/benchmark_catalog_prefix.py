@@ -0,0 +1,174 @@
+"""
+Catalog Prefix Index Benchmark
+Compares ProductCatalog prefix-style lookups (search_prefix, search_by_group
+fallbacks, get_related_parts, search_fuzzy candidates) against the linear
+scans they replaced, and checks both return identical results.
+
+Uses data/metadata_manifest.json when present, otherwise a synthetic catalog.
+
+Usage:
+    python Local_Testing/benchmark_catalog_prefix.py
+    python Local_Testing/benchmark_catalog_prefix.py --synthetic 50000
+    python Local_Testing/benchmark_catalog_prefix.py --repeat 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.product_catalog import CatalogIndexes, ProductCatalog, JSON_MANIFEST_PATH, FINISH_CODE_MAP
+
+
+# =============================================================================
+# CATALOG SETUP
+# =============================================================================
+
+def build_synthetic_catalog(size: int, seed: int = 7) -> ProductCatalog:
+    """Fill the catalog with `size` generated products (groups with finish variants + spare parts)."""
+    rng = random.Random(seed)
+    records = []
+    prefixes = ["100", "160", "HS", "PBV", "TVH", "DKM", "SR", "MBF", "TRM", "RP"]
+    finishes = list(FINISH_CODE_MAP)[:8]
+    while len(records) < size:
+        group = f"{rng.choice(prefixes)}.{rng.randint(1000, 9999)}"
+        is_part = rng.random() < 0.3
+        if is_part:
+            group = f"RP{rng.randint(10000, 99999)}"
+        for finish in rng.sample(finishes, rng.randint(1, 4)):
+            model_no = f"{group}-{finish}" if not is_part else f"{group}{finish}"
+            product = {
+                "model_no": model_no,
+                "group_number": group,
+                "title": f"Product {model_no}",
+                "keywords": "",
+                "category": "Spare Parts" if is_part else "Faucets",
+                "sub_category": "",
+                "collection": "",
+                "finish_code": finish,
+                "finish_name": FINISH_CODE_MAP[finish],
+                "features": [],
+                "is_spare_part": is_part,
+            }
+            records.append(product)
+
+    catalog = ProductCatalog()
+    catalog._swap(CatalogIndexes(records, version="synthetic"), "synthetic", time.time())
+    return catalog
+
+
+# =============================================================================
+# PREVIOUS LINEAR-SCAN IMPLEMENTATIONS
+# =============================================================================
+
+def scan_prefix(catalog, prefix, limit=10):
+    normalized = prefix.strip().upper()
+    matches = []
+    for model_no, product in catalog.model_index.items():
+        if model_no.startswith(normalized):
+            matches.append(product)
+            if len(matches) >= limit:
+                break
+    return matches
+
+
+def scan_group(catalog, group_no):
+    for variant in catalog._normalize_model_variants(group_no):
+        if variant in catalog.group_index:
+            return catalog.group_index[variant]
+    normalized = group_no.strip().upper()
+    matches = []
+    for group_key, products in catalog.group_index.items():
+        if group_key.startswith(normalized):
+            matches.extend(products)
+    if not matches:
+        no_sep = normalized.replace(".", "").replace("-", "").replace(" ", "")
+        for group_key, products in catalog.group_index.items():
+            group_no_sep = group_key.replace(".", "").replace("-", "")
+            if group_no_sep.startswith(no_sep) or no_sep.startswith(group_no_sep):
+                matches.extend(products)
+    return matches
+
+
+def scan_related_parts(catalog, model_no, limit=5):
+    product = catalog.model_index.get(model_no.strip().upper())
+    if not product:
+        return []
+    group = product["group_number"]
+    related = []
+    for part_model, part_product in catalog.model_index.items():
+        if part_product["is_spare_part"]:
+            if group in part_model or part_model.startswith(group[:7]):
+                related.append(part_product)
+                if len(related) >= limit:
+                    break
+    return related
+
+
+def scan_fuzzy_candidates(catalog, query):
+    prefix = query.strip().upper()[:3]
+    return list(dict.fromkeys(m for m in catalog.all_model_numbers if m.startswith(prefix)))
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def time_calls(fn, queries, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries:
+            fn(q)
+    return (time.perf_counter() - start) / (repeat * len(queries)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark catalog prefix indexes vs linear scans")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use a synthetic catalog of this size")
+    parser.add_argument("--repeat", type=int, default=200, help="Repetitions per query set")
+    args = parser.parse_args()
+
+    if not args.synthetic and os.path.exists(JSON_MANIFEST_PATH):
+        catalog = ProductCatalog()
+        catalog.load_from_json(JSON_MANIFEST_PATH)
+    else:
+        catalog = build_synthetic_catalog(args.synthetic or 6000)
+
+    rng = random.Random(1)
+    models = list(catalog.model_index)
+    groups = list(catalog.group_index)
+    sample_models = rng.sample(models, min(50, len(models)))
+    sample_groups = rng.sample(groups, min(50, len(groups)))
+
+    prefix_queries = [m[:rng.randint(2, len(m))] for m in sample_models] + ["ZZZ"]
+    group_queries = [g[:rng.randint(3, len(g))] for g in sample_groups]
+    group_queries += [g.replace(".", "") for g in sample_groups[:10]] + [g + "EXTRA" for g in sample_groups[:10]]
+
+    cases = [
+        ("search_prefix", prefix_queries,
+         lambda q: scan_prefix(catalog, q), lambda q: catalog.search_prefix(q)),
+        ("search_by_group", group_queries,
+         lambda q: scan_group(catalog, q), lambda q: catalog.search_by_group(q)),
+        ("get_related_parts", sample_models,
+         lambda q: scan_related_parts(catalog, q), lambda q: catalog.get_related_parts(q)),
+        ("search_fuzzy candidates", sample_models,
+         lambda q: scan_fuzzy_candidates(catalog, q), lambda q: catalog.model_prefix_index.starting_with(q.strip().upper()[:3])),
+    ]
+
+    print(f"\nCatalog: {len(catalog.products)} products, {len(groups)} groups\n")
+    print(f"{'lookup':<36} {'scan (us)':>11} {'index (us)':>11} {'speedup':>9}")
+    print("-" * 70)
+    for name, queries, old, new in cases:
+        for q in queries:
+            assert old(q) == new(q), f"{name}: results differ for {q!r}"
+        old_us = time_calls(old, queries, args.repeat)
+        new_us = time_calls(new, queries, args.repeat)
+        print(f"{name:<36} {old_us:>11.1f} {new_us:>11.1f} {old_us / new_us:>8.1f}x")
+    print("\nAll results identical.")
+
+
+if __name__ == "__main__":
+    main()
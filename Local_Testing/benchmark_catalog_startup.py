@@ -0,0 +1,137 @@
+"""
+Catalog Startup Benchmark
+Times init_product_catalog in fresh subprocesses (a cold start each):
+
+- json:     parse data/metadata_manifest.json, normalize, build every index
+- snapshot: map the prebuilt snapshot (incl. the manifest hash check)
+
+and checks that both catalogs answer a fixed set of searches identically.
+
+Uses data/metadata_manifest.json when present, otherwise a synthetic
+manifest (see benchmark_catalog_memory). The snapshot is built into a
+temp file, so data/catalog_snapshot.bin is left alone.
+
+Usage:
+    python Local_Testing/benchmark_catalog_startup.py
+    python Local_Testing/benchmark_catalog_startup.py --synthetic 57000 --runs 5
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.product_catalog import JSON_MANIFEST_PATH
+from benchmark_catalog_memory import rss_bytes, write_synthetic_manifest
+
+
+def answers_digest(catalog) -> str:
+    """Hash of the results of a fixed set of searches (exact, group, prefix, fuzzy, keyword, facets)."""
+    models = list(catalog.model_index)[::97]
+    results = []
+    for model_no in models:
+        product = catalog.search_exact_model(model_no)
+        results.append([product["model_no"], product["title"], product["list_price"], product["features"]])
+        results.append([p["model_no"] for p in catalog.search_by_group(product["group_number"])])
+        results.append([p["model_no"] for p in catalog.search_prefix(model_no[:4])])
+        results.append([(p["model_no"], s) for p, s in catalog.search_fuzzy(model_no[:-1] + "X")])
+        results.append([p["model_no"] for p in catalog.get_related_parts(model_no)])
+    for query in ("thermostatic valve", "shower head chrome", "lavatory faucet brass"):
+        results.append([p["model_no"] for p in catalog.search_keywords(query)])
+    for category in catalog.get_categories():
+        products, total = catalog.search_by_facets(category=category, is_spare_part=False)
+        results.append([total] + [p["model_no"] for p in products])
+    return hashlib.sha256(json.dumps(results, default=str).encode()).hexdigest()[:16]
+
+
+def worker(mode: str, manifest: str, snapshot: str) -> None:
+    """Cold-load the catalog one way and print timings as JSON."""
+    from app.services.product_catalog import get_product_catalog, init_product_catalog
+
+    before = rss_bytes()
+    start = time.perf_counter()
+    if mode == "snapshot":
+        ok = init_product_catalog(manifest, snapshot)
+    else:
+        ok = init_product_catalog(manifest, snapshot_path=os.devnull + ".missing")
+    init_ms = (time.perf_counter() - start) * 1000
+    catalog = get_product_catalog()
+    assert ok and catalog.stats["source"] == mode, catalog.stats
+
+    start = time.perf_counter()
+    catalog.search_keywords("thermostatic valve")
+    first_query_ms = (time.perf_counter() - start) * 1000
+
+    print(json.dumps({
+        "products": len(catalog.products),
+        "init_ms": init_ms,
+        "first_query_ms": first_query_ms,
+        "rss_mb": (rss_bytes() - before) / 1024 / 1024,
+        "digest": answers_digest(catalog),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark catalog cold start: JSON vs snapshot")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use a synthetic manifest of this size")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts per mode")
+    parser.add_argument("--worker", nargs=3, metavar=("MODE", "MANIFEST", "SNAPSHOT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    synthetic = None
+    if not args.synthetic and os.path.exists(JSON_MANIFEST_PATH):
+        manifest = JSON_MANIFEST_PATH
+    else:
+        manifest = synthetic = write_synthetic_manifest(args.synthetic or 5687)
+    fd, snapshot = tempfile.mkstemp(suffix=".bin", prefix="catalog_snapshot_")
+    os.close(fd)
+
+    try:
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "app.services.catalog_snapshot", "--manifest", manifest, "--output", snapshot],
+            check=True, capture_output=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        build_s = time.perf_counter() - start
+
+        results = {}
+        for mode in ("json", "snapshot"):
+            runs = []
+            for _ in range(args.runs):
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--worker", mode, manifest, snapshot],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                runs.append(json.loads(out.strip().splitlines()[-1]))
+            results[mode] = runs
+        snapshot_mb = os.path.getsize(snapshot) / 1024 / 1024
+    finally:
+        os.unlink(snapshot)
+        if synthetic:
+            os.unlink(synthetic)
+
+    print(f"\nCatalog: {results['json'][0]['products']} products ({manifest})")
+    print(f"Snapshot: {snapshot_mb:.1f} MB, built in {build_s:.1f}s\n")
+    print(f"{'path':<10} {'init ms (median)':>17} {'first query ms':>15} {'RSS MB':>8} {'answers':>18}")
+    print("-" * 72)
+    for mode, runs in results.items():
+        print(f"{mode:<10} {statistics.median(r['init_ms'] for r in runs):>17.1f} "
+              f"{statistics.median(r['first_query_ms'] for r in runs):>15.2f} "
+              f"{statistics.median(r['rss_mb'] for r in runs):>8.1f} {runs[0]['digest']:>18}")
+    same = len({r["digest"] for runs in results.values() for r in runs}) == 1
+    print(f"\nIdentical search results: {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+CLIP Backend Benchmark
+Compares the CLIPEmbedder backends on CPU (fp32 vs dynamically quantized
+int8) for accuracy and speed:
+
+- accuracy: cosine agreement of int8 vectors with fp32 ones on the same
+  images and query texts, and whether text-to-image top-1 matches agree
+- latency:  median ms for one image (a single-photo ticket) and one query text
+- throughput: images / s for a batch (embed_images)
+
+Images are paths given on the command line (use real product photos for
+the accuracy numbers that matter), or synthetic product-like drawings.
+
+Usage:
+    python Local_Testing/benchmark_clip_backends.py
+    python Local_Testing/benchmark_clip_backends.py --threads 4 --batch 16 --runs 5
+    python Local_Testing/benchmark_clip_backends.py data/images/*.jpg
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.clients.embeddings import CLIPEmbedder
+
+QUERIES = [
+    "matte black kitchen faucet with pull-down sprayer",
+    "chrome rain shower head",
+    "brushed nickel towel bar",
+    "wall mounted tub filler",
+    "thermostatic shower valve trim",
+    "satin brass single handle bathroom sink faucet",
+    "hand shower with hose",
+    "replacement cartridge",
+]
+COLORS = [(30, 30, 30), (200, 200, 205), (180, 150, 90), (150, 150, 140), (240, 240, 240)]
+
+
+def write_synthetic_images(count: int, directory: str, seed: int = 5) -> list:
+    """Simple fixture-like drawings (pipes, heads, handles) on plain backgrounds."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        image = Image.new("RGB", (640, 640), rng.choice([(255, 255, 255), (235, 232, 225)]))
+        draw = ImageDraw.Draw(image)
+        color = rng.choice(COLORS)
+        x = rng.randint(200, 440)
+        draw.rectangle([x - 20, rng.randint(60, 200), x + 20, 600], fill=color)
+        head = rng.randint(50, 150)
+        draw.ellipse([x - head, 40, x + head, 40 + head // 2], fill=color)
+        for _ in range(rng.randint(0, 2)):
+            y = rng.randint(300, 560)
+            draw.rectangle([x, y, x + rng.randint(60, 160), y + 18], fill=color)
+        path = os.path.join(directory, f"fixture_{i}.jpg")
+        image.save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def median_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def cosines(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLIP fp32 vs int8 on CPU: accuracy and speed")
+    parser.add_argument("images", nargs="*", help="Image paths (default: synthetic drawings)")
+    parser.add_argument("--samples", type=int, default=32, help="Synthetic images for the accuracy check")
+    parser.add_argument("--batch", type=int, default=8, help="Images per embed_images call (throughput)")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = torch default)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    temp_dir = None
+    images = args.images
+    if not images:
+        temp_dir = tempfile.mkdtemp(prefix="clip_bench_")
+        images = write_synthetic_images(args.samples, temp_dir)
+
+    try:
+        results, vectors = {}, {}
+        for backend in ("fp32", "int8"):
+            start = time.perf_counter()
+            embedder = CLIPEmbedder(backend=backend, num_threads=args.threads)
+            load_s = time.perf_counter() - start
+
+            image_vectors = np.stack(embedder.embed_images(images))
+            text_vectors = np.stack([embedder.embed_text(q) for q in QUERIES])
+            vectors[backend] = (image_vectors, text_vectors)
+
+            batch = (images * args.batch)[:args.batch]
+            results[backend] = {
+                "load_s": load_s,
+                "image_ms": median_ms(lambda: embedder.embed_image_from_path(images[0]), args.runs),
+                "text_ms": median_ms(lambda: embedder.embed_text(QUERIES[0]), args.runs),
+                "images_per_s": len(batch) / (median_ms(lambda: embedder.embed_images(batch), args.runs) / 1000),
+            }
+            del embedder
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir)
+
+    fp32_images, fp32_texts = vectors["fp32"]
+    int8_images, int8_texts = vectors["int8"]
+    image_cos = cosines(fp32_images, int8_images)
+    text_cos = cosines(fp32_texts, int8_texts)
+    top1_fp32 = np.argmax(fp32_texts @ fp32_images.T, axis=1)
+    top1_int8 = np.argmax(int8_texts @ int8_images.T, axis=1)
+
+    print(f"\nCLIP backends on CPU ({len(images)} images, {len(QUERIES)} texts, threads: {args.threads or 'default'})\n")
+    print(f"{'backend':<8} {'load s':>7} {'ms / image':>11} {'ms / text':>10} {f'img/s (batch {args.batch})':>18}")
+    print("-" * 58)
+    for backend, r in results.items():
+        print(f"{backend:<8} {r['load_s']:>7.1f} {r['image_ms']:>11.1f} {r['text_ms']:>10.1f} {r['images_per_s']:>18.1f}")
+
+    print("\nint8 vs fp32 agreement")
+    print(f"  image cosine: min {image_cos.min():.4f}, mean {image_cos.mean():.4f}")
+    print(f"  text cosine:  min {text_cos.min():.4f}, mean {text_cos.mean():.4f}")
+    print(f"  text->image top-1 agreement: {np.mean(top1_fp32 == top1_int8):.0%}")
+
+
+if __name__ == "__main__":
+    main()
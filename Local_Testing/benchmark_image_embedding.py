@@ -0,0 +1,97 @@
+"""
+Image Embedding Benchmark
+Embeds the same set of images two ways with the active image embedder:
+
+- sequential: embed_image_from_path / _url per image (batch of one each)
+- batched:    embed_images (concurrent load + preprocess, one forward pass)
+
+and reports wall time per ticket plus the cosine agreement between the
+two (batching must not change the vectors).
+
+Images are paths / URLs given on the command line, or synthetic JPEGs
+written to a temp directory (a ticket with N photos).
+
+Usage:
+    python Local_Testing/benchmark_image_embedding.py
+    python Local_Testing/benchmark_image_embedding.py --images 6 --runs 5
+    python Local_Testing/benchmark_image_embedding.py https://example.com/a.jpg https://example.com/b.jpg
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.clients.embeddings import get_image_embedder
+
+
+def write_synthetic_images(count: int, directory: str, seed: int = 4) -> list:
+    """Photo-sized noisy JPEGs (decode cost similar to a phone picture)."""
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        pixels = rng.integers(0, 256, (1536, 2048, 3), dtype=np.uint8)
+        path = os.path.join(directory, f"ticket_photo_{i}.jpg")
+        Image.fromarray(pixels).save(path, quality=85)
+        paths.append(path)
+    return paths
+
+
+def embed_sequential(embedder, sources: list) -> list:
+    return [
+        embedder.embed_image_from_url(s) if s.startswith(("http://", "https://")) else embedder.embed_image_from_path(s)
+        for s in sources
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs batched image embedding")
+    parser.add_argument("sources", nargs="*", help="Image paths or URLs (default: synthetic photos)")
+    parser.add_argument("--images", type=int, default=6, help="Synthetic photos per ticket")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    temp_dir = None
+    sources = args.sources
+    if not sources:
+        temp_dir = tempfile.mkdtemp(prefix="embed_bench_")
+        sources = write_synthetic_images(args.images, temp_dir)
+
+    try:
+        embedder = get_image_embedder()
+        embed_sequential(embedder, sources[:1])  # Warm up the model
+
+        timings = {"sequential": [], "batched": []}
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            sequential = embed_sequential(embedder, sources)
+            timings["sequential"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            batched = embedder.embed_images(sources)
+            timings["batched"].append(time.perf_counter() - start)
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir)
+
+    agreement = min(float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))) for a, b in zip(sequential, batched))
+
+    print(f"\n{type(embedder).__name__}: {len(sources)} image(s) per ticket, {args.runs} run(s)\n")
+    print(f"{'path':<12} {'ms / ticket (median)':>21} {'ms / image':>11}")
+    print("-" * 46)
+    for name, runs in timings.items():
+        median_ms = statistics.median(runs) * 1000
+        print(f"{name:<12} {median_ms:>21.0f} {median_ms / len(sources):>11.0f}")
+    print(f"\nMin cosine(sequential, batched): {agreement:.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Image Index Benchmark
+Compares the local image index mirror (exact NumPy search) against a
+reference and reports recall@k and per-query latency:
+
+- synthetic (default): a generated catalog of CLIP-like vectors (finish
+  variants of one product sit close together); the reference is an
+  independent float64 exact search, and queries are noisy copies of
+  catalog vectors, like a customer's photo of a catalog product
+- --pinecone: mirrors the real Pinecone image index (needs PINECONE_*
+  settings) and uses Pinecone's own answers as the reference, so the
+  latency column compares a network round trip with a local search
+
+Usage:
+    python Local_Testing/benchmark_image_index.py
+    python Local_Testing/benchmark_image_index.py --vectors 50000 --queries 500
+    python Local_Testing/benchmark_image_index.py --pinecone --queries 100
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.image_index import LocalImageIndex
+
+DIMENSION = 512
+CATEGORIES = ["Showering", "Bathing", "Sink Faucets", "Kitchen", "Bath Accessories", "Spare Parts"]
+FINISHES = ["Chrome", "Brushed Nickel", "Matte Black", "Satin Brass", "Polished Nickel"]
+
+
+def synthetic_index(size: int, seed: int = 3) -> LocalImageIndex:
+    """`size` CLIP-like vectors: products with 1-5 finish variants close to the product's direction."""
+    rng = np.random.default_rng(seed)
+    pick = random.Random(seed)
+    ids, vectors, metadata = [], [], []
+    while len(ids) < size:
+        product = rng.standard_normal(DIMENSION)
+        group = f"{pick.choice(['100', '160', 'HS', 'PBV', 'TVH'])}.{pick.randint(1000, 9999)}"
+        category = pick.choice(CATEGORIES)
+        for finish in pick.sample(FINISHES, pick.randint(1, 5)):
+            ids.append(f"{group}-{finish}-{len(ids)}")
+            vectors.append(product + 0.35 * rng.standard_normal(DIMENSION))
+            metadata.append({"model_no": f"{group}{finish[:2].upper()}", "product_category": category, "finish": finish})
+    return LocalImageIndex.build(ids[:size], vectors[:size], metadata[:size], metric="cosine")
+
+
+def noisy_queries(index: LocalImageIndex, count: int, noise: float = 0.6, seed: int = 9) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(index), count)
+    base = np.asarray(index.vectors[rows], dtype=np.float64)
+    return base + noise * rng.standard_normal(base.shape) / np.sqrt(DIMENSION)
+
+
+def exact_top_k(index: LocalImageIndex, query: np.ndarray, k: int, mask=None) -> list:
+    """Reference search in float64 (independent of LocalImageIndex.query)."""
+    matrix = np.asarray(index.vectors, dtype=np.float64)
+    scores = matrix @ (query / np.linalg.norm(query))
+    if mask is not None:
+        scores = np.where(mask, scores, -np.inf)
+    order = np.argsort(-scores, kind="stable")[:k]
+    return [index.ids[i] for i in order if np.isfinite(scores[i])]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def summarize(name: str, latencies: list, recalls: list) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:<34} {statistics.median(latencies):>9.2f} {p95:>9.2f} {statistics.mean(recalls):>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local image index: recall and latency")
+    parser.add_argument("--vectors", type=int, default=6000, help="Synthetic catalog size")
+    parser.add_argument("--queries", type=int, default=200, help="Queries to run")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--pinecone", action="store_true", help="Mirror the real Pinecone index and compare with it")
+    args = parser.parse_args()
+    k = args.top_k
+
+    if args.pinecone:
+        from app.clients.pinecone_client import get_pinecone_client
+        from app.services.image_index import fetch_pinecone_image_index
+
+        client = get_pinecone_client()
+        index, sync_ms = timed(fetch_pinecone_image_index, client)
+        print(f"\nSynced {len(index)} vectors from Pinecone in {sync_ms / 1000:.1f}s")
+    else:
+        client = None
+        index, build_ms = timed(synthetic_index, args.vectors)
+        print(f"\nSynthetic catalog: {len(index)} vectors x {index.dimension} (built in {build_ms:.0f} ms)")
+
+    fd, path = tempfile.mkstemp(suffix=".bin", prefix="image_index_")
+    os.close(fd)
+    try:
+        size = index.save(path)
+        mirror, load_ms = timed(LocalImageIndex.load, path)
+    finally:
+        os.unlink(path)
+    print(f"Mirror file: {size / 1024 / 1024:.1f} MB, mapped in {load_ms:.1f} ms\n")
+
+    queries = noisy_queries(mirror, args.queries)
+    category = mirror.metadata[0].get("product_category", "")
+    category_filter = {"product_category": {"$eq": category}}
+    category_mask = np.array([m.get("product_category") == category for m in mirror.metadata])
+    mirror.query(queries[0], top_k=k, filter_dict=category_filter)  # Builds the filter column
+
+    print(f"{'backend':<34} {'p50 ms':>9} {'p95 ms':>9} {f'recall@{k}':>10}")
+    print("-" * 65)
+
+    rows = {"local": ([], []), "local + category filter": ([], [])}
+    if client is not None:
+        rows["pinecone"] = ([], [])
+        rows["pinecone + category filter"] = ([], [])
+
+    for query in queries:
+        if client is not None:
+            reference, pc_ms = timed(client.query_images, query, top_k=k)
+            reference = [hit["id"] for hit in reference]
+            filtered_reference, pc_filter_ms = timed(client.query_images, query, top_k=k, filter_dict=category_filter)
+            filtered_reference = [hit["id"] for hit in filtered_reference]
+            rows["pinecone"][0].append(pc_ms)
+            rows["pinecone"][1].append(1.0)
+            rows["pinecone + category filter"][0].append(pc_filter_ms)
+            rows["pinecone + category filter"][1].append(1.0)
+        else:
+            reference = exact_top_k(mirror, query, k)
+            filtered_reference = exact_top_k(mirror, query, k, category_mask)
+
+        hits, ms = timed(mirror.query, query, top_k=k)
+        rows["local"][0].append(ms)
+        rows["local"][1].append(len({h["id"] for h in hits} & set(reference)) / max(len(reference), 1))
+
+        hits, ms = timed(mirror.query, query, top_k=k, filter_dict=category_filter)
+        rows["local + category filter"][0].append(ms)
+        rows["local + category filter"][1].append(len({h["id"] for h in hits} & set(filtered_reference)) / max(len(filtered_reference), 1))
+
+    for name, (latencies, recalls) in rows.items():
+        summarize(name, latencies, recalls)
+    reference_name = "Pinecone" if client is not None else "float64 exact search"
+    print(f"\nRecall is measured against {reference_name}.")
+
+
+if __name__ == "__main__":
+    main()
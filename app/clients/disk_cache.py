@@ -0,0 +1,72 @@
+"""
+Disk LRU Cache
+Shared base for the content-addressed caches (LLM responses, embeddings):
+a size-bounded on-disk LRU (diskcache) shared by every worker on the host,
+with hit / miss / write counters.
+
+Read and write errors are logged and treated as misses, so a broken cache
+directory never fails the call it sits in front of. Subclasses add key
+construction and what is worth storing.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from diskcache import Cache
+
+logger = logging.getLogger(__name__)
+
+
+class DiskLRUCache:
+    """Disk-backed LRU with thread-safe usage counters."""
+
+    log_prefix = "[DISK_CACHE]"
+
+    def __init__(self, directory: str, size_limit_mb: int = 256):
+        self.directory = directory
+        self._cache = Cache(
+            directory,
+            size_limit=size_limit_mb * 1024 * 1024,
+            eviction_policy="least-recently-used",
+        )
+        self._stats_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0}
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[name] += n
+
+    def _read(self, key: str) -> Any:
+        """Stored value, or None on a miss or read error."""
+        try:
+            value = self._cache.get(key)
+        except Exception as e:
+            logger.warning(f"{self.log_prefix} Read failed: {e}")
+            value = None
+        self._count("misses" if value is None else "hits")
+        return value
+
+    def _write(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value (ttl_seconds=None keeps it until evicted)."""
+        try:
+            self._cache.set(key, value, expire=ttl_seconds)
+            self._count("writes")
+        except Exception as e:
+            logger.warning(f"{self.log_prefix} Write failed: {e}")
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number removed."""
+        return self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["entries"] = len(self._cache)
+        stats["size_bytes"] = self._cache.volume()
+        return stats
+
+    def close(self) -> None:
+        self._cache.close()
@@ -0,0 +1,92 @@
+"""
+Embedding Cache
+Content-addressed cache for image and query-text embeddings.
+
+Keys are a SHA-256 of (kind, embedding model id, content): the image bytes
+for images, the whitespace-normalized text for query texts. The same photo
+re-attached later in a conversation or to another ticket - whatever its
+URL - and repeated past-ticket / text-to-image queries are embedded once.
+Including the model id means switching CLIP checkpoints or Vertex AI
+dimensions never serves a vector from another embedding space.
+
+Vectors are stored as float32 arrays in a size-bounded on-disk LRU (see
+disk_cache.py), shared by every worker process on the host. Embeddings are
+deterministic for a given model, so entries have no TTL.
+"""
+
+import hashlib
+import logging
+import threading
+import unicodedata
+from typing import Any, List, Optional
+
+import numpy as np
+
+from app.clients.disk_cache import DiskLRUCache
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Text as it is keyed: Unicode NFC, whitespace runs collapsed, stripped."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache(DiskLRUCache):
+    """Disk-backed LRU of embedding vectors keyed by content hash."""
+
+    log_prefix = "[EMBEDDING_CACHE]"
+
+    @staticmethod
+    def image_key(model_id: str, image_bytes: bytes) -> str:
+        """Content address of an image embedding."""
+        digest = hashlib.sha256(b"image\x00" + model_id.encode("utf-8") + b"\x00")
+        digest.update(image_bytes)
+        return digest.hexdigest()
+
+    @staticmethod
+    def text_key(model_id: str, text: str) -> str:
+        """Content address of a text embedding."""
+        payload = "\x00".join(["text", model_id, normalize_text(text)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return the cached vector, or None on a miss."""
+        value = self._read(key)
+        return value.tolist() if value is not None else None
+
+    def set(self, key: str, vector: Any) -> None:
+        """Store a vector. Empty or all-zero vectors (failed embeddings) are not cached."""
+        array = np.asarray(vector, dtype=np.float32)
+        if not array.size or not array.any():
+            return
+        self._write(key, array)
+
+
+# =============================================================================
+# SINGLETON INSTANCE
+# =============================================================================
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the global embedding cache (None when embedding_cache_enabled is off)."""
+    global _cache
+    if not settings.embedding_cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(settings.embedding_cache_path, settings.embedding_cache_size_mb)
+                logger.info(f"[EMBEDDING_CACHE] Embedding cache ready: {settings.embedding_cache_path} ({settings.embedding_cache_size_mb} MB)")
+    return _cache
+
+
+def close_embedding_cache() -> None:
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
@@ -9,14 +9,18 @@ Text Embeddings (768 dimensions):
 - Gemini: For text/tickets index
 
 Toggle between CLIP and Vertex AI using USE_VERTEX_AI_EMBEDDINGS env var.
+
+Image and query-text embeddings are cached by content hash
+(see app.clients.embedding_cache).
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 import torch
 import open_clip
 from PIL import Image
 from pathlib import Path
-from typing import Dict, List, Union, Optional, Protocol
+from typing import Callable, Dict, List, Sequence, Tuple, Union, Optional, Protocol
 import numpy as np
 from io import BytesIO
 import requests
@@ -24,9 +28,44 @@ from google import genai
 from abc import ABC, abstractmethod
 
 from app.config.settings import settings
+from app.clients.embedding_cache import get_embedding_cache
+from app.utils.attachment_store import get_attachment
+from app.utils.rate_limiter import gemini_slot, estimate_tokens
 
 logger = logging.getLogger(__name__)
 
+IMAGE_FETCH_WORKERS = 8  # Concurrent image downloads / decodes (shared across requests)
+IMAGE_DOWNLOAD_TIMEOUT = 10
+GEMINI_TEXT_EMBEDDING_MODEL = "text-embedding-004"
+
+ImageSource = Union[str, Path, bytes]  # Path, HTTP(S) URL, or the image bytes themselves
+
+_image_pool = ThreadPoolExecutor(max_workers=IMAGE_FETCH_WORKERS, thread_name_prefix="image-fetch")
+
+
+def _is_url(image_source: ImageSource) -> bool:
+    return isinstance(image_source, str) and image_source.startswith(('http://', 'https://'))
+
+
+def _download_image(url: str) -> Tuple[bytes, Optional[str]]:
+    response = requests.get(url, timeout=IMAGE_DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    return response.content, response.headers.get("content-type")
+
+
+def _read_image_bytes(image_source: ImageSource) -> bytes:
+    """Download (URL) or read (path) an image's bytes. Ticket attachments come from the attachment store."""
+    if isinstance(image_source, (bytes, bytearray)):
+        return bytes(image_source)
+    if _is_url(image_source):
+        return get_attachment(image_source, _download_image).data
+    return Path(image_source).read_bytes()
+
+
+def _load_image(image_source: ImageSource) -> Image.Image:
+    """Download / open an image and decode it to RGB."""
+    return Image.open(BytesIO(_read_image_bytes(image_source))).convert("RGB")
+
 
 # =====================================================
 # EMBEDDER INTERFACE (Abstract Base)
@@ -35,6 +74,11 @@ logger = logging.getLogger(__name__)
 class ImageEmbedderInterface(ABC):
     """Interface for image embedding providers"""
     
+    @property
+    def model_id(self) -> str:
+        """Identifies the embedding space (cache keys include it)"""
+        return type(self).__name__
+    
     @abstractmethod
     def embed_image_from_path(self, image_path: Union[str, Path]) -> np.ndarray:
         """Generate embedding for image from local path"""
@@ -50,6 +94,32 @@ class ImageEmbedderInterface(ABC):
         """Generate text embedding in same space as images"""
         pass
     
+    def embed_image_from_bytes(self, image_bytes: bytes) -> np.ndarray:
+        """Generate embedding for an image already in memory"""
+        raise NotImplementedError(f"{type(self).__name__} cannot embed image bytes")
+    
+    def embed_images(self, image_sources: Sequence[ImageSource]) -> List[Optional[np.ndarray]]:
+        """
+        Embed several images (paths, URLs or image bytes).
+        Default: one at a time; embedders that can batch override this.
+        
+        Returns:
+            One embedding per source, in order; None where that image failed
+        """
+        embeddings = []
+        for source in image_sources:
+            try:
+                if isinstance(source, (bytes, bytearray)):
+                    embeddings.append(self.embed_image_from_bytes(bytes(source)))
+                elif _is_url(source):
+                    embeddings.append(self.embed_image_from_url(str(source)))
+                else:
+                    embeddings.append(self.embed_image_from_path(source))
+            except Exception as e:
+                logger.error(f"Failed to embed image {source}: {e}")
+                embeddings.append(None)
+        return embeddings
+    
     @abstractmethod
     def get_embedding_dim(self) -> int:
         """Get the dimension of embedding vectors"""
@@ -65,13 +135,35 @@ class CLIPEmbedder(ImageEmbedderInterface):
     CLIP-based image embedder with optional GPU support.
     Generates normalized embeddings for product images (512 dimensions).
     Default for local development - no cloud credentials needed.
+    
+    Backends (settings.clip_backend):
+    - fp32: the model as published
+    - int8: Linear layers dynamically quantized to int8 (CPU only). Most
+      of ViT-B-32's compute is in its MLP Linear layers; vectors stay
+      within ~0.99 cosine of fp32 (check with
+      Local_Testing/benchmark_clip_backends.py before switching)
     """
     
-    def __init__(self):
-        """Initialize CLIP model"""
+    def __init__(self, backend: Optional[str] = None, num_threads: Optional[int] = None):
+        """
+        Initialize CLIP model
+        
+        Args:
+            backend: "fp32" or "int8" (default: settings.clip_backend)
+            num_threads: torch intra-op threads, 0 = torch default (default: settings.clip_num_threads)
+        """
+        self.backend = backend or settings.clip_backend
+        self.num_threads = settings.clip_num_threads if num_threads is None else num_threads
         self.device = self._setup_device()
         self.model, self.preprocess = self._load_model()
-        logger.info(f"CLIP Embedder initialized on device: {self.device}")
+        self.tokenizer = open_clip.get_tokenizer(settings.clip_model)
+        logger.info(f"CLIP Embedder initialized on device: {self.device} (backend: {self.backend}, dim: {self.embedding_dim})")
+    
+    @property
+    def model_id(self) -> str:
+        model_id = f"clip/{settings.clip_model}/{settings.clip_pretrained}"
+        # Quantized vectors differ slightly from fp32 ones: keep them apart in the embedding cache
+        return model_id if self.backend == "fp32" else f"{model_id}/{self.backend}"
     
     def _setup_device(self) -> torch.device:
         """Configure device (GPU/CPU) for inference"""
@@ -88,10 +180,14 @@ class CLIPEmbedder(ImageEmbedderInterface):
         return device
     
     def _load_model(self):
-        """Load CLIP model and preprocessing"""
-        logger.info(f"Loading CLIP model: {settings.clip_model}")
+        """Load CLIP model and preprocessing (quantized for the int8 backend)"""
+        logger.info(f"Loading CLIP model: {settings.clip_model} ({self.backend})")
         
         try:
+            if self.num_threads > 0:
+                # Process-wide: CLIP is the only torch model in this service
+                torch.set_num_threads(self.num_threads)
+            
             model, _, preprocess = open_clip.create_model_and_transforms(
                 settings.clip_model,
                 pretrained=settings.clip_pretrained,
@@ -100,12 +196,22 @@ class CLIPEmbedder(ImageEmbedderInterface):
             
             model.eval()
             
-            # Test embedding dimension
-            with torch.no_grad():
-                dummy_input = torch.randn(1, 3, 224, 224).to(self.device)
-                embedding_dim = model.encode_image(dummy_input).shape[-1]
+            if self.backend == "int8":
+                if self.device.type != "cpu":
+                    logger.warning("int8 CLIP backend is CPU only; using fp32 on GPU")
+                    self.backend = "fp32"
+                else:
+                    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
             
-            logger.info(f"CLIP model loaded. Embedding dimension: {embedding_dim}")
+            # Embedding dimension: from the model config when it has one, else one dummy pass (once)
+            embedding_dim = getattr(getattr(model, "visual", None), "output_dim", None)
+            if not embedding_dim:
+                with torch.no_grad():
+                    dummy_input = torch.randn(1, 3, 224, 224).to(self.device)
+                    embedding_dim = model.encode_image(dummy_input).shape[-1]
+            self.embedding_dim = int(embedding_dim)
+            
+            logger.info(f"CLIP model loaded. Embedding dimension: {self.embedding_dim}, threads: {torch.get_num_threads()}")
             
             return model, preprocess
             
@@ -142,18 +248,26 @@ class CLIPEmbedder(ImageEmbedderInterface):
             Normalized embedding vector (numpy array)
         """
         try:
-            # Download image
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            
-            # Load image from bytes
-            image = Image.open(BytesIO(response.content)).convert("RGB")
+            # Download and decode image
+            image = _load_image(image_url)
             return self._embed_pil_image(image)
             
         except Exception as e:
             logger.error(f"Failed to embed image from URL {image_url}: {e}")
             raise
     
+    def embed_image_from_bytes(self, image_bytes: bytes) -> np.ndarray:
+        """
+        Generate embedding for an image already in memory
+        
+        Args:
+            image_bytes: Encoded image (JPEG, PNG, ...)
+            
+        Returns:
+            Normalized embedding vector (numpy array)
+        """
+        return self._embed_pil_image(_load_image(image_bytes))
+    
     def _embed_pil_image(self, image: Image.Image) -> np.ndarray:
         """
         Generate embedding for PIL Image
@@ -183,12 +297,49 @@ class CLIPEmbedder(ImageEmbedderInterface):
             logger.error(f"Failed to generate embedding: {e}")
             raise
     
+    def embed_images(self, image_sources: Sequence[ImageSource]) -> List[Optional[np.ndarray]]:
+        """
+        Embed several images with one batched forward pass.
+        
+        Downloads / decodes / preprocesses all images concurrently on the
+        shared image pool, then encodes the batch at once.
+        
+        Args:
+            image_sources: File paths, HTTP(S) URLs or image bytes
+            
+        Returns:
+            Normalized embeddings, one per source in order; None where that image failed
+        """
+        def prepare(source):
+            try:
+                return self.preprocess(_load_image(source))
+            except Exception as e:
+                logger.error(f"Failed to load image {source}: {e}")
+                return None
+        
+        tensors = list(_image_pool.map(prepare, image_sources))
+        loaded = [i for i, tensor in enumerate(tensors) if tensor is not None]
+        embeddings: List[Optional[np.ndarray]] = [None] * len(tensors)
+        if not loaded:
+            return embeddings
+        
+        try:
+            batch = torch.stack([tensors[i] for i in loaded]).to(self.device)
+            with torch.no_grad():
+                encoded = self.model.encode_image(batch)
+                encoded = encoded / encoded.norm(dim=-1, keepdim=True)
+            encoded_np = encoded.cpu().numpy()
+        except Exception as e:
+            logger.error(f"Failed to generate batch embedding: {e}")
+            raise
+        
+        for row, i in enumerate(loaded):
+            embeddings[i] = encoded_np[row]
+        return embeddings
+    
     def get_embedding_dim(self) -> int:
         """Get the dimension of embedding vectors"""
-        with torch.no_grad():
-            dummy_input = torch.randn(1, 3, 224, 224).to(self.device)
-            embedding = self.model.encode_image(dummy_input)
-            return embedding.shape[-1]
+        return self.embedding_dim
     
     def embed_text(self, text: str) -> np.ndarray:
         """
@@ -201,11 +352,9 @@ class CLIPEmbedder(ImageEmbedderInterface):
         Returns:
             Normalized embedding vector (numpy array)
         """
-        tokenizer = open_clip.get_tokenizer(settings.clip_model)
-        
         try:
             with torch.no_grad():
-                text_tokens = tokenizer([text]).to(self.device)
+                text_tokens = self.tokenizer([text]).to(self.device)
                 text_embedding = self.model.encode_text(text_tokens)
                 text_embedding = text_embedding / text_embedding.norm(dim=-1, keepdim=True)
                 return text_embedding.cpu().numpy().flatten()
@@ -242,6 +391,10 @@ class VertexAIEmbedder(ImageEmbedderInterface):
         self._init_vertex_ai()
         logger.info(f"Vertex AI Embedder initialized (project: {settings.vertex_ai_project}, dim: {settings.vertex_ai_embedding_dimension})")
     
+    @property
+    def model_id(self) -> str:
+        return f"vertex/multimodalembedding/{settings.vertex_ai_embedding_dimension}"
+    
     def _init_vertex_ai(self):
         """Initialize Vertex AI SDK and load model"""
         if VertexAIEmbedder._initialized:
@@ -301,6 +454,29 @@ class VertexAIEmbedder(ImageEmbedderInterface):
             logger.error(f"Vertex AI: Failed to embed image from path {image_path}: {e}")
             raise
     
+    def embed_image_from_bytes(self, image_bytes: bytes) -> np.ndarray:
+        """
+        Generate embedding for an image already in memory using Vertex AI.
+        
+        Args:
+            image_bytes: Encoded image (JPEG, PNG, ...)
+            
+        Returns:
+            Normalized embedding vector (numpy array)
+        """
+        try:
+            from vertexai.vision_models import Image as VertexImage
+            
+            embeddings = VertexAIEmbedder._model.get_embeddings(
+                image=VertexImage(image_bytes=image_bytes),
+                dimension=settings.vertex_ai_embedding_dimension
+            )
+            return np.array(embeddings.image_embedding, dtype=np.float32)
+            
+        except Exception as e:
+            logger.error(f"Vertex AI: Failed to embed image bytes: {e}")
+            raise
+    
     def embed_image_from_url(self, image_url: str) -> np.ndarray:
         """
         Generate embedding for image from URL using Vertex AI.
@@ -422,26 +598,34 @@ def get_gemini_embed_client() -> genai.Client:
     return _gemini_client['instance']
 
 
-def embed_text_gemini(text: str) -> List[float]:
-    """
-    Generate text embeddings using Gemini's text-embedding model.
-    Produces 768-dimensional vectors for the tickets index.
+def _cached_text_embedding(model_id: str, text: str, embed: Callable[[str], List[float]]) -> List[float]:
+    """Look the text up in the embedding cache; embed and store it on a miss."""
+    cache = get_embedding_cache()
+    if cache is None:
+        return embed(text)
     
-    Args:
-        text: Text to embed
-        
-    Returns:
-        Embedding vector as list (768 dimensions)
-    """
+    key = cache.text_key(model_id, text)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    
+    embedding = embed(text)
+    cache.set(key, embedding)  # Zero vectors (failed calls) are skipped
+    return embedding
+
+
+def _embed_text_gemini(text: str) -> List[float]:
     try:
         client = get_gemini_embed_client()
         
         # Use Gemini's embedding model
         # text-embedding-004 produces 768-dim vectors by default
-        result = client.models.embed_content(
-            model="text-embedding-004",
-            contents=text
-        )
+        with gemini_slot(GEMINI_TEXT_EMBEDDING_MODEL, estimate_tokens(text)) as slot:
+            result = client.models.embed_content(
+                model=GEMINI_TEXT_EMBEDDING_MODEL,
+                contents=text
+            )
+            slot.record(result)
         
         # Extract embedding vector
         if hasattr(result, 'embeddings') and result.embeddings:
@@ -457,6 +641,21 @@ def embed_text_gemini(text: str) -> List[float]:
         return [0.0] * 768
 
 
+def embed_text_gemini(text: str) -> List[float]:
+    """
+    Generate text embeddings using Gemini's text-embedding model.
+    Produces 768-dimensional vectors for the tickets index.
+    Repeated texts are served from the embedding cache.
+    
+    Args:
+        text: Text to embed
+        
+    Returns:
+        Embedding vector as list (768 dimensions)
+    """
+    return _cached_text_embedding(f"gemini/{GEMINI_TEXT_EMBEDDING_MODEL}", text, _embed_text_gemini)
+
+
 def embed_text(text: str) -> List[float]:
     """
     Generate text embeddings using Gemini (768 dimensions).
@@ -480,6 +679,7 @@ def embed_text_clip(text: str) -> List[float]:
     """
     Generate text embeddings for image search (512 dimensions).
     Uses the active embedder (CLIP or Vertex AI).
+    Repeated texts are served from the embedding cache.
     
     Note: With Vertex AI, text embeddings are in the SAME space as images,
     enabling more accurate text-to-image search.
@@ -492,49 +692,100 @@ def embed_text_clip(text: str) -> List[float]:
     """
     try:
         embedder = get_image_embedder()
-        embedding = embedder.embed_text(text)
-        return embedding.tolist()
+        return _cached_text_embedding(embedder.model_id, text, lambda t: embedder.embed_text(t).tolist())
     except Exception as e:
         logger.error(f"Failed to embed text for image search: {e}")
         return [0.0] * 512
 
 
-def embed_image(image_source: Union[str, Path]) -> List[float]:
+def _try_read_image_bytes(image_source: ImageSource) -> Optional[bytes]:
+    try:
+        return _read_image_bytes(image_source)
+    except Exception as e:
+        logger.error(f"Failed to load image {str(image_source)[:100]}: {e}")
+        return None
+
+
+def _embed_images_cached(embedder: ImageEmbedderInterface, images: List[Optional[bytes]]) -> List[Optional[List[float]]]:
+    """
+    Embed image bytes with one embedder, serving repeats from the embedding cache.
+    Only the cache misses are sent to the embedder (as one batch).
     """
-    Embed an image from path or URL.
+    cache = get_embedding_cache()
+    keys = [
+        cache.image_key(embedder.model_id, data) if cache is not None and data is not None else None
+        for data in images
+    ]
+    embeddings = [cache.get(key) if key else None for key in keys]
+    
+    misses = [i for i, data in enumerate(images) if data is not None and embeddings[i] is None]
+    if misses:
+        try:
+            fresh = embedder.embed_images([images[i] for i in misses])
+        except Exception as e:
+            logger.error(f"Failed to embed images: {e}")
+            fresh = [None] * len(misses)
+        for i, embedding in zip(misses, fresh):
+            if embedding is None:
+                continue
+            embeddings[i] = embedding.tolist()
+            if keys[i]:
+                cache.set(keys[i], embedding)
+    
+    if cache is not None and len(misses) < sum(data is not None for data in images):
+        logger.debug(f"[EMBEDDING_CACHE] {len(images) - len(misses)}/{len(images)} image embedding(s) served from cache")
+    return embeddings
+
+
+def embed_image(image_source: ImageSource) -> List[float]:
+    """
+    Embed an image from path, URL or bytes.
     Uses the active embedder (CLIP or Vertex AI) based on config.
     
     Args:
-        image_source: File path or HTTP URL
+        image_source: File path, HTTP URL or image bytes
         
     Returns:
         Embedding vector as list (512 dimensions)
     """
-    try:
-        embedder = get_image_embedder()
-        image_str = str(image_source)
-        
-        if image_str.startswith('http://') or image_str.startswith('https://'):
-            embedding = embedder.embed_image_from_url(image_str)
-        else:
-            embedding = embedder.embed_image_from_path(image_source)
-        
-        return embedding.tolist()
+    embedding = embed_images([image_source])[0]
+    return embedding if embedding is not None else [0.0] * 512
+
+
+def embed_images(image_sources: Sequence[ImageSource]) -> List[Optional[List[float]]]:
+    """
+    Embed several images (paths, URLs or bytes) in one batch.
+    Uses the active embedder (CLIP or Vertex AI) based on config.
+    
+    Every image is read once (concurrently) and its bytes are looked up in
+    the embedding cache, so an image seen before - under any URL - is not
+    embedded again.
+    
+    Args:
+        image_sources: File paths, HTTP URLs or image bytes
         
-    except Exception as e:
-        logger.error(f"Failed to embed image: {e}")
-        # Fallback to CLIP if Vertex AI fails
-        if settings.use_vertex_ai_embeddings:
-            logger.warning("Vertex AI failed, falling back to CLIP")
-            try:
-                clip = get_clip_embedder()
-                if image_str.startswith('http://') or image_str.startswith('https://'):
-                    return clip.embed_image_from_url(image_str).tolist()
-                else:
-                    return clip.embed_image_from_path(image_source).tolist()
-            except Exception as fallback_error:
-                logger.error(f"CLIP fallback also failed: {fallback_error}")
-        return [0.0] * 512
+    Returns:
+        One embedding list (512 dimensions) per source, in order; None where
+        that image could not be embedded (unlike embed_image, no zero vectors)
+    """
+    if not image_sources:
+        return []
+    
+    images = list(_image_pool.map(_try_read_image_bytes, image_sources))
+    embeddings = _embed_images_cached(get_image_embedder(), images)
+    
+    # Fallback to CLIP for the images Vertex AI failed on
+    failed = [i for i, embedding in enumerate(embeddings) if embedding is None and images[i] is not None]
+    if failed and settings.use_vertex_ai_embeddings:
+        logger.warning(f"Vertex AI failed for {len(failed)} image(s), falling back to CLIP")
+        try:
+            retried = _embed_images_cached(get_clip_embedder(), [images[i] for i in failed])
+            for i, embedding in zip(failed, retried):
+                embeddings[i] = embedding
+        except Exception as fallback_error:
+            logger.error(f"CLIP fallback also failed: {fallback_error}")
+    
+    return embeddings
 
 
 def embed_image_for_search(text_query: str) -> List[float]:
@@ -3,6 +3,8 @@ Freshdesk API Client
 Clean, Correct & Production-Ready Version
 """
 
+import asyncio
+import httpx
 import requests
 import logging
 import time
@@ -10,7 +12,7 @@ from typing import List, Dict, Optional, Any
 from requests.auth import HTTPBasicAuth
 
 from app.config.settings import settings
-from app.utils.retry import retry_api_call, TRANSIENT_EXCEPTIONS
+from app.utils.retry import retry_api_call, retry_async_api_call, TRANSIENT_EXCEPTIONS
 from app.utils.pii_masker import mask_api_key
 
 logger = logging.getLogger(__name__)
@@ -37,6 +39,9 @@ class FreshdeskClient:
 
         self.headers = {"Content-Type": "application/json"}
 
+        # Created lazily on the event loop that first uses it
+        self._async_http: Optional[httpx.AsyncClient] = None
+
         # Log with masked API key for security
         logger.info(f"Freshdesk client initialized → {self.base_url} (key: {mask_api_key(api_key)})")
 
@@ -126,6 +131,65 @@ class FreshdeskClient:
         time.sleep(0.4)
         return response.json()
 
+    # --------------------------------------------------------------------
+    # Async variants (httpx) - used by the async graph
+    # --------------------------------------------------------------------
+    def _get_async_http(self) -> httpx.AsyncClient:
+        if self._async_http is None or self._async_http.is_closed:
+            self._async_http = httpx.AsyncClient(
+                auth=(self.api_key, "X"),
+                headers=self.headers,
+                timeout=self.timeout,
+            )
+        return self._async_http
+
+    async def _ahandle_rate_limit(self, response: httpx.Response):
+        if response.status_code == 429:
+            wait = int(response.headers.get("Retry-After", 60))
+            logger.warning(f"[Freshdesk] Rate limited. Waiting {wait}s")
+            await asyncio.sleep(wait)
+
+    @retry_async_api_call
+    async def aget_ticket(self, ticket_id: int, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Async variant of get_ticket"""
+        response = await self._get_async_http().get(f"{self.base_url}/tickets/{ticket_id}", params=params or {})
+        await self._ahandle_rate_limit(response)
+        response.raise_for_status()
+        return response.json()
+
+    @retry_async_api_call
+    async def aget_ticket_conversations(self, ticket_id: int) -> List[Dict[str, Any]]:
+        """Async variant of get_ticket_conversations"""
+        response = await self._get_async_http().get(f"{self.base_url}/tickets/{ticket_id}/conversations")
+        await self._ahandle_rate_limit(response)
+        response.raise_for_status()
+        return response.json()
+
+    @retry_async_api_call
+    async def aadd_note(self, ticket_id: int, body: str, private: bool = True) -> Dict[str, Any]:
+        """Async variant of add_note"""
+        payload = {"body": body, "private": private}
+        response = await self._get_async_http().post(f"{self.base_url}/tickets/{ticket_id}/notes", json=payload)
+        await self._ahandle_rate_limit(response)
+        response.raise_for_status()
+        await asyncio.sleep(0.4)
+        return response.json()
+
+    @retry_async_api_call
+    async def aupdate_ticket(self, ticket_id: int, **fields) -> Dict[str, Any]:
+        """Async variant of update_ticket"""
+        response = await self._get_async_http().put(f"{self.base_url}/tickets/{ticket_id}", json=fields)
+        await self._ahandle_rate_limit(response)
+        response.raise_for_status()
+        await asyncio.sleep(0.4)
+        return response.json()
+
+    async def aclose(self) -> None:
+        """Close the async HTTP client (call on shutdown)."""
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
+
     # --------------------------------------------------------------------
     # Extract Ticket Fields (Normalized)
     # --------------------------------------------------------------------
@@ -158,3 +222,9 @@ def get_freshdesk_client() -> FreshdeskClient:
     if _client is None:
         _client = FreshdeskClient()
     return _client
+
+
+async def aclose_freshdesk_client() -> None:
+    """Close the singleton's async HTTP client, if one was created."""
+    if _client is not None:
+        await _client.aclose()
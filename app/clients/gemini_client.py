@@ -11,6 +11,7 @@ from google import genai
 from google.genai import types
 
 from app.config.settings import settings
+from app.utils.rate_limiter import gemini_slot, estimate_tokens
 from app.graph.state import RetrievalHit
 
 logger = logging.getLogger(__name__)
@@ -56,20 +57,22 @@ class GeminiClient:
         
         try:
             # CORRECTED: Use proper File Search tool configuration
-            response = self.client.models.generate_content(
-                model=self.file_search_model,  # Use dedicated file search model (gemini-2.5-pro)
-                contents=query,
-                config=types.GenerateContentConfig(
-                    tools=[
-                        types.Tool(
-                            file_search=types.FileSearch(
-                                file_search_store_names=[self.store_id]
+            with gemini_slot(self.file_search_model, estimate_tokens(query)) as slot:
+                response = self.client.models.generate_content(
+                    model=self.file_search_model,  # Use dedicated file search model (gemini-2.5-pro)
+                    contents=query,
+                    config=types.GenerateContentConfig(
+                        tools=[
+                            types.Tool(
+                                file_search=types.FileSearch(
+                                    file_search_store_names=[self.store_id]
+                                )
                             )
-                        )
-                    ],
-                    temperature=0.1,  # Low temperature for factual retrieval
+                        ],
+                        temperature=0.1,  # Low temperature for factual retrieval
+                    )
                 )
-            )
+                slot.record(response)
             
             # Extract answer text
             answer_text = response.text if hasattr(response, 'text') else ""
@@ -225,11 +228,13 @@ class GeminiClient:
                 config_params['system_instruction'] = system_instruction
             
             # Make API call
-            response = self.client.models.generate_content(
-                model=self.file_search_model,  # Use dedicated file search model (gemini-2.5-pro)
-                contents=query,
-                config=types.GenerateContentConfig(**config_params)
-            )
+            with gemini_slot(self.file_search_model, estimate_tokens(f"{system_instruction or ''}{query}")) as slot:
+                response = self.client.models.generate_content(
+                    model=self.file_search_model,  # Use dedicated file search model (gemini-2.5-pro)
+                    contents=query,
+                    config=types.GenerateContentConfig(**config_params)
+                )
+                slot.record(response)
             
             # Extract answer text
             answer_text = response.text if hasattr(response, 'text') else ""
@@ -0,0 +1,106 @@
+"""
+LLM Response Cache
+Opt-in, content-addressed cache for LLMClient.call_llm / acall_llm.
+
+Keys are a SHA-256 of (model, system prompt, user prompt, temperature,
+response_format, max_tokens), so only byte-identical requests hit - e.g. a
+ticket re-processed after a webhook retry, /debug/process replays, or a
+repeated routing / vip_compliance check. Entries live in a size-bounded
+on-disk LRU (see disk_cache.py) shared by every worker in the process.
+
+Each call site opts in by passing cache_ttl to call_llm; calls without a
+TTL are never cached. Bypass for one run with `with bypass_llm_cache():`
+(reads are skipped, fresh responses are still stored).
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from app.clients.disk_cache import DiskLRUCache
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+class LLMResponseCache(DiskLRUCache):
+    """Disk-backed LRU of parsed LLM responses with per-entry TTL."""
+
+    log_prefix = "[LLM_CACHE]"
+
+    def __init__(self, directory: str, size_limit_mb: int = 512):
+        super().__init__(directory, size_limit_mb)
+        self.stats["bypassed"] = 0
+
+    @staticmethod
+    def make_key(
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        response_format: Optional[str],
+        max_tokens: int,
+    ) -> str:
+        """Content address of an LLM request."""
+        payload = json.dumps(
+            [model, system_prompt, user_prompt, temperature, response_format, max_tokens],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Any:
+        """Return the cached response, or None on a miss."""
+        if _bypass.get() or settings.llm_cache_bypass:
+            self._count("bypassed")
+            return None
+        return self._read(key)
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        """Store a response. Empty responses (failed parses) are not cached."""
+        if not value:
+            return
+        self._write(key, value, ttl_seconds)
+
+
+@contextmanager
+def bypass_llm_cache():
+    """Skip cache reads for LLM calls made in this context (tasks and to_thread inherit it)."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+# =============================================================================
+# SINGLETON INSTANCE
+# =============================================================================
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Get the global response cache (None when llm_cache_enabled is off)."""
+    global _cache
+    if not settings.llm_cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache(settings.llm_cache_path, settings.llm_cache_size_mb)
+                logger.info(f"[LLM_CACHE] Response cache ready: {settings.llm_cache_path} ({settings.llm_cache_size_mb} MB)")
+    return _cache
+
+
+def close_llm_cache() -> None:
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
@@ -3,14 +3,18 @@ LLM Client for Gemini API Calls
 Handles structured LLM requests with JSON responses
 """
 
+import asyncio
 import logging
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from google import genai
 from google.genai import types
 
 from app.config.settings import settings
+from app.clients.llm_cache import get_llm_cache
+from app.clients.prompt_cache import create_prompt_cache
 from app.utils.retry import retry_gemini_call
+from app.utils.rate_limiter import gemini_slot, agemini_slot, estimate_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +34,8 @@ class LLMClient:
         self.model_name = settings.llm_model
         self.temperature = settings.llm_temperature
         self.max_tokens = settings.llm_max_tokens
+        # Provider-side cache for large static system prompts (None if disabled)
+        self.prompt_cache = create_prompt_cache(self.client)
         
         logger.info(f"LLM client initialized with model: {self.model_name}, max_tokens: {self.max_tokens}")
     
@@ -40,7 +46,9 @@ class LLMClient:
         user_prompt: str,
         response_format: Optional[str] = None,
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+        cache_system_prompt: bool = False
     ) -> Any:
         """
         Call the LLM with prompts
@@ -51,132 +59,286 @@ class LLMClient:
             response_format: If "json", expects and parses JSON response
             temperature: Override default temperature
             max_tokens: Override default max tokens
+            cache_ttl: Seconds to cache this response (None = not cached).
+                Only used when llm_cache_enabled is on.
+            cache_system_prompt: Send system_prompt as Gemini cached content.
+                Use only for large prompts that never vary per call.
             
         Returns:
             Parsed JSON dict if response_format="json", otherwise raw text
         """
-        temp = temperature if temperature is not None else self.temperature
-        max_tok = max_tokens if max_tokens is not None else self.max_tokens
-        
-        # Combine prompts
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
+        cache_key, cached = self._cache_lookup(
+            system_prompt, user_prompt, response_format, temperature, max_tokens, cache_ttl
+        )
+        if cached is not None:
+            return cached
         
-        logger.info(f"📤 LLM Request: model={self.model_name}, temperature={temp}, max_tokens={max_tok}")
-        logger.debug(f"📤 Prompt length: {len(full_prompt)} chars")
+        cached_content = self._cached_prefix(system_prompt) if cache_system_prompt else None
+        contents, config, max_tok = self._prepare_request(
+            system_prompt, user_prompt, response_format, temperature, max_tokens, cached_content
+        )
+        try:
+            try:
+                response = self._generate(contents, config)
+            except Exception as e:
+                if not (cached_content and self.prompt_cache.is_cache_error(e)):
+                    raise
+                # Cached content vanished server-side - resend the full prompt once
+                logger.warning(f"⚠️ Cached prompt unavailable ({e}) - retrying with full prompt")
+                self.prompt_cache.invalidate(self.model_name, system_prompt)
+                contents, config, max_tok = self._prepare_request(
+                    system_prompt, user_prompt, response_format, temperature, max_tokens
+                )
+                response = self._generate(contents, config)
+            result = self._parse_response(response, response_format, max_tok)
+            if cache_key:
+                get_llm_cache().set(cache_key, result, cache_ttl)
+            return result
+        except Exception as e:
+            return self._handle_error(e, response_format)
+
+    @retry_gemini_call
+    async def acall_llm(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_format: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+        cache_system_prompt: bool = False
+    ) -> Any:
+        """
+        Async variant of call_llm using the google-genai aio client.
+        Same arguments, return values and error handling.
+        """
+        cache_key, cached = self._cache_lookup(
+            system_prompt, user_prompt, response_format, temperature, max_tokens, cache_ttl
+        )
+        if cached is not None:
+            return cached
         
+        cached_content = None
+        if cache_system_prompt:
+            # Creating/refreshing an entry is a blocking API call (rare)
+            cached_content = await asyncio.to_thread(self._cached_prefix, system_prompt)
+        contents, config, max_tok = self._prepare_request(
+            system_prompt, user_prompt, response_format, temperature, max_tokens, cached_content
+        )
         try:
-            # Build config
-            config = types.GenerateContentConfig(
-                temperature=temp,
-                max_output_tokens=max_tok,
-                top_p=0.95,
-            )
-            
-            # If JSON format requested, add instruction
-            if response_format == "json":
-                config.response_mime_type = "application/json"
-            
-            # Generate content
+            try:
+                response = await self._agenerate(contents, config)
+            except Exception as e:
+                if not (cached_content and self.prompt_cache.is_cache_error(e)):
+                    raise
+                logger.warning(f"⚠️ Cached prompt unavailable ({e}) - retrying with full prompt")
+                self.prompt_cache.invalidate(self.model_name, system_prompt)
+                contents, config, max_tok = self._prepare_request(
+                    system_prompt, user_prompt, response_format, temperature, max_tokens
+                )
+                response = await self._agenerate(contents, config)
+            result = self._parse_response(response, response_format, max_tok)
+            if cache_key:
+                get_llm_cache().set(cache_key, result, cache_ttl)
+            return result
+        except Exception as e:
+            return self._handle_error(e, response_format)
+
+    def _generate(self, contents: str, config: types.GenerateContentConfig) -> Any:
+        """generate_content through the shared Gemini rate limiter."""
+        with gemini_slot(self.model_name, estimate_tokens(contents)) as slot:
             response = self.client.models.generate_content(
                 model=self.model_name,
-                contents=full_prompt,
+                contents=contents,
                 config=config
             )
-            
-            # === DETAILED RESPONSE DEBUGGING ===
-            finish_reason = None
-            token_count = None
-            
-            # Check for finish reason and token usage
-            if hasattr(response, 'candidates') and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, 'finish_reason'):
-                    finish_reason = candidate.finish_reason
-                    logger.info(f"📥 LLM finish_reason: {finish_reason}")
-                    
-                    # Check if response was truncated
-                    if str(finish_reason).upper() in ['MAX_TOKENS', 'LENGTH', 'STOP_LIMIT']:
-                        logger.warning(f"⚠️ LLM RESPONSE TRUNCATED! finish_reason={finish_reason}. Consider increasing max_tokens (current: {max_tok})")
+            slot.record(response)
+        return response
+
+    async def _agenerate(self, contents: str, config: types.GenerateContentConfig) -> Any:
+        """Async variant of _generate."""
+        async with agemini_slot(self.model_name, estimate_tokens(contents)) as slot:
+            response = await self.client.aio.models.generate_content(
+                model=self.model_name,
+                contents=contents,
+                config=config
+            )
+            slot.record(response)
+        return response
+
+    def _cached_prefix(self, system_prompt: str) -> Optional[str]:
+        """Cached content name for a static system prompt, or None to send it inline."""
+        if self.prompt_cache is None:
+            return None
+        name = self.prompt_cache.get(self.model_name, system_prompt)
+        # The local stand-in only tracks the lifecycle; its names mean nothing to Gemini
+        return name if self.prompt_cache.provider_side else None
+
+    def _cache_lookup(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_format: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        cache_ttl: Optional[float]
+    ) -> Tuple[Optional[str], Any]:
+        """
+        Look the request up in the response cache.
+        
+        Returns:
+            (cache key, cached response). The key is None when the call is
+            not cacheable; the response is None on a miss.
+        """
+        cache = get_llm_cache() if cache_ttl else None
+        if cache is None:
+            return None, None
+        
+        cache_key = cache.make_key(
+            self.model_name,
+            system_prompt,
+            user_prompt,
+            temperature if temperature is not None else self.temperature,
+            response_format,
+            max_tokens if max_tokens is not None else self.max_tokens,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"📦 LLM cache hit: model={self.model_name}, key={cache_key[:12]}")
+        return cache_key, cached
+
+    def _prepare_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_format: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        cached_content: Optional[str] = None
+    ) -> Tuple[str, types.GenerateContentConfig, int]:
+        """Build the prompt and generation config shared by call_llm/acall_llm."""
+        temp = temperature if temperature is not None else self.temperature
+        max_tok = max_tokens if max_tokens is not None else self.max_tokens
+        
+        # Combine prompts (the system prompt is already on the server when cached)
+        full_prompt = user_prompt if cached_content else f"{system_prompt}\n\n{user_prompt}"
+        
+        logger.info(f"📤 LLM Request: model={self.model_name}, temperature={temp}, max_tokens={max_tok}, cached_prefix={bool(cached_content)}")
+        logger.debug(f"📤 Prompt length: {len(full_prompt)} chars")
+        
+        # Build config
+        config = types.GenerateContentConfig(
+            temperature=temp,
+            max_output_tokens=max_tok,
+            top_p=0.95,
+        )
+        if cached_content:
+            config.cached_content = cached_content
+        
+        # If JSON format requested, add instruction
+        if response_format == "json":
+            config.response_mime_type = "application/json"
+        
+        return full_prompt, config, max_tok
+
+    def _parse_response(self, response: Any, response_format: Optional[str], max_tok: int) -> Any:
+        """Log usage and extract text/JSON from a generate_content response."""
+        # === DETAILED RESPONSE DEBUGGING ===
+        finish_reason = None
+        token_count = None
+        
+        # Check for finish reason and token usage
+        if hasattr(response, 'candidates') and response.candidates:
+            candidate = response.candidates[0]
+            if hasattr(candidate, 'finish_reason'):
+                finish_reason = candidate.finish_reason
+                logger.info(f"📥 LLM finish_reason: {finish_reason}")
                 
-                # Try to get token count
-                if hasattr(candidate, 'token_count'):
-                    token_count = candidate.token_count
-                    logger.info(f"📥 LLM tokens used: {token_count}")
-            
-            # Check usage metadata if available
-            if hasattr(response, 'usage_metadata'):
-                usage = response.usage_metadata
-                if usage:
-                    prompt_tokens = getattr(usage, 'prompt_token_count', 'N/A')
-                    output_tokens = getattr(usage, 'candidates_token_count', 'N/A')
-                    total_tokens = getattr(usage, 'total_token_count', 'N/A')
-                    logger.info(f"📊 Token usage: prompt={prompt_tokens}, output={output_tokens}, total={total_tokens}")
-                    
-                    # Warn if output tokens is close to max
-                    if isinstance(output_tokens, int) and output_tokens >= max_tok * 0.95:
-                        logger.warning(f"⚠️ Output tokens ({output_tokens}) is at/near max_tokens limit ({max_tok})! Response likely truncated!")
-            
-            # Extract text - handle various response formats
-            response_text = ""
-            if hasattr(response, 'text') and response.text:
-                response_text = response.text
-            elif hasattr(response, 'candidates') and response.candidates:
-                # Try to get text from candidates
-                for candidate in response.candidates:
-                    if hasattr(candidate, 'content') and candidate.content:
-                        if hasattr(candidate.content, 'parts') and candidate.content.parts:
-                            for part in candidate.content.parts:
-                                if hasattr(part, 'text') and part.text:
-                                    response_text = part.text
-                                    break
-                    if response_text:
-                        break
-            
-            # Log response details
-            logger.info(f"📥 LLM Response: {len(response_text)} chars received")
-            logger.debug(f"📥 Response preview: {response_text[:200]}..." if len(response_text) > 200 else f"📥 Full response: {response_text}")
-            
-            # Safety check - ensure we have actual content
-            if not response_text or response_text.strip() == "":
-                logger.warning(f"⚠️ LLM returned empty response!")
-                logger.warning(f"Raw response object: {response}")
-                if response_format == "json":
-                    return {}
-                return ""
-            
-            # Check for incomplete responses (missing expected sections)
-            expected_sections = ["## 🎫 TICKET ANALYSIS", "## 🔧 PRODUCT IDENTIFICATION", "## 💡 SUGGESTED ACTIONS", "## 📝 SUGGESTED RESPONSE"]
-            missing_sections = [s for s in expected_sections if s not in response_text]
-            if missing_sections and response_format != "json":
-                logger.warning(f"⚠️ Response may be incomplete! Missing sections: {missing_sections}")
-                logger.warning(f"Response ends with: ...{response_text[-100:]}" if len(response_text) > 100 else f"Full response: {response_text}")
-            
-            # Parse JSON if requested
-            if response_format == "json":
-                try:
-                    return json.loads(response_text)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON response: {e}")
-                    logger.error(f"Raw response: {response_text}")
-                    # Return a safe default
-                    return {}
-            
-            return response_text
-            
-        except Exception as e:
-            error_str = str(e).lower()
-            logger.error(f"❌ Error calling LLM: {e}", exc_info=True)
-            
-            # For rate limit, quota, and 503 overload errors, raise the exception so caller can handle it
-            # These are transient errors that may succeed on retry
-            if any(indicator in error_str for indicator in ["429", "503", "resource_exhausted", "quota", "rate", "overloaded", "unavailable"]):
-                logger.error(f"🚨 Transient API error (rate limit/overload) - raising exception for retry handling")
-                raise  # Re-raise to let caller handle appropriately
+                # Check if response was truncated
+                if str(finish_reason).upper() in ['MAX_TOKENS', 'LENGTH', 'STOP_LIMIT']:
+                    logger.warning(f"⚠️ LLM RESPONSE TRUNCATED! finish_reason={finish_reason}. Consider increasing max_tokens (current: {max_tok})")
             
-            # For other errors, return safe defaults (backward compatibility)
+            # Try to get token count
+            if hasattr(candidate, 'token_count'):
+                token_count = candidate.token_count
+                logger.info(f"📥 LLM tokens used: {token_count}")
+        
+        # Check usage metadata if available
+        if hasattr(response, 'usage_metadata'):
+            usage = response.usage_metadata
+            if usage:
+                prompt_tokens = getattr(usage, 'prompt_token_count', 'N/A')
+                output_tokens = getattr(usage, 'candidates_token_count', 'N/A')
+                total_tokens = getattr(usage, 'total_token_count', 'N/A')
+                cached_tokens = getattr(usage, 'cached_content_token_count', None) or 0
+                logger.info(f"📊 Token usage: prompt={prompt_tokens} (cached={cached_tokens}), output={output_tokens}, total={total_tokens}")
+                
+                # Warn if output tokens is close to max
+                if isinstance(output_tokens, int) and output_tokens >= max_tok * 0.95:
+                    logger.warning(f"⚠️ Output tokens ({output_tokens}) is at/near max_tokens limit ({max_tok})! Response likely truncated!")
+        
+        # Extract text - handle various response formats
+        response_text = ""
+        if hasattr(response, 'text') and response.text:
+            response_text = response.text
+        elif hasattr(response, 'candidates') and response.candidates:
+            # Try to get text from candidates
+            for candidate in response.candidates:
+                if hasattr(candidate, 'content') and candidate.content:
+                    if hasattr(candidate.content, 'parts') and candidate.content.parts:
+                        for part in candidate.content.parts:
+                            if hasattr(part, 'text') and part.text:
+                                response_text = part.text
+                                break
+                if response_text:
+                    break
+        
+        # Log response details
+        logger.info(f"📥 LLM Response: {len(response_text)} chars received")
+        logger.debug(f"📥 Response preview: {response_text[:200]}..." if len(response_text) > 200 else f"📥 Full response: {response_text}")
+        
+        # Safety check - ensure we have actual content
+        if not response_text or response_text.strip() == "":
+            logger.warning(f"⚠️ LLM returned empty response!")
+            logger.warning(f"Raw response object: {response}")
             if response_format == "json":
                 return {}
-            return f"Error: {str(e)}"
+            return ""
+        
+        # Check for incomplete responses (missing expected sections)
+        expected_sections = ["## 🎫 TICKET ANALYSIS", "## 🔧 PRODUCT IDENTIFICATION", "## 💡 SUGGESTED ACTIONS", "## 📝 SUGGESTED RESPONSE"]
+        missing_sections = [s for s in expected_sections if s not in response_text]
+        if missing_sections and response_format != "json":
+            logger.warning(f"⚠️ Response may be incomplete! Missing sections: {missing_sections}")
+            logger.warning(f"Response ends with: ...{response_text[-100:]}" if len(response_text) > 100 else f"Full response: {response_text}")
+        
+        # Parse JSON if requested
+        if response_format == "json":
+            try:
+                return json.loads(response_text)
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse JSON response: {e}")
+                logger.error(f"Raw response: {response_text}")
+                # Return a safe default
+                return {}
+        
+        return response_text
+
+    def _handle_error(self, e: Exception, response_format: Optional[str]) -> Any:
+        """Re-raise transient errors for retry, otherwise return a safe default."""
+        error_str = str(e).lower()
+        logger.error(f"❌ Error calling LLM: {e}", exc_info=True)
+        
+        # For rate limit, quota, and 503 overload errors, raise the exception so caller can handle it
+        # These are transient errors that may succeed on retry
+        if any(indicator in error_str for indicator in ["429", "503", "resource_exhausted", "quota", "rate", "overloaded", "unavailable"]):
+            logger.error(f"🚨 Transient API error (rate limit/overload) - raising exception for retry handling")
+            raise e  # Re-raise to let caller handle appropriately
+        
+        # For other errors, return safe defaults (backward compatibility)
+        if response_format == "json":
+            return {}
+        return f"Error: {str(e)}"
     
     def generate_with_context(
         self,
@@ -242,3 +404,14 @@ def call_llm(
     """
     client = get_llm_client()
     return client.call_llm(system_prompt, user_prompt, response_format, temperature)
+
+
+async def acall_llm(
+    system_prompt: str,
+    user_prompt: str,
+    response_format: Optional[str] = None,
+    temperature: Optional[float] = None
+) -> Any:
+    """Async variant of call_llm()."""
+    client = get_llm_client()
+    return await client.acall_llm(system_prompt, user_prompt, response_format, temperature)
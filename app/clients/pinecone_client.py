@@ -11,6 +11,7 @@ from app.config.settings import settings
 from app.graph.state import RetrievalHit
 from app.utils.retry import retry_api_call
 from app.utils.pii_masker import mask_api_key
+from app.services.image_index import image_hit
 
 logger = logging.getLogger(__name__)
 
@@ -79,22 +80,7 @@ class PineconeClient:
             hits: List[RetrievalHit] = []
 
             for match in results.matches:
-                metadata = match.metadata or {}
-
-                # readable content summary
-                parts = []
-                for key in ["product_title", "model_no", "finish", "product_category"]:
-                    if key in metadata:
-                        parts.append(f"{key.capitalize()}: {metadata[key]}")
-
-                content = " | ".join(parts) if parts else "Product Match"
-
-                hits.append({
-                    "id": match.id,
-                    "score": match.score,
-                    "metadata": metadata,
-                    "content": content,
-                })
+                hits.append(image_hit(match.id, match.score, match.metadata or {}))
 
             return hits
 
@@ -102,6 +88,24 @@ class PineconeClient:
             logger.error(f"[Pinecone] Error querying images: {e}", exc_info=True)
             return []
 
+    # ---------------------------------------------------------
+    # Image Index Export (local mirror sync, with retry)
+    # ---------------------------------------------------------
+    def image_index_metric(self) -> str:
+        """Similarity metric of the image index ("cosine", "dotproduct", ...)."""
+        return self.pc.describe_index(self.image_index_name).metric
+
+    def list_image_ids(self, namespace: str = ""):
+        """Yield pages of vector ids in the image index."""
+        if not self.image_index:
+            raise RuntimeError("Image index not available")
+        yield from self.image_index.list(namespace=namespace)
+
+    @retry_api_call
+    def fetch_images(self, ids: List[str], namespace: str = "") -> Dict[str, Any]:
+        """Fetch vectors + metadata by id: {id: Vector(values, metadata)}."""
+        return self.image_index.fetch(ids=ids, namespace=namespace).vectors
+
     # ---------------------------------------------------------
     # Past Tickets Search (with retry)
     # ---------------------------------------------------------
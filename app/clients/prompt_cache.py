@@ -0,0 +1,258 @@
+"""
+Gemini Context Cache for Static System Prompts
+Keeps large fixed system prompts (REACT_SYSTEM_PROMPT, ENHANCED_DRAFT_RESPONSE_PROMPT,
+ROUTING_SYSTEM_PROMPT) in provider-side cached content so each call only
+sends the user prompt.
+
+One cache entry is created per (model, prompt text) - editing a prompt
+simply creates a new entry. Entries are refreshed shortly before their TTL
+runs out. Any failure (prompt below the provider's minimum size, quota,
+an entry expired server-side) falls back to sending the full prompt, so
+callers never see a difference in behaviour.
+
+LocalContextCacheBackend is an in-memory stand-in with the same lifecycle
+for offline runs and tests.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from google.genai import types
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+FAILED_RETRY_SECONDS = 600  # Don't retry creating a cache that just failed
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class GeminiContextCacheBackend:
+    """Cached content stored by the Gemini API (client.caches)."""
+
+    provider_side = True
+
+    def __init__(self, client):
+        self.client = client
+
+    def create(self, model: str, system_prompt: str, ttl_seconds: int, display_name: str) -> str:
+        cached = self.client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                display_name=display_name,
+                system_instruction=system_prompt,
+                ttl=f"{int(ttl_seconds)}s",
+            ),
+        )
+        return cached.name
+
+    def refresh(self, name: str, ttl_seconds: int) -> None:
+        self.client.caches.update(
+            name=name,
+            config=types.UpdateCachedContentConfig(ttl=f"{int(ttl_seconds)}s"),
+        )
+
+    def delete(self, name: str) -> None:
+        self.client.caches.delete(name=name)
+
+
+class LocalContextCacheBackend:
+    """
+    In-memory stand-in for offline use.
+
+    Mirrors the provider lifecycle (named entries that expire unless
+    refreshed) but requests still send the full prompt.
+    """
+
+    provider_side = False
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._counter = 0
+
+    def create(self, model: str, system_prompt: str, ttl_seconds: int, display_name: str) -> str:
+        self._counter += 1
+        name = f"local/cachedContents/{display_name}-{self._counter}"
+        self.entries[name] = {
+            "model": model,
+            "system_prompt": system_prompt,
+            "expires_at": self.clock() + ttl_seconds,
+        }
+        return name
+
+    def refresh(self, name: str, ttl_seconds: int) -> None:
+        entry = self.entries.get(name)
+        if entry is None or entry["expires_at"] <= self.clock():
+            self.entries.pop(name, None)
+            raise KeyError(f"CachedContent not found: {name}")
+        entry["expires_at"] = self.clock() + ttl_seconds
+
+    def delete(self, name: str) -> None:
+        self.entries.pop(name, None)
+
+
+# =============================================================================
+# MANAGER
+# =============================================================================
+
+@dataclass
+class _CacheEntry:
+    name: str
+    expires_at: float
+
+
+class PromptCacheManager:
+    """
+    Maps static system prompts to cached content names.
+
+    The fast path is a dict lookup; creating or refreshing an entry happens
+    at most once per prompt per TTL. The provider call runs outside the lock:
+    one caller does it while others for the same prompt wait on its Future
+    (or keep using the old entry while it is refreshed), and other prompts
+    are not held up.
+    """
+
+    def __init__(
+        self,
+        backend,
+        ttl_seconds: int = 3600,
+        refresh_margin_seconds: int = 300,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = min(refresh_margin_seconds, ttl_seconds // 2)
+        self.clock = clock
+
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._failed: Dict[str, float] = {}
+        self._pending: Dict[str, Future] = {}  # key -> create/refresh in progress
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "created": 0, "refreshed": 0, "invalidated": 0, "fallbacks": 0}
+
+    @property
+    def provider_side(self) -> bool:
+        """True when cache names can be sent to Gemini as cached_content."""
+        return self.backend.provider_side
+
+    @staticmethod
+    def prompt_key(model: str, system_prompt: str) -> str:
+        """Version key for a prompt: changes whenever the text or model does."""
+        return hashlib.sha256(f"{model}\0{system_prompt}".encode("utf-8")).hexdigest()[:16]
+
+    def get(self, model: str, system_prompt: str) -> Optional[str]:
+        """
+        Get the cached content name for a system prompt, creating or
+        refreshing the entry when needed.
+
+        Returns:
+            Cached content name, or None to send the full prompt
+        """
+        key = self.prompt_key(model, system_prompt)
+        leader = False
+
+        with self._lock:
+            now = self.clock()
+            entry = self._entries.get(key)
+
+            if entry and entry.expires_at - now > self.refresh_margin_seconds:
+                self.stats["hits"] += 1
+                return entry.name
+
+            pending = self._pending.get(key)
+            if pending is not None:
+                if entry and entry.expires_at > now:
+                    # Another caller is refreshing it; the entry is still valid
+                    self.stats["hits"] += 1
+                    return entry.name
+            elif not entry and now - self._failed.get(key, float("-inf")) < FAILED_RETRY_SECONDS:
+                self.stats["fallbacks"] += 1
+                return None
+            else:
+                pending = self._pending[key] = Future()
+                leader = True
+
+        if not leader:
+            return pending.result()  # Another caller is creating it right now
+
+        name = None
+        try:
+            name = self._refresh_or_create(key, entry, model, system_prompt)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.set_result(name)
+        return name
+
+    def _refresh_or_create(self, key: str, entry: Optional[_CacheEntry], model: str, system_prompt: str) -> Optional[str]:
+        """Provider calls for get(); runs without holding the lock."""
+        if entry:
+            try:
+                self.backend.refresh(entry.name, self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"[PROMPT_CACHE] Refresh failed for {entry.name}, recreating: {e}")
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+            else:
+                with self._lock:
+                    entry.expires_at = self.clock() + self.ttl_seconds
+                    self.stats["refreshed"] += 1
+                logger.info(f"[PROMPT_CACHE] Refreshed {entry.name} (+{self.ttl_seconds}s)")
+                return entry.name
+
+        try:
+            name = self.backend.create(model, system_prompt, self.ttl_seconds, f"flusso-{key}")
+        except Exception as e:
+            with self._lock:
+                self._failed[key] = self.clock()
+                self.stats["fallbacks"] += 1
+            logger.warning(f"[PROMPT_CACHE] Could not cache prompt {key} ({len(system_prompt)} chars) - sending full prompt: {e}")
+            return None
+
+        with self._lock:
+            self._entries[key] = _CacheEntry(name=name, expires_at=self.clock() + self.ttl_seconds)
+            self._failed.pop(key, None)
+            self.stats["created"] += 1
+        logger.info(f"[PROMPT_CACHE] Created {name} for prompt {key} ({len(system_prompt)} chars, ttl={self.ttl_seconds}s)")
+        return name
+
+    def invalidate(self, model: str, system_prompt: str) -> None:
+        """Forget a prompt's entry (e.g. the provider no longer knows it)."""
+        with self._lock:
+            if self._entries.pop(self.prompt_key(model, system_prompt), None):
+                self.stats["invalidated"] += 1
+
+    @staticmethod
+    def is_cache_error(error: Exception) -> bool:
+        """True if a generate call failed because the cached content is gone."""
+        text = str(error).lower()
+        return "cache" in text and any(s in text for s in ("not found", "expired", "404", "403", "permission"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"provider_side": self.provider_side, "entries": len(self._entries), **self.stats}
+
+
+def create_prompt_cache(client) -> Optional[PromptCacheManager]:
+    """Build the prompt cache configured in settings (None if disabled)."""
+    if not settings.llm_context_cache_enabled:
+        return None
+    if settings.llm_context_cache_backend == "local":
+        backend = LocalContextCacheBackend()
+    else:
+        backend = GeminiContextCacheBackend(client)
+    return PromptCacheManager(
+        backend,
+        ttl_seconds=settings.llm_context_cache_ttl_seconds,
+        refresh_margin_seconds=settings.llm_context_cache_refresh_margin_seconds,
+    )
@@ -4,7 +4,7 @@ Loads and validates all environment variables
 """
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -72,6 +72,32 @@ class Settings(BaseSettings):
     llm_file_search_model: str = "gemini-2.5-pro"  # More capable model for document search
     llm_temperature: float = 0.2
     llm_max_tokens: int = 8192  # Increased for complete structured responses
+
+    # Response cache for byte-identical prompts (webhook retries, debug replays)
+    llm_cache_enabled: bool = False
+    llm_cache_bypass: bool = False  # Skip cache reads (fresh responses are still stored)
+    llm_cache_path: str = ".cache/llm_responses"
+    llm_cache_size_mb: int = 512  # LRU eviction beyond this
+    # Per-call-site TTLs in seconds
+    llm_cache_ttl_routing: int = 86400
+    llm_cache_ttl_planner: int = 3600
+    llm_cache_ttl_react: int = 3600
+    llm_cache_ttl_draft_response: int = 3600
+    llm_cache_ttl_vip_compliance: int = 86400
+
+    # Shared Gemini rate limiter (per model; calls queue instead of hitting 429s)
+    gemini_rate_limit_enabled: bool = True
+    gemini_default_rpm: int = 1000
+    gemini_default_tpm: int = 1_000_000
+    gemini_max_concurrent: int = 32  # In-flight calls per model
+    # JSON overrides, e.g. {"gemini-2.5-pro": {"rpm": 150, "tpm": 2000000}}
+    gemini_model_limits: Dict[str, Dict[str, int]] = {}
+
+    # Gemini context caching for large static system prompts (falls back to inline prompts)
+    llm_context_cache_enabled: bool = True
+    llm_context_cache_backend: str = "gemini"  # "gemini" or "local" (offline stand-in)
+    llm_context_cache_ttl_seconds: int = 3600
+    llm_context_cache_refresh_margin_seconds: int = 300  # Refresh this long before expiry
     
     # ==========================================
     # CLIP SETTINGS (for image embeddings - 512 dimensions)
@@ -79,12 +105,29 @@ class Settings(BaseSettings):
     clip_model: str = "ViT-B-32"  # 512 dimensions for image index
     clip_pretrained: str = "openai"
     gpu_enabled: bool = False
+    clip_backend: str = "fp32"  # "fp32" or "int8" (dynamically quantized Linear layers, CPU only)
+    clip_num_threads: int = 0  # torch intra-op threads for CLIP inference; 0 = torch default
+    # Content-hash cache of image and query-text embeddings (on-disk LRU, shared by workers)
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = ".cache/embeddings"
+    embedding_cache_size_mb: int = 256
     
     # ==========================================
     # VISION PIPELINE SETTINGS
     # ==========================================
     vision_min_similarity_threshold: float = 0.75  # Minimum score to consider a match valid
     vision_category_validation: bool = True  # Enable LLM category validation
+    # Local mirror of the Pinecone image index (exact NumPy search over the synced CLIP vectors)
+    vision_local_index_mode: str = "off"  # "off", "fallback" (Pinecone down / no hits) or "primary"
+    vision_local_index_path: str = "data/image_index.bin"
+    vision_local_index_sync_hours: int = 24  # Re-sync from Pinecone in the background; 0 = sync job only
+    
+    # ==========================================
+    # PRODUCT CATALOG
+    # ==========================================
+    # What /debug/catalog/reload rebuilds from: JSON manifest or CSV sheet export
+    # (path or http(s) URL). None = the bundled manifest.
+    catalog_source: Optional[str] = None
     
     # ==========================================
     # PLANNING MODULE SETTINGS (Phase 1)
@@ -94,6 +137,15 @@ class Settings(BaseSettings):
     policy_refresh_interval_hours: int = 6  # How often to refresh policy cache
     planner_max_steps: int = 8  # Maximum steps in execution plan
     planner_llm_temperature: float = 0.1  # Low temp for consistent planning
+    # Start OCR / document analysis in fetch_ticket, overlapping routing and planning (cancelled on skip)
+    enable_attachment_preanalysis: bool = True
+    attachment_preanalysis_timeout: float = 60.0  # Max wait before iteration 1
+    # Per-ticket attachment blobs shared by extraction, OCR, document analysis and vision (one download each)
+    attachment_store_memory_mb: int = 256  # Beyond this, blobs spill to memory-mapped temp files
+    # PDF / DOCX / XLSX text extraction in a process pool (CPU bound, holds the GIL)
+    attachment_extraction_workers: int = 2  # 0 = extract in the graph thread
+    attachment_extraction_timeout: float = 60.0  # Per file, from when a worker picks it up
+    attachment_extraction_memory_mb: int = 1024  # Address-space cap per worker; 0 = no cap
     
     # ==========================================
     # VERTEX AI SETTINGS (production multimodal embeddings)
@@ -112,6 +164,30 @@ class Settings(BaseSettings):
     log_collector_api_key: Optional[str] = None  # API key for log collector
     enable_centralized_logging: bool = True  # Enable/disable centralized logging
     
+    # ==========================================
+    # TICKET WORK QUEUE
+    # ==========================================
+    ticket_queue_workers: int = 4  # Concurrent workflow runs per process
+    ticket_queue_max_size: int = 100  # Max tickets waiting + in-flight (>= ticket_queue_workers)
+    ticket_queue_admission_control: bool = True  # Return 429 + Retry-After when full
+    # Run the workflow with graph.ainvoke on the event loop. Workers are then
+    # coroutines, so ticket_queue_workers can be raised to the hundreds.
+    # Off by default (threaded workers); enabled explicitly per deployment.
+    workflow_async: bool = False
+
+    # Durable job journal (SQLite/WAL) replayed on startup.
+    # Put the path on a persistent volume to survive pod rescheduling.
+    ticket_journal_enabled: bool = True
+    ticket_journal_path: str = ".cache/ticket_journal.db"
+    ticket_journal_flush_ms: int = 50  # Batch window for status writes
+    ticket_journal_max_attempts: int = 3  # Replays before a job is marked failed
+
+    # LangGraph checkpoints (resume a crashed workflow at the last completed node).
+    # Off by default: enable only where workflow_checkpoint_path is on a persistent volume.
+    enable_workflow_checkpoints: bool = False
+    workflow_checkpoint_path: str = ".cache/workflow_checkpoints.db"
+    workflow_checkpoint_ttl_hours: int = 24  # Threads of crashed runs are pruned after this
+
     # ==========================================
     # AGENT CONSOLE
     # ==========================================
@@ -153,6 +229,24 @@ class Settings(BaseSettings):
         if self.image_retrieval_top_k < 1 or self.image_retrieval_top_k > 50:
             warnings.append(f"image_retrieval_top_k={self.image_retrieval_top_k} seems unusual (expected 1-50)")
         
+        if self.attachment_extraction_workers < 0:
+            errors.append(f"attachment_extraction_workers must be >= 0, got {self.attachment_extraction_workers}")
+        if self.clip_backend not in ("fp32", "int8"):
+            errors.append(f"clip_backend must be 'fp32' or 'int8', got {self.clip_backend}")
+        if self.clip_num_threads < 0:
+            errors.append(f"clip_num_threads must be >= 0, got {self.clip_num_threads}")
+        if self.vision_local_index_mode not in ("off", "fallback", "primary"):
+            errors.append(f"vision_local_index_mode must be 'off', 'fallback' or 'primary', got {self.vision_local_index_mode}")
+        
+        # Work queue validation
+        if self.ticket_queue_workers < 1:
+            errors.append(f"ticket_queue_workers must be >= 1, got {self.ticket_queue_workers}")
+        if self.ticket_queue_max_size < 1:
+            errors.append(f"ticket_queue_max_size must be >= 1, got {self.ticket_queue_max_size}")
+        elif self.ticket_queue_max_size < self.ticket_queue_workers:
+            errors.append(f"ticket_queue_max_size ({self.ticket_queue_max_size}) must be >= "
+                          f"ticket_queue_workers ({self.ticket_queue_workers}), it includes in-flight tickets")
+
         # Vertex AI validation
         if self.use_vertex_ai_embeddings:
             if not self.vertex_ai_project:
@@ -0,0 +1,347 @@
+"""
+Workflow Checkpointing
+Optional persistent LangGraph checkpointer so a crashed or timed-out
+workflow resumes from the last completed node instead of re-running
+routing, planning, the ReACT loop and every Gemini call.
+
+Checkpoints are keyed by thread_id = "<ticket_id>:<updated_at>", so a new
+Freshdesk update starts a fresh run while a retry of the same update
+resumes. An update without a real updated_at gets a unique thread id: it
+is never resumed (it cannot be told apart from a later update).
+
+Threads are deleted after a successful run; threads left by crashed runs
+are pruned once older than settings.workflow_checkpoint_ttl_hours (their
+start time is kept in the workflow_threads table).
+
+The async workflow (graph.ainvoke) needs AsyncSqliteSaver; use
+init_async_checkpointer() and arun_workflow() there.
+"""
+
+import logging
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langgraph.config import get_config
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# SQLite saver ships in the optional langgraph-checkpoint-sqlite package
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    import aiosqlite
+    SQLITE_SAVER_AVAILABLE = True
+except ImportError:
+    SqliteSaver = None
+    AsyncSqliteSaver = None
+    SQLITE_SAVER_AVAILABLE = False
+
+DEFAULT_CHECKPOINT_PATH = ".cache/workflow_checkpoints.db"
+PRUNE_INTERVAL_SECONDS = 3600
+
+# thread_id -> when its run started (checkpoint rows carry no timestamp)
+THREADS_TABLE_SQL = "CREATE TABLE IF NOT EXISTS workflow_threads (thread_id TEXT PRIMARY KEY, started_at REAL NOT NULL)"
+# Threads written before workflow_threads existed start their TTL now
+ADOPT_THREADS_SQL = (
+    "INSERT OR IGNORE INTO workflow_threads (thread_id, started_at) "
+    "SELECT DISTINCT thread_id, ? FROM checkpoints"
+)
+
+_checkpointer = None
+_conn: Optional[sqlite3.Connection] = None
+_async_conn = None
+_last_prune = 0.0
+
+
+def init_checkpointer(db_path: str = DEFAULT_CHECKPOINT_PATH):
+    """
+    Create the global SQLite checkpointer.
+
+    Returns:
+        Checkpointer instance, or None if the SQLite saver is not installed
+    """
+    global _checkpointer, _conn
+
+    if not SQLITE_SAVER_AVAILABLE:
+        logger.warning("[CHECKPOINT] langgraph-checkpoint-sqlite not installed - checkpointing disabled")
+        return None
+
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    # Worker threads share one connection; SqliteSaver serializes access with its own lock
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    _checkpointer = SqliteSaver(conn)
+    _checkpointer.setup()
+    _conn = conn
+    with _checkpointer.lock:
+        conn.execute(THREADS_TABLE_SQL)
+        conn.execute(ADOPT_THREADS_SQL, (time.time(),))
+        conn.commit()
+    prune_checkpoints()
+
+    logger.info(f"[CHECKPOINT] SQLite checkpointer ready: {db_path}")
+    return _checkpointer
+
+
+async def init_async_checkpointer(db_path: str = DEFAULT_CHECKPOINT_PATH):
+    """
+    Create the global checkpointer for the async workflow.
+    Must be called on the event loop that will run graph.ainvoke.
+
+    Returns:
+        Checkpointer instance, or None if the SQLite saver is not installed
+    """
+    global _checkpointer, _async_conn
+
+    if not SQLITE_SAVER_AVAILABLE:
+        logger.warning("[CHECKPOINT] langgraph-checkpoint-sqlite not installed - checkpointing disabled")
+        return None
+
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    _async_conn = await aiosqlite.connect(db_path)
+    await _async_conn.execute("PRAGMA journal_mode=WAL")
+    _checkpointer = AsyncSqliteSaver(_async_conn)
+    await _checkpointer.setup()
+    async with _checkpointer.lock:
+        await _async_conn.execute(THREADS_TABLE_SQL)
+        await _async_conn.execute(ADOPT_THREADS_SQL, (time.time(),))
+        await _async_conn.commit()
+    await aprune_checkpoints()
+
+    logger.info(f"[CHECKPOINT] Async SQLite checkpointer ready: {db_path}")
+    return _checkpointer
+
+
+async def close_async_checkpointer() -> None:
+    """Close the async checkpointer connection (call on shutdown)."""
+    global _checkpointer, _async_conn
+    if _async_conn is not None:
+        await _async_conn.close()
+        _async_conn = None
+        _checkpointer = None
+
+
+def get_checkpointer():
+    """Get the global checkpointer (None if disabled)."""
+    return _checkpointer
+
+
+def make_thread_id(ticket_id: str, updated_at: Optional[str] = None) -> str:
+    """
+    Build the checkpoint thread id for a ticket update.
+
+    Without updated_at the id is unique per call, so the run starts fresh
+    and never resumes another update's checkpoint.
+    """
+    if not updated_at:
+        return f"{ticket_id}:run-{uuid.uuid4().hex}"
+    return f"{ticket_id}:{updated_at}"
+
+
+def current_run_key(ticket_id: Any) -> str:
+    """
+    Key for in-process state of the workflow run calling this (call it from a
+    graph node): the run's thread id, or the ticket id when the graph was
+    invoked without one.
+    """
+    try:
+        thread_id = get_config().get("configurable", {}).get("thread_id")
+    except RuntimeError:  # Not inside a graph run
+        thread_id = None
+    return str(thread_id or ticket_id)
+
+
+def _thread_config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def delete_checkpoint(thread_id: str) -> bool:
+    """Delete all checkpoints for a thread. Returns True if deleted."""
+    if _checkpointer is None or not hasattr(_checkpointer, "delete_thread"):
+        return False
+    try:
+        _checkpointer.delete_thread(thread_id)
+        if _conn is not None:
+            with _checkpointer.lock:
+                _conn.execute("DELETE FROM workflow_threads WHERE thread_id = ?", (thread_id,))
+                _conn.commit()
+        return True
+    except Exception as e:
+        logger.warning(f"[CHECKPOINT] Failed to delete thread {thread_id}: {e}")
+        return False
+
+
+async def _adelete_checkpoint(thread_id: str) -> bool:
+    if _checkpointer is None or not hasattr(_checkpointer, "adelete_thread"):
+        return False
+    try:
+        await _checkpointer.adelete_thread(thread_id)
+        if _async_conn is not None:
+            async with _checkpointer.lock:
+                await _async_conn.execute("DELETE FROM workflow_threads WHERE thread_id = ?", (thread_id,))
+                await _async_conn.commit()
+        return True
+    except Exception as e:
+        logger.warning(f"[CHECKPOINT] Failed to delete thread {thread_id}: {e}")
+        return False
+
+
+def _record_thread(thread_id: str) -> None:
+    if _conn is None:
+        return
+    with _checkpointer.lock:
+        _conn.execute("INSERT OR IGNORE INTO workflow_threads (thread_id, started_at) VALUES (?, ?)", (thread_id, time.time()))
+        _conn.commit()
+
+
+async def _arecord_thread(thread_id: str) -> None:
+    if _async_conn is None:
+        return
+    async with _checkpointer.lock:
+        await _async_conn.execute("INSERT OR IGNORE INTO workflow_threads (thread_id, started_at) VALUES (?, ?)", (thread_id, time.time()))
+        await _async_conn.commit()
+
+
+def _prune_due() -> Optional[float]:
+    """Cutoff timestamp when a prune is due (at most once per PRUNE_INTERVAL_SECONDS), else None."""
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < PRUNE_INTERVAL_SECONDS:
+        return None
+    _last_prune = now
+    return now - settings.workflow_checkpoint_ttl_hours * 3600
+
+
+def prune_checkpoints(force: bool = False) -> int:
+    """
+    Delete threads older than workflow_checkpoint_ttl_hours (runs that crashed
+    and were never resumed). Returns the number of threads deleted.
+    """
+    global _last_prune
+    if force:
+        _last_prune = 0.0
+    cutoff = _prune_due() if _conn is not None else None
+    if cutoff is None:
+        return 0
+    with _checkpointer.lock:
+        rows = _conn.execute("SELECT thread_id FROM workflow_threads WHERE started_at < ?", (cutoff,)).fetchall()
+    expired: List[str] = [row[0] for row in rows]
+    for thread_id in expired:
+        delete_checkpoint(thread_id)
+    if expired:
+        logger.info(f"[CHECKPOINT] Pruned {len(expired)} expired thread(s)")
+    return len(expired)
+
+
+async def aprune_checkpoints(force: bool = False) -> int:
+    """Async variant of prune_checkpoints."""
+    global _last_prune
+    if force:
+        _last_prune = 0.0
+    cutoff = _prune_due() if _async_conn is not None else None
+    if cutoff is None:
+        return 0
+    async with _checkpointer.lock:
+        async with _async_conn.execute("SELECT thread_id FROM workflow_threads WHERE started_at < ?", (cutoff,)) as cursor:
+            rows = await cursor.fetchall()
+    expired: List[str] = [row[0] for row in rows]
+    for thread_id in expired:
+        await _adelete_checkpoint(thread_id)
+    if expired:
+        logger.info(f"[CHECKPOINT] Pruned {len(expired)} expired thread(s)")
+    return len(expired)
+
+
+def _status_from_snapshot(thread_id: str, snapshot) -> Dict[str, Any]:
+    exists = bool(snapshot.values)
+    next_nodes = list(snapshot.next or [])
+    return {
+        "thread_id": thread_id,
+        "exists": exists,
+        "next_nodes": next_nodes,
+        "resumable": exists and bool(next_nodes),
+    }
+
+
+def get_checkpoint_status(graph, thread_id: str) -> Dict[str, Any]:
+    """
+    Describe the saved progress of a thread.
+
+    Returns:
+        Dict with 'exists', 'next_nodes' and 'resumable'
+    """
+    if _checkpointer is None:
+        return {"thread_id": thread_id, "exists": False, "next_nodes": [], "resumable": False}
+
+    return _status_from_snapshot(thread_id, graph.get_state(_thread_config(thread_id)))
+
+
+async def aget_checkpoint_status(graph, thread_id: str) -> Dict[str, Any]:
+    """Async variant of get_checkpoint_status."""
+    if _checkpointer is None:
+        return {"thread_id": thread_id, "exists": False, "next_nodes": [], "resumable": False}
+
+    return _status_from_snapshot(thread_id, await graph.aget_state(_thread_config(thread_id)))
+
+
+def run_workflow(graph, initial_state: Dict[str, Any], thread_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the workflow, resuming from the last checkpoint when one exists.
+
+    Without a checkpointer this is a plain graph.invoke(); the thread id is
+    still passed so nodes can tell concurrent runs apart.
+
+    Args:
+        graph: Compiled LangGraph workflow
+        initial_state: Initial state (used only for a fresh run)
+        thread_id: Checkpoint thread id (see make_thread_id)
+
+    Returns:
+        Final workflow state
+    """
+    thread_id = thread_id or make_thread_id(initial_state.get("ticket_id"), initial_state.get("updated_at"))
+    config = _thread_config(thread_id)
+    if _checkpointer is None:
+        return graph.invoke(initial_state, config)  # thread_id still identifies the run to nodes
+    prune_checkpoints()
+
+    status = get_checkpoint_status(graph, thread_id)
+    if status["resumable"]:
+        logger.info(f"[CHECKPOINT] ♻️ Resuming {thread_id} at {status['next_nodes']}")
+        final_state = graph.invoke(None, config)
+    else:
+        if status["exists"]:
+            # Finished run that was never cleaned up - start over from a clean thread
+            delete_checkpoint(thread_id)
+        _record_thread(thread_id)
+        final_state = graph.invoke(initial_state, config)
+
+    delete_checkpoint(thread_id)
+    return final_state
+
+
+async def arun_workflow(graph, initial_state: Dict[str, Any], thread_id: Optional[str] = None) -> Dict[str, Any]:
+    """Async variant of run_workflow using graph.ainvoke."""
+    thread_id = thread_id or make_thread_id(initial_state.get("ticket_id"), initial_state.get("updated_at"))
+    config = _thread_config(thread_id)
+    if _checkpointer is None:
+        return await graph.ainvoke(initial_state, config)  # thread_id still identifies the run to nodes
+    await aprune_checkpoints()
+
+    status = await aget_checkpoint_status(graph, thread_id)
+    if status["resumable"]:
+        logger.info(f"[CHECKPOINT] ♻️ Resuming {thread_id} at {status['next_nodes']}")
+        final_state = await graph.ainvoke(None, config)
+    else:
+        if status["exists"]:
+            await _adelete_checkpoint(thread_id)
+        await _arecord_thread(thread_id)
+        final_state = await graph.ainvoke(initial_state, config)
+
+    await _adelete_checkpoint(thread_id)
+    return final_state
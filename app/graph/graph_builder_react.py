@@ -3,23 +3,25 @@ LangGraph Builder with ReACT Agent
 Simplified workflow: Fetch → Routing → ReACT Agent → Response → Update
 """
 
+import asyncio
 import logging
 from typing import Literal
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
 
 from app.graph.state import TicketState
 
 # Import nodes
-from app.nodes.fetch_ticket import fetch_ticket_from_freshdesk
-from app.nodes.routing_agent import classify_ticket_category
-from app.nodes.react_agent import react_agent_loop  # NEW
+from app.nodes.fetch_ticket import fetch_ticket_from_freshdesk, afetch_ticket_from_freshdesk
+from app.nodes.routing_agent import classify_ticket_category, aclassify_ticket_category
+from app.nodes.react_agent import react_agent_loop, areact_agent_loop  # NEW
 from app.nodes.customer_lookup import identify_customer_type
 from app.nodes.vip_rules import load_vip_rules
 # REMOVED: hallucination_guard and confidence_check (redundant - evidence_resolver handles this)
-from app.nodes.decisions.vip_compliance import verify_vip_compliance
-from app.nodes.response.draft_response import draft_final_response
+from app.nodes.decisions.vip_compliance import verify_vip_compliance, averify_vip_compliance
+from app.nodes.response.draft_response import draft_final_response, adraft_final_response
 from app.nodes.response.resolution_logic import decide_tags_and_resolution
-from app.nodes.freshdesk_update import update_freshdesk_ticket
+from app.nodes.freshdesk_update import update_freshdesk_ticket, aupdate_freshdesk_ticket
 from app.nodes.audit_log import write_audit_log
 from app.utils.audit import add_audit_event
 
@@ -108,10 +110,29 @@ def route_after_routing(state: TicketState) -> Literal["skip_handler", "react_ag
 # ---------------------------------------------------------------------
 
 
+def _io_node(func, afunc, name: str) -> RunnableLambda:
+    """
+    Node with sync and async bodies: invoke() runs func, ainvoke() awaits afunc.
+    """
+    return RunnableLambda(func, afunc=afunc, name=name)
+
+
+def _sync_node(func, name: str) -> RunnableLambda:
+    """
+    Node with only a sync body. ainvoke() would run a plain function inline
+    on the event loop, stalling every other ticket while it blocks (file
+    writes, log shipping): run it in a worker thread instead.
+    """
+    async def afunc(state):
+        return await asyncio.to_thread(func, state)
+
+    return RunnableLambda(func, afunc=afunc, name=name)
+
+
 # ---------------------------------------------------------------------
 #  BUILD REACT GRAPH
 # ---------------------------------------------------------------------
-def build_react_graph() -> StateGraph:
+def build_react_graph(checkpointer=None) -> StateGraph:
     """
     Build LangGraph workflow with ReACT agent.
     
@@ -119,30 +140,37 @@ def build_react_graph() -> StateGraph:
     fetch_ticket → routing → [skip_handler OR react_agent] → 
     customer_lookup → vip_rules → decisions → draft_response → 
     resolution_logic → freshdesk_update → audit_log
+
+    The compiled graph supports both invoke() and ainvoke(); I/O-bound nodes
+    have native async variants, the others run in a worker thread under ainvoke().
+
+    Args:
+        checkpointer: Optional LangGraph checkpointer (see app.graph.checkpointing).
+                      When set, invoke() requires a thread_id config.
     """
     logger.info("[GRAPH_BUILDER] Building ReACT-based workflow...")
     
     graph = StateGraph(TicketState)
     
     # ------------------- ADD NODES -------------------
-    graph.add_node("fetch_ticket", fetch_ticket_from_freshdesk)
-    graph.add_node("routing", classify_ticket_category)
-    graph.add_node("skip_handler", skip_ticket_handler)
+    graph.add_node("fetch_ticket", _io_node(fetch_ticket_from_freshdesk, afetch_ticket_from_freshdesk, "fetch_ticket"))
+    graph.add_node("routing", _io_node(classify_ticket_category, aclassify_ticket_category, "routing"))
+    graph.add_node("skip_handler", _sync_node(skip_ticket_handler, "skip_handler"))
     
     # NEW: ReACT Agent (replaces vision/text_rag/past_tickets/orchestration/context_builder)
-    graph.add_node("react_agent", react_agent_loop)
+    graph.add_node("react_agent", _io_node(react_agent_loop, areact_agent_loop, "react_agent"))
     
-    graph.add_node("customer_lookup", identify_customer_type)
-    graph.add_node("vip_rules", load_vip_rules)
+    graph.add_node("customer_lookup", _sync_node(identify_customer_type, "customer_lookup"))
+    graph.add_node("vip_rules", _sync_node(load_vip_rules, "vip_rules"))
     
     # REMOVED: hallucination_guard and confidence_check
     # Evidence resolver (in react_agent) now handles confidence assessment
-    graph.add_node("vip_compliance", verify_vip_compliance)
+    graph.add_node("vip_compliance", _io_node(verify_vip_compliance, averify_vip_compliance, "vip_compliance"))
     
-    graph.add_node("draft_response", draft_final_response)
-    graph.add_node("resolution_logic", decide_tags_and_resolution)
-    graph.add_node("freshdesk_update", update_freshdesk_ticket)
-    graph.add_node("audit_log", write_audit_log)
+    graph.add_node("draft_response", _io_node(draft_final_response, adraft_final_response, "draft_response"))
+    graph.add_node("resolution_logic", _sync_node(decide_tags_and_resolution, "resolution_logic"))
+    graph.add_node("freshdesk_update", _io_node(update_freshdesk_ticket, aupdate_freshdesk_ticket, "freshdesk_update"))
+    graph.add_node("audit_log", _sync_node(write_audit_log, "audit_log"))
     
     # ------------------- ENTRY POINT -------------------
     graph.set_entry_point("fetch_ticket")
@@ -183,7 +211,7 @@ def build_react_graph() -> StateGraph:
     graph.add_edge("audit_log", END)
     
     # ------------------- COMPILE -------------------
-    compiled_graph = graph.compile()
-    logger.info("[GRAPH_BUILDER] ReACT graph compiled successfully ✓")
+    compiled_graph = graph.compile(checkpointer=checkpointer)
+    logger.info(f"[GRAPH_BUILDER] ReACT graph compiled successfully ✓ (checkpointing={'on' if checkpointer else 'off'})")
     
     return compiled_graph
@@ -25,6 +25,7 @@ class ReACTIteration(TypedDict):
     tool_output: Dict[str, Any]          # Full tool result
     timestamp: float                      # When this happened
     duration: float                       # How long tool took
+    actions: List[Dict[str, Any]]         # Per-tool results when tools ran in parallel
 
 
 class TicketState(TypedDict, total=False):
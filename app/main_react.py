@@ -5,16 +5,52 @@ Webhook endpoint for Freshdesk ticket automation using intelligent ReACT loop
 
 import logging
 import hashlib
+import uuid
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, HTTPException, Response, BackgroundTasks
+from fastapi import FastAPI, Request, HTTPException, Response
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from diskcache import Cache
 
 from app.graph.graph_builder_react import build_react_graph
+from app.graph.checkpointing import (
+    init_checkpointer,
+    init_async_checkpointer,
+    close_async_checkpointer,
+    get_checkpointer,
+    make_thread_id,
+    run_workflow,
+    arun_workflow,
+    get_checkpoint_status,
+    aget_checkpoint_status,
+)
+from app.clients.freshdesk_client import aclose_freshdesk_client
+from app.clients.llm_client import get_llm_client
+from app.clients.llm_cache import get_llm_cache, bypass_llm_cache, close_llm_cache
+from app.clients.embedding_cache import get_embedding_cache, close_embedding_cache
+from app.utils.detailed_logger import bind_workflow_log_key
+from app.utils.attachment_store import get_attachment_store, release_run_attachments, close_attachment_store
+from app.utils.attachment_processor import shutdown_extraction_pool
+from app.utils.rate_limiter import get_gemini_limiter
 from app.graph.state import TicketState
 from app.utils.pii_masker import mask_email, mask_name
 from app.services.policy_service import init_policy_service
+from app.services.product_catalog import get_product_catalog, init_product_catalog
+from app.services.image_index import init_local_image_index, get_local_image_index
+from app.services.ticket_queue import (
+    init_ticket_queue,
+    get_ticket_queue,
+    shutdown_ticket_queue,
+    compute_priority,
+    TicketQueueFull,
+)
+from app.services.ticket_journal import (
+    init_ticket_journal,
+    get_ticket_journal,
+    shutdown_ticket_journal,
+)
+from app.nodes.customer_lookup import is_vip_customer
+from app.config.settings import settings
 
 # ---------------------------------------------------
 # LOGGING CONFIG
@@ -49,12 +85,74 @@ async def lifespan(app: FastAPI):
     init_policy_service()
     logger.info("✅ Policy service initialized and background sync started")
 
-    graph = build_react_graph()
+    # Product catalog (maps the snapshot built into the image, else indexes the JSON manifest)
+    if init_product_catalog():
+        logger.info(f"✅ Product catalog loaded (version {get_product_catalog().get_stats().get('version')})")
+    else:
+        logger.warning("⚠️ Product catalog failed to load; catalog lookups fall back to patterns")
+
+    # Optional checkpointer so interrupted workflows resume at the last completed node
+    checkpointer = None
+    if settings.enable_workflow_checkpoints:
+        if settings.workflow_async:
+            checkpointer = await init_async_checkpointer(settings.workflow_checkpoint_path)
+        else:
+            checkpointer = init_checkpointer(settings.workflow_checkpoint_path)
+
+    # Local mirror of the Pinecone image index (vision search fallback / primary backend)
+    if settings.vision_local_index_mode != "off":
+        init_local_image_index()
+        logger.info(f"✅ Local image index ready (mode={settings.vision_local_index_mode})")
+
+    graph = build_react_graph(checkpointer=checkpointer)
     logger.info("✅ LangGraph ReACT workflow initialized")
 
+    # Open durable job journal (survives restarts when the path is on a persistent volume)
+    journal = None
+    if settings.ticket_journal_enabled:
+        journal = init_ticket_journal(
+            db_path=settings.ticket_journal_path,
+            flush_interval=settings.ticket_journal_flush_ms / 1000.0,
+            max_attempts=settings.ticket_journal_max_attempts,
+        )
+        logger.info("✅ Ticket journal opened")
+
+    # Start ticket work queue (replaces BackgroundTasks)
+    queue = init_ticket_queue(
+        handler=aprocess_ticket_workflow if settings.workflow_async else process_ticket_workflow,
+        worker_count=settings.ticket_queue_workers,
+        max_size=settings.ticket_queue_max_size,
+        admission_control=settings.ticket_queue_admission_control,
+        journal=journal,
+    )
+    logger.info(f"✅ Ticket work queue started ({'async' if settings.workflow_async else 'threaded'} workflow)")
+
+    # Replay tickets that were queued or in flight when the last process died
+    if journal:
+        pending = journal.pending_jobs()
+        for job in pending:
+            queue.submit(
+                job["ticket_id"],
+                job["initial_state"],
+                priority=job["priority"],
+                job_id=job["job_id"],
+                replay=True,
+            )
+        if pending:
+            logger.info(f"♻️ Replayed {len(pending)} ticket(s) from journal")
+
     yield
 
     # Cleanup
+    shutdown_ticket_queue()
+    shutdown_ticket_journal()
+    if settings.workflow_async:
+        await close_async_checkpointer()
+        await aclose_freshdesk_client()
+    close_llm_cache()
+    close_embedding_cache()
+    close_attachment_store()
+    shutdown_extraction_pool()
     if webhook_cache:
         webhook_cache.close()
     logger.info("🛑 Shutting down Flusso Workflow Automation...")
@@ -120,6 +218,8 @@ async def deep_health_check():
         "components": {
             "graph": graph is not None,
             "cache": webhook_cache is not None,
+            "ticket_queue": get_ticket_queue() is not None,
+            "ticket_journal": get_ticket_journal() is not None,
         }
     }
     
@@ -132,9 +232,72 @@ async def deep_health_check():
             status["components"]["graph_nodes"] = False
             status["components"]["graph_error"] = str(e)
     
+    queue = get_ticket_queue()
+    if queue:
+        status["ticket_queue"] = queue.get_metrics()
+    
     return status
 
 
+@app.get("/health/queue")
+async def queue_metrics():
+    """Ticket work queue depth, wait-time and throughput metrics."""
+    queue = get_ticket_queue()
+    if not queue:
+        raise HTTPException(status_code=503, detail="Ticket queue not ready")
+    metrics = queue.get_metrics()
+    journal = get_ticket_journal()
+    if journal:
+        metrics["journal"] = journal.get_stats()
+    return metrics
+
+
+@app.get("/health/llm-cache")
+async def llm_cache_metrics():
+    """LLM response cache and Gemini context cache counters."""
+    prompt_cache = get_llm_client().prompt_cache
+    cache = get_llm_cache()
+    return {
+        "response_cache": {"enabled": True, "bypass": settings.llm_cache_bypass, **cache.get_stats()} if cache else {"enabled": False},
+        "context_cache": prompt_cache.get_stats() if prompt_cache else {"enabled": False},
+    }
+
+
+@app.get("/health/embedding-cache")
+async def embedding_cache_metrics():
+    """Image / query-text embedding cache counters."""
+    cache = get_embedding_cache()
+    return {"enabled": True, **cache.get_stats()} if cache else {"enabled": False}
+
+
+@app.get("/health/attachments")
+async def attachment_store_metrics():
+    """Per-ticket attachment blob store: downloads, shared reads, resident / spilled bytes."""
+    return get_attachment_store().get_stats()
+
+
+@app.get("/health/catalog")
+async def catalog_metrics():
+    """Product catalog version, size and last load (snapshot / json / csv)."""
+    return get_product_catalog().get_stats()
+
+
+@app.get("/health/image-index")
+async def image_index_metrics():
+    """Local image index mirror: mode, size, metric and last Pinecone sync."""
+    index = get_local_image_index() if settings.vision_local_index_mode != "off" else None
+    return {"mode": settings.vision_local_index_mode, **(index.get_stats() if index else {"loaded": False})}
+
+
+@app.get("/health/gemini")
+async def gemini_rate_limit_metrics():
+    """Shared Gemini limiter: per-model calls, wait time and remaining budget."""
+    limiter = get_gemini_limiter()
+    if not limiter:
+        return {"enabled": False}
+    return limiter.get_metrics()
+
+
 # ---------------------------------------------------
 # WEBHOOK DEDUPLICATION HELPERS
 # ---------------------------------------------------
@@ -158,30 +321,57 @@ def _is_duplicate_webhook(key: str, ttl_seconds: int = 30) -> bool:
 def process_ticket_workflow(ticket_id: str, initial_state: dict):
     """
     Process ticket workflow in the background.
-    This runs asynchronously after responding to Freshdesk.
+    Called by a ticket work queue worker after responding to Freshdesk.
+    Errors are re-raised so the queue can mark the journal entry failed.
     """
+    thread_id = make_thread_id(ticket_id, initial_state.get("updated_at"))
     try:
         logger.info(f"🎫 Background processing started for ticket #{ticket_id}")
         
-        # Run the ReACT workflow
-        final_state = graph.invoke(initial_state)
-        
-        # Extract key results
-        resolution = final_state.get("resolution_decision", "unknown")
-        react_iterations = final_state.get("react_total_iterations", 0)
-        react_status = final_state.get("react_status", "unknown")
-        product_identified = final_state.get("identified_product") is not None
-        
-        # Log PII-masked summary
-        requester = final_state.get("requester_email", "")
-        masked_email = mask_email(requester) if requester else "N/A"
-        logger.info(
-            f"✅ Ticket #{ticket_id} completed: {resolution} | "
-            f"ReACT: {react_iterations} iterations | Requester: {masked_email}"
-        )
+        # Run the ReACT workflow (resumes from checkpoint if a previous attempt died mid-run)
+        final_state = run_workflow(graph, initial_state, thread_id)
+        _log_workflow_result(ticket_id, final_state)
         
     except Exception as e:
         logger.error(f"❌ Background processing error for ticket #{ticket_id}: {e}", exc_info=True)
+        raise
+    finally:
+        release_run_attachments(thread_id)
+
+
+async def aprocess_ticket_workflow(ticket_id: str, initial_state: dict):
+    """
+    Async variant of process_ticket_workflow (graph.ainvoke on the event loop).
+    Called by an async ticket work queue worker.
+    """
+    thread_id = make_thread_id(ticket_id, initial_state.get("updated_at"))
+    try:
+        logger.info(f"🎫 Background processing started for ticket #{ticket_id}")
+
+        # All nodes of this run share the event-loop thread - key detailed logs by run
+        bind_workflow_log_key(f"{ticket_id}:{id(initial_state)}")
+
+        final_state = await arun_workflow(graph, initial_state, thread_id)
+        _log_workflow_result(ticket_id, final_state)
+
+    except Exception as e:
+        logger.error(f"❌ Background processing error for ticket #{ticket_id}: {e}", exc_info=True)
+        raise
+    finally:
+        release_run_attachments(thread_id)
+
+
+def _log_workflow_result(ticket_id: str, final_state: dict) -> None:
+    """Log a PII-masked summary of a finished workflow."""
+    resolution = final_state.get("resolution_decision", "unknown")
+    react_iterations = final_state.get("react_total_iterations", 0)
+
+    requester = final_state.get("requester_email", "")
+    masked_email = mask_email(requester) if requester else "N/A"
+    logger.info(
+        f"✅ Ticket #{ticket_id} completed: {resolution} | "
+        f"ReACT: {react_iterations} iterations | Requester: {masked_email}"
+    )
 
 
 # ---------------------------------------------------
@@ -202,15 +392,17 @@ async def webhook_verification():
 
 
 @app.post("/webhook")
-async def freshdesk_webhook(request: Request, background_tasks: BackgroundTasks):
+async def freshdesk_webhook(request: Request):
     """
     Main webhook endpoint for Freshdesk ticket events.
-    Responds immediately and processes ticket in background.
+    Responds immediately and hands the ticket to the work queue.
+    Returns 429 with Retry-After when the queue is full.
     """
     global graph
 
-    if not graph:
-        logger.error("Graph not initialized!")
+    queue = get_ticket_queue()
+    if not graph or not queue:
+        logger.error("Graph or ticket queue not initialized!")
         raise HTTPException(status_code=503, detail="Workflow graph not ready")
 
     try:
@@ -221,19 +413,32 @@ async def freshdesk_webhook(request: Request, background_tasks: BackgroundTasks)
         # Extract ticket_id from various formats
         ticket_id = None
         updated_at = None
+        # Optional hints for queue prioritization (not every payload has them)
+        priority = None
+        requester_email = ""
+        tags = []
 
         # Format 1: Direct ticket_id
         if "ticket_id" in body:
             ticket_id = str(body["ticket_id"])
+            priority = body.get("priority")
+            requester_email = body.get("requester_email", "")
+            tags = body.get("tags", [])
         # Format 2: freshdesk_webhook.ticket_id
         elif "freshdesk_webhook" in body:
             fd_data = body["freshdesk_webhook"]
             ticket_id = str(fd_data.get("ticket_id"))
             updated_at = fd_data.get("ticket_updated_at")
+            priority = fd_data.get("ticket_priority")
+            requester_email = fd_data.get("ticket_contact_email", "")
+            tags = fd_data.get("ticket_tags", [])
         # Format 3: Nested ticket object
         elif "ticket" in body:
             ticket_id = str(body["ticket"].get("id"))
             updated_at = body["ticket"].get("updated_at")
+            priority = body["ticket"].get("priority")
+            requester_email = (body["ticket"].get("requester") or {}).get("email", "")
+            tags = body["ticket"].get("tags", [])
 
         if not ticket_id:
             logger.warning("No ticket_id found in webhook payload")
@@ -254,6 +459,7 @@ async def freshdesk_webhook(request: Request, background_tasks: BackgroundTasks)
         # Initialize state
         initial_state: TicketState = {
             "ticket_id": ticket_id,
+            "updated_at": updated_at,
             "audit_events": [],
             # ReACT-specific initialization
             "react_iterations": [],
@@ -264,18 +470,40 @@ async def freshdesk_webhook(request: Request, background_tasks: BackgroundTasks)
             "gathered_past_tickets": [],
         }
 
-        # Add workflow processing to background tasks
-        background_tasks.add_task(process_ticket_workflow, ticket_id, initial_state)
-        
-        logger.info(f"✅ Ticket #{ticket_id} queued for processing")
+        # Freshdesk placeholders send tags as a comma-separated string
+        if isinstance(tags, str):
+            tags = [t.strip() for t in tags.split(",") if t.strip()]
+
+        # Hand off to the work queue
+        queue_priority = compute_priority(priority, is_vip_customer(requester_email, tags))
+        # Journal rows get their own id: the dedup key repeats for every update without updated_at
+        job_id = uuid.uuid4().hex
+        try:
+            queue_depth = queue.submit(ticket_id, initial_state, priority=queue_priority, job_id=job_id)
+        except TicketQueueFull as e:
+            # Forget the dedup key so Freshdesk's retry is not skipped
+            webhook_cache.delete(webhook_key)
+            return JSONResponse(
+                status_code=429,
+                headers={"Retry-After": str(e.retry_after)},
+                content={"status": "rejected", "reason": "queue_full", "ticket_id": ticket_id}
+            )
         
+        # Answer only once the ticket is journaled, so an accepted ticket survives a crash
+        journal = get_ticket_journal()
+        if journal and not await journal.wait_accepted(job_id):
+            logger.warning(f"⚠️ Ticket #{ticket_id} queued but not journaled (lost if the process restarts)")
+
+        logger.info(f"✅ Ticket #{ticket_id} queued for processing (priority={queue_priority}, depth={queue_depth})")
+
         # Return immediately to Freshdesk
         return JSONResponse(
             status_code=200,
             content={
                 "status": "accepted",
                 "message": "Request successfully received",
-                "ticket_id": ticket_id
+                "ticket_id": ticket_id,
+                "queue_depth": queue_depth
             }
         )
 
@@ -291,10 +519,11 @@ async def freshdesk_webhook(request: Request, background_tasks: BackgroundTasks)
 # DEBUG ENDPOINTS
 # ---------------------------------------------------
 @app.post("/debug/process/{ticket_id}")
-async def debug_process_ticket(ticket_id: str, dry_run: bool = False):
+async def debug_process_ticket(ticket_id: str, dry_run: bool = False, no_cache: bool = False):
     """
     Debug endpoint to manually process a ticket.
     Set dry_run=True to test without updating Freshdesk.
+    Set no_cache=True to skip cached LLM responses for this run.
     """
     global graph
 
@@ -318,12 +547,19 @@ async def debug_process_ticket(ticket_id: str, dry_run: bool = False):
         # Add flag to skip Freshdesk update
         initial_state["skip_freshdesk_update"] = True
 
+    thread_id = make_thread_id(ticket_id)  # Unique per debug run: never resumes another run
     try:
         import asyncio
-        final_state = await asyncio.wait_for(
-            asyncio.to_thread(graph.invoke, initial_state),
-            timeout=WORKFLOW_TIMEOUT
-        )
+        if settings.workflow_async:
+            bind_workflow_log_key(f"debug:{ticket_id}:{id(initial_state)}")
+            run = arun_workflow(graph, initial_state, thread_id)
+        else:
+            run = asyncio.to_thread(run_workflow, graph, initial_state, thread_id)
+        if no_cache:
+            with bypass_llm_cache():
+                final_state = await asyncio.wait_for(run, timeout=WORKFLOW_TIMEOUT)
+        else:
+            final_state = await asyncio.wait_for(run, timeout=WORKFLOW_TIMEOUT)
 
         # Extract ReACT reasoning chain for debugging
         react_chain = []
@@ -361,6 +597,73 @@ async def debug_process_ticket(ticket_id: str, dry_run: bool = False):
     except Exception as e:
         logger.error(f"Debug processing error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        release_run_attachments(thread_id)
+
+
+async def _checkpoint_status(thread_id: str) -> dict:
+    if settings.workflow_async:
+        return await aget_checkpoint_status(graph, thread_id)
+    import asyncio
+    return await asyncio.to_thread(get_checkpoint_status, graph, thread_id)
+
+
+@app.get("/debug/checkpoint/{ticket_id}")
+async def get_ticket_checkpoint(ticket_id: str, updated_at: str):
+    """
+    Show saved workflow progress for a ticket update.
+    Pass the same updated_at the webhook received (updates without one are
+    never checkpointed for resume).
+    """
+    if not graph:
+        raise HTTPException(status_code=503, detail="Workflow graph not ready")
+    if not get_checkpointer():
+        raise HTTPException(status_code=404, detail="Workflow checkpointing is disabled")
+
+    thread_id = make_thread_id(ticket_id, updated_at)
+    return await _checkpoint_status(thread_id)
+
+
+@app.post("/debug/resume/{ticket_id}")
+async def resume_ticket_workflow(ticket_id: str, updated_at: str):
+    """
+    Resume an interrupted workflow from its last checkpoint.
+    Runs through the work queue like a webhook so it respects worker limits.
+    """
+    queue = get_ticket_queue()
+    if not graph or not queue:
+        raise HTTPException(status_code=503, detail="Workflow graph not ready")
+    if not get_checkpointer():
+        raise HTTPException(status_code=404, detail="Workflow checkpointing is disabled")
+
+    thread_id = make_thread_id(ticket_id, updated_at)
+    status = await _checkpoint_status(thread_id)
+    if not status["resumable"]:
+        raise HTTPException(status_code=404, detail=f"No resumable checkpoint for {thread_id}")
+
+    initial_state: TicketState = {"ticket_id": ticket_id, "updated_at": updated_at}
+    try:
+        queue_depth = queue.submit(ticket_id, initial_state, priority=compute_priority())
+    except TicketQueueFull as e:
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": str(e.retry_after)},
+            content={"status": "rejected", "reason": "queue_full", "ticket_id": ticket_id}
+        )
+
+    return {"status": "resuming", "ticket_id": ticket_id, "next_nodes": status["next_nodes"], "queue_depth": queue_depth}
+
+
+@app.post("/debug/catalog/reload")
+async def reload_catalog():
+    """
+    Rebuild the product catalog in the background and swap it in.
+    Reads settings.catalog_source (never a caller-supplied path or URL); defaults to the bundled manifest.
+    Searches keep using the current catalog until the new one is ready.
+    """
+    catalog = get_product_catalog()
+    catalog.start_background_reload(settings.catalog_source)
+    return {"status": "reloading", "current_version": catalog.get_stats().get("version")}
 
 
 @app.get("/debug/react-iterations/{ticket_id}")
@@ -388,6 +691,15 @@ async def get_workflow_info():
         "version": "2.0.0",
         "max_iterations": 15,
         "timeout_seconds": WORKFLOW_TIMEOUT,
+        "ticket_queue": {
+            "workers": settings.ticket_queue_workers,
+            "max_size": settings.ticket_queue_max_size,
+            "admission_control": settings.ticket_queue_admission_control,
+        },
+        "workflow_checkpoints": get_checkpointer() is not None,
+        "workflow_async": settings.workflow_async,
+        "llm_cache": settings.llm_cache_enabled,
+        "embedding_cache": settings.embedding_cache_enabled,
         "available_tools": [
             "product_search_tool",
             "document_search_tool",
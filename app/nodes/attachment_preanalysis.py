@@ -0,0 +1,146 @@
+"""
+Speculative Attachment Pre-Analysis
+Starts OCR and document analysis as soon as fetch_ticket knows the
+attachments, so the work overlaps routing and planning instead of taking
+the agent's first ReACT iterations. Routing discards it when the ticket is
+skipped; react_agent collects the results and injects them into
+tool_results before iteration 1.
+
+Pending work lives in an in-process registry keyed by run - the workflow's
+checkpoint thread id, see current_run_key() - because futures cannot go into
+checkpointed state and two runs for the same ticket must not share or
+cancel each other's work. A run resumed in another process finds no entry
+and the agent runs the tools itself, as before.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.nodes.react_agent_helpers import _execute_tool, _tool_pool
+
+logger = logging.getLogger(__name__)
+STEP_NAME = "⚡ PRE_ANALYSIS"
+
+STALE_AFTER_SECONDS = 900  # Drop entries never collected (crashed or abandoned runs)
+
+# run_key -> (started_at, [(action, action_input, tool_results slots, future)])
+_pending: Dict[str, Tuple[float, List[Tuple[str, Dict[str, Any], Dict[str, Any], Future]]]] = {}
+_lock = threading.Lock()
+
+
+def _prune_stale(now: float) -> None:
+    for run_key in [t for t, (started, _) in _pending.items() if now - started > STALE_AFTER_SECONDS]:
+        for _, _, _, future in _pending.pop(run_key)[1]:
+            future.cancel()
+
+
+def start_preanalysis(run_key: str, ticket_images: List[str], attachments: List[Dict]) -> List[str]:
+    """
+    Submit OCR / document analysis for a run's ticket without waiting for it.
+
+    Uses the same inputs the agent would default to, so an identical call
+    from the agent later is recognised as a repeat.
+
+    Returns:
+        Names of the tools started
+    """
+    if not settings.enable_attachment_preanalysis:
+        return []
+
+    requested = []
+    if ticket_images:
+        requested.append(("ocr_image_analyzer_tool", {}))
+    if attachments:
+        requested.append(("multimodal_document_analyzer_tool", {}))
+    if not requested:
+        return []
+
+    jobs = []
+    for action, action_input in requested:
+        slots = {
+            "attachment_analysis": None,
+            "attachment_classification": None,
+            "multimodal_doc_analysis": None,
+            "ocr_image_analysis": None
+        }
+        future = _tool_pool.submit(
+            _execute_tool,
+            action=action,
+            action_input=dict(action_input),
+            ticket_images=ticket_images,
+            attachments=attachments,
+            tool_results=slots
+        )
+        jobs.append((action, action_input, slots, future))
+
+    now = time.time()
+    with _lock:
+        _prune_stale(now)
+        _discard_locked(str(run_key))
+        _pending[str(run_key)] = (now, jobs)
+
+    started = [action for action, _ in requested]
+    logger.info(f"{STEP_NAME} | Run {run_key}: started {', '.join(started)}")
+    return started
+
+
+def collect_preanalysis(run_key: str, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Wait for a run's pre-analysis and hand the results over.
+
+    Tools that do not finish within the timeout are dropped; the agent can
+    still call them itself.
+
+    Returns:
+        One dict per finished tool with action, action_input, tool_output,
+        observation and the tool_results slots it filled
+    """
+    with _lock:
+        entry = _pending.pop(str(run_key), None)
+    if entry is None:
+        return []
+
+    if timeout is None:
+        timeout = settings.attachment_preanalysis_timeout
+    deadline = time.time() + timeout
+
+    collected = []
+    for action, action_input, slots, future in entry[1]:
+        try:
+            tool_output, observation = future.result(timeout=max(0.0, deadline - time.time()))
+        except FutureTimeoutError:
+            logger.warning(f"{STEP_NAME} | Run {run_key}: {action} not ready after {timeout:.0f}s - leaving it to the agent")
+            future.cancel()
+            continue
+        except Exception as e:
+            logger.warning(f"{STEP_NAME} | Run {run_key}: {action} failed: {e}")
+            continue
+
+        collected.append({
+            "action": action,
+            "action_input": action_input,
+            "tool_output": tool_output,
+            "observation": observation,
+            "tool_results": {k: v for k, v in slots.items() if v is not None},
+        })
+
+    waited = time.time() - (deadline - timeout)
+    logger.info(f"{STEP_NAME} | Run {run_key}: collected {len(collected)}/{len(entry[1])} result(s), waited {waited:.2f}s")
+    return collected
+
+
+def _discard_locked(run_key: str) -> None:
+    entry = _pending.pop(run_key, None)
+    if entry:
+        for _, _, _, future in entry[1]:
+            future.cancel()
+
+
+def discard_preanalysis(run_key: str) -> None:
+    """Drop a run's pre-analysis (routing skipped the ticket)."""
+    with _lock:
+        _discard_locked(str(run_key))
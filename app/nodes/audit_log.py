@@ -13,6 +13,7 @@ from typing import Dict, Any
 from pathlib import Path
 
 from app.graph.state import TicketState
+from app.services.product_catalog import get_catalog_version
 from app.utils.detailed_logger import complete_workflow_log, get_current_log
 from app.utils.workflow_log_builder import build_workflow_log
 from app.utils.log_shipper import  ship_log
@@ -78,6 +79,7 @@ def write_audit_log(state: TicketState) -> Dict[str, Any]:
         "customer_type": state.get("customer_type"),
         "category": state.get("ticket_category"),
         "overall_confidence": state.get("overall_confidence", 0),
+        "catalog_version": get_catalog_version(),  # Product catalog data this ticket was answered from
         "metrics": {
             "enough_information": state.get("enough_information"),
             "hallucination_risk": state.get("hallucination_risk"),
@@ -5,7 +5,7 @@ Identifies customer type and basic metadata from email and tags.
 
 import logging
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from app.graph.state import TicketState
 from app.config.constants import CustomerType
@@ -13,6 +13,21 @@ from app.config.constants import CustomerType
 logger = logging.getLogger(__name__)
 STEP_NAME = "6️⃣ CUSTOMER_LOOKUP"
 
+# Simple VIP detection by domain (customize for your tenant)
+VIP_DOMAINS = ["@company.com", "@distributor.com"]
+
+
+def is_vip_customer(email: str = "", tags: List[str] = None) -> bool:
+    """
+    Cheap VIP check from requester email and ticket tags.
+    Shared with the webhook so the work queue can prioritize VIP tickets
+    before the graph runs.
+    """
+    email = email or ""
+    if any(d.lower() in email.lower() for d in VIP_DOMAINS):
+        return True
+    return "vip" in [str(t).lower() for t in (tags or [])]
+
 
 def identify_customer_type(state: TicketState) -> Dict[str, Any]:
     """
@@ -38,9 +53,8 @@ def identify_customer_type(state: TicketState) -> Dict[str, Any]:
     customer_type = CustomerType.NORMAL.value
     detection_reason = "default"
 
-    # Simple VIP detection by domain (customize for your tenant)
-    vip_domains = ["@company.com", "@distributor.com"]
-    if any(d.lower() in email.lower() for d in vip_domains):
+    # Simple VIP detection by domain
+    if any(d.lower() in email.lower() for d in VIP_DOMAINS):
         customer_type = CustomerType.VIP.value
         customer_metadata["account_tier"] = "VIP"
         detection_reason = f"VIP domain match: {email}"
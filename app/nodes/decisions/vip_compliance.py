@@ -9,7 +9,8 @@ from typing import Dict, Any
 
 from app.graph.state import TicketState
 from app.utils.audit import add_audit_event
-from app.clients.llm_client import call_llm
+from app.utils.node_steps import NodeSteps, run_steps, arun_steps, llm_call
+from app.config.settings import settings
 from app.config.constants import VIP_COMPLIANCE_PROMPT
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,15 @@ def verify_vip_compliance(state: TicketState) -> Dict[str, Any]:
     Writes:
       - vip_compliant: bool
     """
+    return run_steps(_verify_vip_compliance_steps(state))
+
+
+async def averify_vip_compliance(state: TicketState) -> Dict[str, Any]:
+    """Async variant for graph.ainvoke."""
+    return await arun_steps(_verify_vip_compliance_steps(state))
+
+
+def _verify_vip_compliance_steps(state: TicketState) -> NodeSteps:
     start_time = time.time()
     logger.info(f"{STEP_NAME} | ▶ Checking VIP compliance...")
 
@@ -70,10 +80,11 @@ VIP Rules:
         logger.info(f"{STEP_NAME} | 🔄 Calling LLM for compliance check...")
         llm_start = time.time()
         
-        response = call_llm(
+        response = yield llm_call(
             system_prompt=VIP_COMPLIANCE_PROMPT,
             user_prompt=user_prompt,
             response_format="json",
+            cache_ttl=settings.llm_cache_ttl_vip_compliance,
         )
         
         llm_duration = time.time() - llm_start
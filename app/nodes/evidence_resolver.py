@@ -8,6 +8,8 @@ import logging
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 
+from app.services.identifier_extractor import extract_identifiers, MODEL, PART
+
 logger = logging.getLogger(__name__)
 STEP_NAME = "🔍 EVIDENCE_RESOLVER"
 
@@ -144,31 +146,13 @@ def analyze_evidence(
     # 4. Check for document corroboration
     doc_mentioned_models = set()
     if document_results:
-        for doc in document_results:
-            # Extract model numbers mentioned in docs
-            title = doc.get("title", "") or ""
-            content = doc.get("content_preview", "") or doc.get("content", "") or ""
-            
-            # Simple extraction - look for model patterns in document titles/content
-            import re
-            # Improved patterns for Flusso model numbers
-            patterns = [
-                r'\b(\d{3}\.\d{4}[A-Z]{0,3})\b',    # 100.1050SB, 100.2420NB
-                r'\b(\d{3}\.\d{3,4})[_\-\s]',       # 100.2420_ from filenames like 100.2420_253.pdf
-                r'[/\\](\d{3}\.\d{3,4}[A-Z]{0,3})', # Extract from paths
-                r'\b(\d{3}\.\d+[A-Z]*)\b',          # 160.6CSA (fallback)
-            ]
-            
-            # First, try to extract from filename patterns like "100.2420_253.pdf"
-            filename_pattern = r'(\d{3}\.\d{3,4}[A-Z]{0,3})(?:_\d+)?\.pdf'
-            filename_match = re.search(filename_pattern, title, re.IGNORECASE)
-            if filename_match:
-                doc_mentioned_models.add(filename_match.group(1).upper())
-            
-            # Then try other patterns
-            for pattern in patterns:
-                found = re.findall(pattern, title + " " + content, re.IGNORECASE)
-                doc_mentioned_models.update([m.upper() for m in found])
+        # Model numbers mentioned in doc titles (filenames like "100.2420_253.pdf") and content,
+        # all documents scanned in one pass
+        doc_text = "\n".join(
+            (doc.get("title", "") or "") + " " + (doc.get("content_preview", "") or doc.get("content", "") or "")
+            for doc in document_results
+        )
+        doc_mentioned_models.update(extract_identifiers(doc_text).values(MODEL, PART))
     
     if doc_mentioned_models:
         logger.info(f"{STEP_NAME} | Documents mention models: {doc_mentioned_models}")
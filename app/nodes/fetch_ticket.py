@@ -11,7 +11,11 @@ from typing import Dict, Any
 from app.graph.state import TicketState
 from app.utils.audit import add_audit_event
 from app.utils.attachment_processor import process_all_attachments
+from app.utils.attachment_store import open_run_attachments
 from app.clients.freshdesk_client import get_freshdesk_client
+from app.graph.checkpointing import current_run_key
+from app.nodes.attachment_preanalysis import start_preanalysis
+from app.utils.node_steps import NodeSteps, run_steps, arun_steps, freshdesk_call, blocking_call
 from app.utils.pii_masker import mask_email, mask_name
 from app.utils.detailed_logger import (
     start_workflow_log, log_node_start, log_node_complete, get_current_log
@@ -23,6 +27,15 @@ STEP_NAME = "1️⃣ FETCH_TICKET"
 
 
 def fetch_ticket_from_freshdesk(state: TicketState) -> Dict[str, Any]:
+    return run_steps(_fetch_ticket_steps(state))
+
+
+async def afetch_ticket_from_freshdesk(state: TicketState) -> Dict[str, Any]:
+    """Async variant for graph.ainvoke."""
+    return await arun_steps(_fetch_ticket_steps(state))
+
+
+def _fetch_ticket_steps(state: TicketState) -> NodeSteps:
     start_time = time.time()
     
     raw_id = state.get("ticket_id")
@@ -46,7 +59,7 @@ def fetch_ticket_from_freshdesk(state: TicketState) -> Dict[str, Any]:
 
     try:
         client = get_freshdesk_client()
-        ticket = client.get_ticket(ticket_id, params={"include": "company,stats"})
+        ticket = yield freshdesk_call("get_ticket", ticket_id, params={"include": "company,stats"})
         data = client.extract_ticket_data(ticket)
 
         # Check if already processed
@@ -88,8 +101,14 @@ def fetch_ticket_from_freshdesk(state: TicketState) -> Dict[str, Any]:
         raw_attachments = data.get("attachments", [])
         logger.info(f"{STEP_NAME} | 📎 Found {len(raw_attachments)} attachment(s)")
         
+        # Every stage reads these through the attachment store: one download per ticket
+        open_run_attachments(current_run_key(ticket_id), [
+            att.get("attachment_url") or att.get("url")
+            for att in raw_attachments if isinstance(att, dict)
+        ])
+        
         # Process attachments for text extraction
-        attachment_result = process_all_attachments(raw_attachments)
+        attachment_result = yield blocking_call(process_all_attachments, raw_attachments)
         
         images = attachment_result["images"]
         has_image = len(images) > 0
@@ -122,6 +141,8 @@ def fetch_ticket_from_freshdesk(state: TicketState) -> Dict[str, Any]:
         
         logger.info(f"{STEP_NAME} | 📎 Prepared {len(document_attachments)} document attachment(s) for tools")
 
+        # Start OCR / document analysis now so it overlaps routing and planning
+        start_preanalysis(current_run_key(ticket_id), images, document_attachments)
         updates = {
             "ticket_subject": data.get("subject", ""),
             "ticket_text": combined_text,
@@ -9,14 +9,14 @@ from typing import Dict, Any
 
 from app.graph.state import TicketState
 from app.utils.audit import add_audit_event
-from app.clients.freshdesk_client import get_freshdesk_client
+from app.utils.node_steps import NodeSteps, run_steps, arun_steps, freshdesk_call
 from app.config.constants import ResolutionStatus
 
 logger = logging.getLogger(__name__)
 STEP_NAME = "1️⃣6️⃣ FRESHDESK_UPDATE"
 
 
-def _handle_skipped_ticket(state: TicketState, ticket_id: int, start_time: float) -> Dict[str, Any]:
+def _handle_skipped_ticket(state: TicketState, ticket_id: int, start_time: float) -> NodeSteps:
     """
     Handle tickets that skipped the full workflow (PO, auto-reply, spam, already_processed).
     Only adds private note + tags, no public response.
@@ -49,14 +49,12 @@ def _handle_skipped_ticket(state: TicketState, ticket_id: int, start_time: float
             )["audit_events"],
         }
     
-    client = get_freshdesk_client()
-    
     try:
         # Add private note explaining why skipped
         if private_note:
             logger.info(f"{STEP_NAME} | 📝 Adding skip private note")
             note_start = time.time()
-            client.add_note(ticket_id, private_note, private=True)
+            yield freshdesk_call("add_note", ticket_id, private_note, private=True)
             logger.info(f"{STEP_NAME} | ✓ Private note added in {time.time() - note_start:.2f}s")
         
         # Update tags (merge with existing)
@@ -67,7 +65,7 @@ def _handle_skipped_ticket(state: TicketState, ticket_id: int, start_time: float
         if suggested_tags:
             logger.info(f"{STEP_NAME} | 🏷 Updating tags: {old_tags} + {suggested_tags} → {merged_tags}")
             tags_start = time.time()
-            client.update_ticket(ticket_id, tags=merged_tags)
+            yield freshdesk_call("update_ticket", ticket_id, tags=merged_tags)
             logger.info(f"{STEP_NAME} | ✓ Tags updated in {time.time() - tags_start:.2f}s")
         else:
             logger.info(f"{STEP_NAME} | 🏷 No new tags to add, skipping tag update")
@@ -109,6 +107,15 @@ def _handle_skipped_ticket(state: TicketState, ticket_id: int, start_time: float
 
 def update_freshdesk_ticket(state: TicketState) -> Dict[str, Any]:
     """Final step → push replies + tags to Freshdesk."""
+    return run_steps(_update_freshdesk_steps(state))
+
+
+async def aupdate_freshdesk_ticket(state: TicketState) -> Dict[str, Any]:
+    """Async variant for graph.ainvoke."""
+    return await arun_steps(_update_freshdesk_steps(state))
+
+
+def _update_freshdesk_steps(state: TicketState) -> NodeSteps:
     start_time = time.time()
     logger.info(f"{STEP_NAME} | ▶ Starting Freshdesk update...")
 
@@ -121,15 +128,13 @@ def update_freshdesk_ticket(state: TicketState) -> Dict[str, Any]:
     skip_workflow_applied = state.get("skip_workflow_applied", False)
     
     if skip_workflow_applied:
-        return _handle_skipped_ticket(state, ticket_id, start_time)
+        return (yield from _handle_skipped_ticket(state, ticket_id, start_time))
 
     status = state.get("resolution_status", ResolutionStatus.AI_UNRESOLVED.value)
     reply_text = state.get("final_response_public") or ""
 
     logger.info(f"{STEP_NAME} | 📥 Input: ticket_id={ticket_id}, status='{status}', reply_len={len(reply_text)}")
 
-    client = get_freshdesk_client()
-
     try:
         # ---------------- ALL AI RESPONSES ARE PRIVATE NOTES ----------------
         # Human agents review and send public responses manually
@@ -162,7 +167,7 @@ def update_freshdesk_ticket(state: TicketState) -> Dict[str, Any]:
             logger.info(f"{STEP_NAME} | 📝 Adding PRIVATE note (AI draft for agent review)")
 
         note_start = time.time()
-        client.add_note(ticket_id, note_text, private=True)
+        yield freshdesk_call("add_note", ticket_id, note_text, private=True)
         logger.info(f"{STEP_NAME} | ✓ Private note added in {time.time() - note_start:.2f}s")
         note_type = "private"
 
@@ -173,7 +178,7 @@ def update_freshdesk_ticket(state: TicketState) -> Dict[str, Any]:
 
         logger.info(f"{STEP_NAME} | 🏷 Updating tags: {old_tags} + {extra_tags} → {merged_tags}")
         tags_start = time.time()
-        client.update_ticket(ticket_id, tags=merged_tags)
+        yield freshdesk_call("update_ticket", ticket_id, tags=merged_tags)
         logger.info(f"{STEP_NAME} | ✓ Tags updated in {time.time() - tags_start:.2f}s")
 
         duration = time.time() - start_time
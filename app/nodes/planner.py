@@ -9,10 +9,11 @@ import time
 from typing import Dict, Any, List, Optional
 
 from app.graph.state import TicketState
-from app.clients.llm_client import get_llm_client
+from app.utils.node_steps import NodeSteps, run_steps, llm_call
 from app.services.policy_service import get_relevant_policy, get_policy_for_category
 from app.config.settings import settings
 from app.utils.audit import add_audit_event
+from app.services.identifier_extractor import extract_identifiers, MODEL, PART, CODE
 
 logger = logging.getLogger(__name__)
 STEP_NAME = "🧠 PLANNER"
@@ -133,22 +134,7 @@ Respond ONLY with valid JSON in this exact format:
 # ===============================
 def _extract_model_numbers(text: str) -> List[str]:
     """Extract potential model numbers from text."""
-    import re
-    
-    # Common patterns for model numbers
-    patterns = [
-        r'\b\d{3}\.\d{4}(?:-[A-Z]+)?\b',  # 100.1170, 100.1170-PC
-        r'\b[A-Z]{2}\d{4}[A-Z]{0,2}\b',    # HS6270MB, HS1006
-        r'\b\d{3}\.\d{4}-\d{4}\b',          # 160.1168-9862
-        r'\b[A-Z]{2,3}-?\d{3,4}-?[A-Z]{0,3}\b',  # HS-6270-MB
-    ]
-    
-    found = []
-    for pattern in patterns:
-        matches = re.findall(pattern, text.upper())
-        found.extend(matches)
-    
-    return list(set(found))
+    return extract_identifiers(text).values(MODEL, PART, CODE)
 
 
 def _quick_classify(state: TicketState) -> str:
@@ -339,6 +325,11 @@ def create_execution_plan(state: TicketState) -> Dict[str, Any]:
         - complexity: simple/moderate/complex
         - confidence: Planning confidence score
     """
+    return run_steps(create_execution_plan_steps(state))
+
+
+def create_execution_plan_steps(state: TicketState) -> NodeSteps:
+    """Step generator behind create_execution_plan (see app.utils.node_steps)."""
     start_time = time.time()
     logger.info(f"{STEP_NAME} | ▶ Starting execution planning...")
     
@@ -390,17 +381,16 @@ def create_execution_plan(state: TicketState) -> Dict[str, Any]:
     
     # Step 4: Call LLM for planning
     try:
-        llm = get_llm_client()
-        
         logger.info(f"{STEP_NAME} | 🔄 Calling LLM for planning...")
         llm_start = time.time()
         
-        response = llm.call_llm(
+        response = yield llm_call(
             system_prompt="You are a ticket analysis and planning expert. Respond only with valid JSON. Keep responses concise.",
             user_prompt=prompt,
             response_format="json",
             temperature=0.1,  # Low temperature for consistent planning
-            max_tokens=4096  # Increased from 2048 to avoid truncation
+            max_tokens=4096,  # Increased from 2048 to avoid truncation
+            cache_ttl=settings.llm_cache_ttl_planner
         )
         
         llm_duration = time.time() - llm_start
@@ -10,21 +10,26 @@ import json
 from typing import Dict, Any, List
 
 from app.graph.state import TicketState, ReACTIteration
-from app.clients.llm_client import get_llm_client
+from app.utils.node_steps import NodeSteps, run_steps, arun_steps, llm_call, blocking_call
 from app.utils.audit import add_audit_event
 from app.config.settings import settings
 
 from app.nodes.react_agent_helpers import (
     _build_agent_context,
     _execute_tool,
+    _execute_tools_parallel,
+    _parse_actions,
     _populate_legacy_fields,
 
 )
 
+from app.graph.checkpointing import current_run_key
+from app.nodes.attachment_preanalysis import collect_preanalysis
+
 # Planning module import
 try:
     from app.nodes.planner import (
-        create_execution_plan, 
+        create_execution_plan_steps,
         get_plan_context_for_agent,
         should_follow_plan_step
     )
@@ -192,6 +197,8 @@ This prevents:
    • Keyword search: query="floor mount tub faucet chrome"
    • Category filter: category="Bathing" or "Kitchen" or "Showering"
    • Collection filter: collection="Serie 100" or "Universal Fixtures"
+   • Finish filter: finish="Matte Black" or "MB"
+   • Combined filters: category="Kitchen", finish="Matte Black", collection="Serie 100"
    
    DATA RETURNED:
    • Product: model_no, title, category, sub_category, collection
@@ -376,6 +383,17 @@ For tool calls:
     "action_input": {{"key": "value", "another_key": "value"}}
 }}
 
+For independent tool calls that can run at the same time (up to 4):
+{{
+    "thought": "Step-by-step reasoning of what I know and what I need...",
+    "actions": [
+        {{"action": "product_search_tool", "action_input": {{"query": "100.1170"}}}},
+        {{"action": "past_tickets_search_tool", "action_input": {{"query": "leaking cartridge"}}}}
+    ]
+}}
+- Only batch tools whose inputs do NOT depend on each other's results.
+- Never put finish_tool in "actions" - call it alone.
+
 For finishing:
 {{
     "thought": "Summary of reasoning and information gathered...",
@@ -420,6 +438,19 @@ def react_agent_loop(state: TicketState) -> Dict[str, Any]:
     Main ReACT agent loop with IMPROVED stopping logic.
     Enhanced with Planning Module for better tool orchestration.
     """
+    return run_steps(_react_agent_steps(state))
+
+
+async def areact_agent_loop(state: TicketState) -> Dict[str, Any]:
+    """
+    Async variant for graph.ainvoke.
+    Gemini calls are awaited natively; tools (Pinecone, CLIP, file search)
+    run on the default thread pool.
+    """
+    return await arun_steps(_react_agent_steps(state))
+
+
+def _react_agent_steps(state: TicketState) -> NodeSteps:
     start_time = time.time()
     logger.info(f"{STEP_NAME} | ▶ Starting ReACT agent loop")
     
@@ -444,7 +475,7 @@ def react_agent_loop(state: TicketState) -> Dict[str, Any]:
     if PLANNER_AVAILABLE and planner_enabled:
         logger.info(f"{STEP_NAME} | 🧠 Running execution planner...")
         try:
-            execution_plan = create_execution_plan(state)
+            execution_plan = yield from create_execution_plan_steps(state)
             
             if execution_plan and execution_plan.get("execution_plan"):
                 plan_context = get_plan_context_for_agent(execution_plan, current_plan_step)
@@ -509,11 +540,53 @@ def react_agent_loop(state: TicketState) -> Dict[str, Any]:
     vision_relevance_reason = ""
     vision_products = []  # Products found specifically via vision_search_tool
     
-    llm = get_llm_client()
-    
     # Track what we've tried to avoid repetition
     tools_used = set()
     
+    # ========================================
+    # SPECULATIVE ATTACHMENT PRE-ANALYSIS
+    # ========================================
+    # Started by fetch_ticket; usually finished by now because it ran
+    # alongside routing and the planner
+    preanalysis = yield blocking_call(collect_preanalysis, current_run_key(ticket_id))
+    if preanalysis:
+        for pre in preanalysis:
+            tool_results.update(pre["tool_results"])
+            tools_used.add(f"{pre['action']}:{json.dumps(pre['action_input'], sort_keys=True)}")
+            tool_output = pre["tool_output"]
+            if not tool_output.get("success"):
+                continue
+            if pre["action"] == "ocr_image_analyzer_tool":
+                for result in tool_output.get("results", []):
+                    img_url = result.get("image_url")
+                    if img_url and img_url not in gathered_images:
+                        gathered_images.append(img_url)
+            elif pre["action"] == "multimodal_document_analyzer_tool":
+                for doc in tool_output.get("documents", []):
+                    if isinstance(doc, dict):
+                        gathered_documents.append({
+                            "id": doc.get("filename", "Unknown Document"),
+                            "title": doc.get("filename", "Unknown Document"),
+                            "content_preview": doc.get("extracted_info", {}).get("text", "")[:500]
+                        })
+        
+        pre_record: ReACTIteration = {
+            "iteration": 0,
+            "thought": "Attachments analyzed up front (ran during routing and planning)",
+            "action": " + ".join(pre["action"] for pre in preanalysis),
+            "action_input": {"batch": [{"action": pre["action"], "action_input": pre["action_input"]} for pre in preanalysis]},
+            "observation": "\n\n".join(f"[{pre['action']}] {pre['observation']}" for pre in preanalysis),
+            "tool_output": {"parallel": True, "success": any(pre["tool_output"].get("success") for pre in preanalysis)},
+            "actions": [
+                {k: pre[k] for k in ("action", "action_input", "observation", "tool_output")}
+                for pre in preanalysis
+            ],
+            "timestamp": time.time(),
+            "duration": 0.0
+        }
+        iterations.append(pre_record)  # Iteration 0: not counted against MAX_ITERATIONS
+        logger.info(f"{STEP_NAME} | ⚡ Injected pre-analysis: {pre_record['action']}")
+    
     for iteration_num in range(1, MAX_ITERATIONS + 1):
         logger.info(f"\n{STEP_NAME} | ═══ ITERATION {iteration_num}/{MAX_ITERATIONS} ═══")
         
@@ -603,12 +676,14 @@ NOTE: You may deviate from the plan based on tool results. The plan is a guide,
             iteration_start = time.time()
             
             logger.info(f"{STEP_NAME} | 🧠 Calling Gemini for reasoning...")
-            response = llm.call_llm(
+            response = yield llm_call(
                 system_prompt=REACT_SYSTEM_PROMPT,
                 user_prompt=agent_context,
                 response_format="json",
                 temperature=0.2,  # Lower temperature for more consistent decisions
-                max_tokens=settings.llm_max_tokens
+                max_tokens=settings.llm_max_tokens,
+                cache_ttl=settings.llm_cache_ttl_react,
+                cache_system_prompt=True  # Static prompt re-sent on every iteration
             )
             
             if not isinstance(response, dict):
@@ -616,211 +691,266 @@ NOTE: You may deviate from the plan based on tool results. The plan is a guide,
                 break
             
             thought = response.get("thought", "")
-            action = response.get("action", "")
-            action_input = response.get("action_input", {})
+            requested = _parse_actions(response)
+            is_parallel = len(requested) > 1
+            action, action_input = requested[0]
             
             logger.info(f"{STEP_NAME} | 💭 Thought: {thought}")
-            logger.info(f"{STEP_NAME} | 🔧 Action: {action}")
-            logger.info(f"{STEP_NAME} | 📥 Input: {json.dumps(action_input, indent=2)[:200]}")
             
-            # Check if trying to repeat a failed tool
-            tool_key = f"{action}:{json.dumps(action_input, sort_keys=True)}"
-            if tool_key in tools_used and action != "finish_tool":
-                logger.warning(f"{STEP_NAME} | ⚠️ Agent trying to repeat tool: {action}")
-                observation = "This search was already attempted. Try a different approach or call finish_tool."
-                tool_output = {"error": "Duplicate search attempt"}
-            else:
-                # If the agent calls finish_tool without including the gathered context,
-                # inject the already collected resources so downstream nodes get dicts, not bare strings.
-                if action == "finish_tool":
-                    action_input = dict(action_input or {})
-
-                    # Helper to normalize lists from the LLM (can be strings)
-                    def _norm_docs(val):
-                        docs = []
-                        for d in val or []:
-                            if isinstance(d, dict):
-                                docs.append(d)
-                            elif isinstance(d, str):
-                                docs.append({"id": d, "title": d, "content_preview": ""})
-                        return docs
-
-                    def _norm_list(val):
-                        items = []
-                        for x in val or []:
-                            if isinstance(x, dict) or isinstance(x, str):
-                                items.append(x)
-                        return items
-
-                    if not action_input.get("relevant_documents"):
-                        action_input["relevant_documents"] = gathered_documents
-                    else:
-                        action_input["relevant_documents"] = _norm_docs(action_input.get("relevant_documents"))
-
-                    if not action_input.get("relevant_images"):
-                        action_input["relevant_images"] = gathered_images
+            if is_parallel:
+                # Independent tools requested together - run them concurrently
+                logger.info(f"{STEP_NAME} | 🔧 Parallel actions: {', '.join(a for a, _ in requested)}")
+                executed = [None] * len(requested)
+                to_run = []
+                for idx, (req_action, req_input) in enumerate(requested):
+                    tool_key = f"{req_action}:{json.dumps(req_input, sort_keys=True)}"
+                    if tool_key in tools_used:
+                        logger.warning(f"{STEP_NAME} | ⚠️ Agent trying to repeat tool: {req_action}")
+                        executed[idx] = (
+                            req_action, req_input, {"error": "Duplicate search attempt"},
+                            "This search was already attempted. Try a different approach or call finish_tool."
+                        )
                     else:
-                        action_input["relevant_images"] = _norm_list(action_input.get("relevant_images"))
-
-                    if not action_input.get("past_tickets"):
-                        action_input["past_tickets"] = gathered_past_tickets
-                    else:
-                        action_input["past_tickets"] = _norm_list(action_input.get("past_tickets"))
-
-                    if not action_input.get("product_details") and identified_product:
-                        action_input["product_details"] = identified_product
-                    if "product_identified" not in action_input:
-                        action_input["product_identified"] = identified_product is not None
-                    if "confidence" not in action_input:
-                        action_input["confidence"] = product_confidence or 0.5
-
-                # Execute tool
-                tools_used.add(tool_key)
-                tool_output, observation = _execute_tool(
-                    action=action,
-                    action_input=action_input,
-                    ticket_images=ticket_images,
-                    attachments=attachments,
-                    tool_results=tool_results,
-                    identified_product=identified_product
-                )
+                        tools_used.add(tool_key)
+                        to_run.append(idx)
+                
+                if to_run:
+                    outputs = yield blocking_call(
+                        _execute_tools_parallel,
+                        requested=[requested[idx] for idx in to_run],
+                        ticket_images=ticket_images,
+                        attachments=attachments,
+                        tool_results=tool_results,
+                        identified_product=identified_product
+                    )
+                    for idx, (out, obs) in zip(to_run, outputs):
+                        executed[idx] = (requested[idx][0], requested[idx][1], out, obs)
+            else:
+                logger.info(f"{STEP_NAME} | 🔧 Action: {action}")
+                logger.info(f"{STEP_NAME} | 📥 Input: {json.dumps(action_input, indent=2)[:200]}")
+                
+                # Check if trying to repeat a failed tool
+                tool_key = f"{action}:{json.dumps(action_input, sort_keys=True)}"
+                if tool_key in tools_used and action != "finish_tool":
+                    logger.warning(f"{STEP_NAME} | ⚠️ Agent trying to repeat tool: {action}")
+                    observation = "This search was already attempted. Try a different approach or call finish_tool."
+                    tool_output = {"error": "Duplicate search attempt"}
+                else:
+                    # If the agent calls finish_tool without including the gathered context,
+                    # inject the already collected resources so downstream nodes get dicts, not bare strings.
+                    if action == "finish_tool":
+                        action_input = dict(action_input or {})
+
+                        # Helper to normalize lists from the LLM (can be strings)
+                        def _norm_docs(val):
+                            docs = []
+                            for d in val or []:
+                                if isinstance(d, dict):
+                                    docs.append(d)
+                                elif isinstance(d, str):
+                                    docs.append({"id": d, "title": d, "content_preview": ""})
+                            return docs
+
+                        def _norm_list(val):
+                            items = []
+                            for x in val or []:
+                                if isinstance(x, dict) or isinstance(x, str):
+                                    items.append(x)
+                            return items
+
+                        if not action_input.get("relevant_documents"):
+                            action_input["relevant_documents"] = gathered_documents
+                        else:
+                            action_input["relevant_documents"] = _norm_docs(action_input.get("relevant_documents"))
+
+                        if not action_input.get("relevant_images"):
+                            action_input["relevant_images"] = gathered_images
+                        else:
+                            action_input["relevant_images"] = _norm_list(action_input.get("relevant_images"))
+
+                        if not action_input.get("past_tickets"):
+                            action_input["past_tickets"] = gathered_past_tickets
+                        else:
+                            action_input["past_tickets"] = _norm_list(action_input.get("past_tickets"))
+
+                        if not action_input.get("product_details") and identified_product:
+                            action_input["product_details"] = identified_product
+                        if "product_identified" not in action_input:
+                            action_input["product_identified"] = identified_product is not None
+                        if "confidence" not in action_input:
+                            action_input["confidence"] = product_confidence or 0.5
+
+                    # Execute tool
+                    tools_used.add(tool_key)
+                    tool_output, observation = yield blocking_call(
+                        _execute_tool,
+                        action=action,
+                        action_input=action_input,
+                        ticket_images=ticket_images,
+                        attachments=attachments,
+                        tool_results=tool_results,
+                        identified_product=identified_product
+                    )
+                
+                executed = [(action, action_input, tool_output, observation)]
             
             iteration_duration = time.time() - iteration_start
             
-            logger.info(f"{STEP_NAME} | 📤 Observation: {observation[:200]}...")
-            
-            # Record iteration
-            iteration_record: ReACTIteration = {
-                "iteration": iteration_num,
-                "thought": thought,
-                "action": action,
-                "action_input": action_input,
-                "observation": observation,
-                "tool_output": tool_output,
-                "timestamp": time.time(),
-                "duration": iteration_duration
-            }
+            # Record iteration (parallel tools are merged into one record)
+            iteration_record: ReACTIteration
+            if is_parallel:
+                iteration_record = {
+                    "iteration": iteration_num,
+                    "thought": thought,
+                    "action": " + ".join(a for a, _, _, _ in executed),
+                    "action_input": {"batch": [{"action": a, "action_input": i} for a, i, _, _ in executed]},
+                    "observation": "\n\n".join(f"[{a}] {obs}" for a, _, _, obs in executed),
+                    "tool_output": {"parallel": True, "success": any(out.get("success") for _, _, out, _ in executed)},
+                    "actions": [
+                        {"action": a, "action_input": i, "observation": obs, "tool_output": out}
+                        for a, i, out, obs in executed
+                    ],
+                    "timestamp": time.time(),
+                    "duration": iteration_duration
+                }
+            else:
+                iteration_record = {
+                    "iteration": iteration_num,
+                    "thought": thought,
+                    "action": action,
+                    "action_input": action_input,
+                    "observation": observation,
+                    "tool_output": tool_output,
+                    "timestamp": time.time(),
+                    "duration": iteration_duration
+                }
             iterations.append(iteration_record)
             
+            logger.info(f"{STEP_NAME} | 📤 Observation: {iteration_record['observation'][:200]}...")
+            
             # Extract gathered information from tool outputs
-            if action == "product_search_tool" and tool_output.get("success"):
-                products = tool_output.get("products", [])
-                if products and not identified_product:
-                    top = products[0]
-                    identified_product = {
-                        "model": top.get("model_no"),
-                        "name": top.get("product_title"),
-                        "category": top.get("category"),
-                        "confidence": top.get("similarity_score", 0) / 100
-                    }
-                    product_confidence = identified_product["confidence"]
-                    logger.info(f"{STEP_NAME} | ✅ Product identified: {identified_product['model']}")
+            for action, action_input, tool_output, observation in executed:
+                if action == "product_search_tool" and tool_output.get("success"):
+                    products = tool_output.get("products", [])
+                    if products and not identified_product:
+                        top = products[0]
+                        identified_product = {
+                            "model": top.get("model_no"),
+                            "name": top.get("product_title"),
+                            "category": top.get("category"),
+                            "confidence": top.get("similarity_score", 0) / 100
+                        }
+                        product_confidence = identified_product["confidence"]
+                        logger.info(f"{STEP_NAME} | ✅ Product identified: {identified_product['model']}")
             
-            elif action == "document_search_tool" and tool_output.get("success"):
-                docs = tool_output.get("documents", [])
-                # Normalize and deduplicate documents by title
-                seen_titles = {d.get("title", "").lower() for d in gathered_documents if isinstance(d, dict)}
-                for doc in docs:
-                    # Ensure doc is a dict
-                    if isinstance(doc, str):
-                        doc = {"id": doc, "title": doc, "content_preview": ""}
-                    elif not isinstance(doc, dict):
-                        continue
+                elif action == "document_search_tool" and tool_output.get("success"):
+                    docs = tool_output.get("documents", [])
+                    # Normalize and deduplicate documents by title
+                    seen_titles = {d.get("title", "").lower() for d in gathered_documents if isinstance(d, dict)}
+                    for doc in docs:
+                        # Ensure doc is a dict
+                        if isinstance(doc, str):
+                            doc = {"id": doc, "title": doc, "content_preview": ""}
+                        elif not isinstance(doc, dict):
+                            continue
                     
-                    # Deduplicate by title (case-insensitive)
-                    doc_title = doc.get("title", "").lower()
-                    if doc_title and doc_title not in seen_titles:
-                        seen_titles.add(doc_title)
-                        gathered_documents.append(doc)
+                        # Deduplicate by title (case-insensitive)
+                        doc_title = doc.get("title", "").lower()
+                        if doc_title and doc_title not in seen_titles:
+                            seen_titles.add(doc_title)
+                            gathered_documents.append(doc)
                 
-                # Store direct Gemini answer for downstream nodes
-                if tool_output.get("gemini_answer"):
-                    gemini_answer = tool_output.get("gemini_answer", "")
+                    # Store direct Gemini answer for downstream nodes
+                    if tool_output.get("gemini_answer"):
+                        gemini_answer = tool_output.get("gemini_answer", "")
             
-            elif action == "vision_search_tool" and tool_output.get("success"):
-                matches = tool_output.get("matches", [])
-                for match in matches:
-                    img_url = match.get("image_url")
-                    if img_url and img_url not in gathered_images:
-                        gathered_images.append(img_url)
+                elif action == "vision_search_tool" and tool_output.get("success"):
+                    matches = tool_output.get("matches", [])
+                    for match in matches:
+                        img_url = match.get("image_url")
+                        if img_url and img_url not in gathered_images:
+                            gathered_images.append(img_url)
                 
-                # IMPORTANT: Capture vision match quality for downstream nodes
-                vision_match_quality = tool_output.get("match_quality", "NO_MATCH")
-                vision_relevance_reason = tool_output.get("reasoning", "")
-                logger.info(f"{STEP_NAME} | 🖼️ Vision match quality: {vision_match_quality}")
+                    # IMPORTANT: Capture vision match quality for downstream nodes
+                    vision_match_quality = tool_output.get("match_quality", "NO_MATCH")
+                    vision_relevance_reason = tool_output.get("reasoning", "")
+                    logger.info(f"{STEP_NAME} | 🖼️ Vision match quality: {vision_match_quality}")
                 
-                # Capture ALL vision matches for source_products (Visual Matches section)
-                for match in matches:
-                    vision_products.append({
-                        "model_no": match.get("model_no"),
-                        "product_title": match.get("product_title"),
-                        "category": match.get("category"),
-                        "similarity_score": match.get("similarity_score", 0),
-                        "match_level": "🟢" if match.get("similarity_score", 0) >= 85 else "🟡" if match.get("similarity_score", 0) >= 70 else "🔴",
-                        "source_type": "vision_search"
-                    })
+                    # Capture ALL vision matches for source_products (Visual Matches section)
+                    for match in matches:
+                        vision_products.append({
+                            "model_no": match.get("model_no"),
+                            "product_title": match.get("product_title"),
+                            "category": match.get("category"),
+                            "similarity_score": match.get("similarity_score", 0),
+                            "match_level": "🟢" if match.get("similarity_score", 0) >= 85 else "🟡" if match.get("similarity_score", 0) >= 70 else "🔴",
+                            "source_type": "vision_search"
+                        })
                 
-                # Vision can also identify product
-                if matches and not identified_product:
-                    top = matches[0]
-                    identified_product = {
-                        "model": top.get("model_no"),
-                        "name": top.get("product_title"),
-                        "category": top.get("category"),
-                        "confidence": top.get("similarity_score", 0) / 100
-                    }
-                    product_confidence = identified_product["confidence"]
+                    # Vision can also identify product
+                    if matches and not identified_product:
+                        top = matches[0]
+                        identified_product = {
+                            "model": top.get("model_no"),
+                            "name": top.get("product_title"),
+                            "category": top.get("category"),
+                            "confidence": top.get("similarity_score", 0) / 100
+                        }
+                        product_confidence = identified_product["confidence"]
             
-            elif action == "attachment_analyzer_tool" and tool_output.get("success"):
-                # Extract model numbers and other info from attachments
-                extracted_info = tool_output.get("extracted_info", {})
-                models = extracted_info.get("model_numbers", [])
-                if models and not identified_product:
-                    # Take first extracted model number
-                    logger.info(f"{STEP_NAME} | 📎 Extracted model numbers: {models}")
-                    # Note: actual product verification will happen via product_search_tool
+                elif action == "attachment_analyzer_tool" and tool_output.get("success"):
+                    # Extract model numbers and other info from attachments
+                    extracted_info = tool_output.get("extracted_info", {})
+                    models = extracted_info.get("model_numbers", [])
+                    if models and not identified_product:
+                        # Take first extracted model number
+                        logger.info(f"{STEP_NAME} | 📎 Extracted model numbers: {models}")
+                        # Note: actual product verification will happen via product_search_tool
             
-            elif action == "attachment_type_classifier_tool" and tool_output.get("success"):
-                # Categorize attachments for reference
-                attachments_classified = tool_output.get("attachments", [])
-                logger.info(f"{STEP_NAME} | 📑 Attachment types classified: {len(attachments_classified)} doc(s)")
+                elif action == "attachment_type_classifier_tool" and tool_output.get("success"):
+                    # Categorize attachments for reference
+                    attachments_classified = tool_output.get("attachments", [])
+                    logger.info(f"{STEP_NAME} | 📑 Attachment types classified: {len(attachments_classified)} doc(s)")
             
-            elif action == "multimodal_document_analyzer_tool" and tool_output.get("success"):
-                # Extract complex document data (images within PDFs, tables, etc.)
-                docs_analyzed = tool_output.get("documents", [])
-                for doc in docs_analyzed:
-                    if isinstance(doc, dict):
-                        title = doc.get("filename", "Unknown Document")
-                        if title not in [d.get("title") for d in gathered_documents if isinstance(d, dict)]:
-                            gathered_documents.append({
-                                "id": title,
-                                "title": title,
-                                "content_preview": doc.get("extracted_info", {}).get("text", "")[:500]
-                            })
-                logger.info(f"{STEP_NAME} | 📄 Multimodal analysis: {len(docs_analyzed)} doc(s) processed")
+                elif action == "multimodal_document_analyzer_tool" and tool_output.get("success"):
+                    # Extract complex document data (images within PDFs, tables, etc.)
+                    docs_analyzed = tool_output.get("documents", [])
+                    for doc in docs_analyzed:
+                        if isinstance(doc, dict):
+                            title = doc.get("filename", "Unknown Document")
+                            if title not in [d.get("title") for d in gathered_documents if isinstance(d, dict)]:
+                                gathered_documents.append({
+                                    "id": title,
+                                    "title": title,
+                                    "content_preview": doc.get("extracted_info", {}).get("text", "")[:500]
+                                })
+                    logger.info(f"{STEP_NAME} | 📄 Multimodal analysis: {len(docs_analyzed)} doc(s) processed")
             
-            elif action == "ocr_image_analyzer_tool" and tool_output.get("success"):
-                # Extract text from images
-                results = tool_output.get("results", [])
-                for result in results:
-                    img_url = result.get("image_url")
-                    if img_url and img_url not in gathered_images:
-                        gathered_images.append(img_url)
-                logger.info(f"{STEP_NAME} | 🖼️  OCR analysis: {len(results)} image(s) processed")
+                elif action == "ocr_image_analyzer_tool" and tool_output.get("success"):
+                    # Extract text from images
+                    results = tool_output.get("results", [])
+                    for result in results:
+                        img_url = result.get("image_url")
+                        if img_url and img_url not in gathered_images:
+                            gathered_images.append(img_url)
+                    logger.info(f"{STEP_NAME} | 🖼️  OCR analysis: {len(results)} image(s) processed")
             
-            elif action == "past_tickets_search_tool" and tool_output.get("success"):
-                tickets = tool_output.get("tickets", [])
-                for ticket in tickets:
-                    if ticket not in gathered_past_tickets:
-                        gathered_past_tickets.append(ticket)
+                elif action == "past_tickets_search_tool" and tool_output.get("success"):
+                    tickets = tool_output.get("tickets", [])
+                    for ticket in tickets:
+                        if ticket not in gathered_past_tickets:
+                            gathered_past_tickets.append(ticket)
             
             # ========================================
             # UPDATE PLAN STEP COUNTER (Phase 1)
             # ========================================
-            if execution_plan and action != "finish_tool":
-                # Check if this action matches the current plan step
+            is_finish = executed[0][0] == "finish_tool"
+            if execution_plan and not is_finish:
+                # Check if each executed action matches the current plan step
                 plan_steps = execution_plan.get("execution_plan", [])
-                if current_plan_step < len(plan_steps):
+                for action, _, _, _ in executed:
+                    if current_plan_step >= len(plan_steps):
+                        break
                     expected_tool = plan_steps[current_plan_step].get("tool")
                     if action == expected_tool or action.replace("_tool", "") in expected_tool:
                         current_plan_step += 1
@@ -837,7 +967,7 @@ NOTE: You may deviate from the plan based on tool results. The plan is a guide,
             should_early_terminate = False
             early_terminate_reason = ""
             
-            if action != "finish_tool" and iteration_num >= 4:  # Only after a few iterations
+            if not is_finish and iteration_num >= 4:  # Only after a few iterations
                 # Count high-quality spec documents
                 spec_doc_count = 0
                 spec_indicators = [
@@ -877,7 +1007,7 @@ NOTE: You may deviate from the plan based on tool results. The plan is a guide,
                 
                 # Condition 4: Agent is repeating searches (detected by duplicate attempts)
                 # and we already have useful information
-                elif "Duplicate search attempt" in str(tool_output) and (spec_doc_count >= 2 or gemini_answer):
+                elif any("Duplicate search attempt" in str(out) for _, _, out, _ in executed) and (spec_doc_count >= 2 or gemini_answer):
                     should_early_terminate = True
                     early_terminate_reason = "Agent repeating searches - proceeding with gathered information"
             
@@ -923,7 +1053,8 @@ NOTE: You may deviate from the plan based on tool results. The plan is a guide,
                 break
             
             # Check if finished
-            if action == "finish_tool" and tool_output.get("finished"):
+            if is_finish and executed[0][2].get("finished"):
+                tool_output = executed[0][2]
                 logger.info(f"{STEP_NAME} | ✅ Agent called finish_tool - stopping loop")
                 
                 # Update from finish tool output
@@ -1021,7 +1152,7 @@ NOTE: You may deviate from the plan based on tool results. The plan is a guide,
     is_system_error = locals().get("is_system_error", False)
     
     total_duration = time.time() - start_time
-    final_iteration_count = len(iterations)
+    final_iteration_count = sum(1 for it in iterations if it.get("iteration", 0) > 0)  # Excludes pre-analysis record
     
     # Determine status
     if is_system_error:
@@ -1132,11 +1263,11 @@ NOTE: You may deviate from the plan based on tool results. The plan is a guide,
         product_results = []
         
         # Collect all product search results from iterations
-        for iteration in iterations:
+        for step in [sub for iteration in iterations for sub in (iteration.get("actions") or [iteration])]:
             # Check both product_search_tool and product_catalog_tool
-            action = iteration.get("action", "")
+            action = step.get("action", "")
             if action in ["product_search_tool", "product_catalog_tool"]:
-                output = iteration.get("tool_output", {})
+                output = step.get("tool_output", {})
                 if output.get("success") and output.get("products"):
                     # Get the source at top level (catalog_cache = exact match)
                     source = output.get("source", "unknown")
@@ -5,6 +5,7 @@ Context building, tool execution, legacy field population
 
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Tuple, Optional
 
 # =============================================================================
@@ -21,9 +22,18 @@ from app.tools.attachment_analyzer import attachment_analyzer_tool
 from app.tools.attachment_classifier_tool import attachment_type_classifier_tool
 from app.tools.multimodal_document_analyzer import multimodal_document_analyzer_tool
 from app.tools.ocr_image_analyzer import ocr_image_analyzer_tool
+from app.services.identifier_extractor import extract_identifiers, is_identifier, MODEL, PART, CODE
 
 logger = logging.getLogger(__name__)
 
+# =============================================================================
+# PARALLEL TOOL EXECUTION
+# =============================================================================
+MAX_PARALLEL_ACTIONS = 4  # Max independent tools the agent may batch per iteration
+TOOL_POOL_WORKERS = 16  # Shared across all workflows in the process
+
+_tool_pool = ThreadPoolExecutor(max_workers=TOOL_POOL_WORKERS, thread_name_prefix="react-tool")
+
 
 def _build_agent_context(
     ticket_subject: str,
@@ -62,6 +72,11 @@ def _build_agent_context(
             context_parts.append(f"\nIteration {it['iteration']}:")
             context_parts.append(f"  Thought: {it['thought'][:150]}")
             context_parts.append(f"  Action: {it['action']}")
+            if it.get('actions'):
+                # Parallel iteration - keep each tool's observation within its own budget
+                for sub in it['actions']:
+                    context_parts.append(f"  [{sub['action']}] Result: {sub['observation'][:1000]}")
+                continue
             # ⚠️ CRITICAL: Show MORE of the observation - model numbers were being truncated!
             # Increase from 200 to 1000 chars to ensure identifiers are preserved
             obs_preview = it['observation'][:1000]
@@ -164,19 +179,10 @@ def _build_agent_context(
                     text_preview = combined_text[:800] if len(combined_text) > 800 else combined_text
                     context_parts.append(f"  📄 Extracted Text:\n{text_preview}")
                     
-                    # Highlight any potential model numbers found (backup regex detection)
-                    import re
-                    model_patterns = [
-                        r'\b(\d{2,3}\.\d{3,4}[A-Z]{0,3})\b',
-                        r'\b([A-Z]{2,5}-?\d{3,6}[A-Z]{0,3})\b',
-                    ]
-                    found_models = []
-                    for pattern in model_patterns:
-                        matches = re.findall(pattern, combined_text, re.IGNORECASE)
-                        found_models.extend(matches)
+                    # Highlight any potential model numbers found (backup detection)
+                    found_models = extract_identifiers(combined_text).values(MODEL, PART, CODE, limit=5)
                     if found_models:
-                        unique_models = list(set(found_models))[:5]
-                        context_parts.append(f"  🔍 POTENTIAL MODEL NUMBERS: {', '.join(unique_models)}")
+                        context_parts.append(f"  🔍 POTENTIAL MODEL NUMBERS: {', '.join(found_models)}")
                 else:
                     context_parts.append(f"  [No readable text extracted]")
     
@@ -196,6 +202,72 @@ def _build_agent_context(
     return "\n".join(context_parts)
 
 
+def _parse_actions(response: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Read the requested tool call(s) from an agent response.
+
+    Accepts the single-call format ("action" / "action_input") and the
+    parallel format ("actions": [{"action": ..., "action_input": ...}, ...]).
+    finish_tool is only honoured on its own, never inside a batch.
+    """
+    batch = response.get("actions")
+    if isinstance(batch, list):
+        requested = [
+            (item.get("action", ""), item.get("action_input") or {})
+            for item in batch
+            if isinstance(item, dict) and item.get("action")
+        ]
+        if len(requested) > 1:
+            requested = [r for r in requested if r[0] != "finish_tool"]
+        if len(requested) > MAX_PARALLEL_ACTIONS:
+            logger.warning(f"[REACT] Agent requested {len(requested)} tools - running first {MAX_PARALLEL_ACTIONS}")
+            requested = requested[:MAX_PARALLEL_ACTIONS]
+        if requested:
+            return requested
+
+    return [(response.get("action", ""), response.get("action_input", {}))]
+
+
+def _execute_tools_parallel(
+    requested: List[Tuple[str, Dict[str, Any]]],
+    ticket_images: List[str],
+    attachments: List[Dict],
+    tool_results: Dict[str, Any],
+    identified_product: Optional[Dict[str, Any]] = None
+) -> List[Tuple[Dict[str, Any], str]]:
+    """
+    Execute independent tools concurrently on the shared tool pool.
+
+    Each tool writes into its own copy of the tool_results slots; the copies
+    are merged back in request order, so the outcome does not depend on
+    which tool finished first.
+
+    Returns:
+        (tool_output, observation) per requested tool, in request order
+    """
+    scratch = [dict.fromkeys(tool_results) for _ in requested]
+    futures = [
+        _tool_pool.submit(
+            _execute_tool,
+            action=action,
+            action_input=action_input,
+            ticket_images=ticket_images,
+            attachments=attachments,
+            tool_results=slots,
+            identified_product=identified_product
+        )
+        for (action, action_input), slots in zip(requested, scratch)
+    ]
+    results = [future.result() for future in futures]
+
+    for slots in scratch:
+        for key, value in slots.items():
+            if value is not None:
+                tool_results[key] = value
+
+    return results
+
+
 def _execute_tool(
     action: str,
     action_input: Dict[str, Any],
@@ -222,17 +294,6 @@ def _execute_tool(
                 # Fallback: try direct invocation
                 return tool.invoke(params)
         
-        # -----------------------------------------------------------
-        # AUTO-DETECT MODEL NUMBERS FOR PRODUCT SEARCH
-        # -----------------------------------------------------------
-        def _looks_like_model_number(text: Any) -> bool:
-            """Check if text looks like a product model number"""
-            if not isinstance(text, str):
-                return False
-            import re
-            # Match patterns like: 100.1170, HS6270MB, 160.1168-9862
-            return bool(re.match(r"^[A-Z0-9]{1,4}[\.\-]?[0-9]{3,5}[\-A-Z0-9]*$", text.strip(), re.I))
-        
         # -----------------------------------------------------------
         # 1. ATTACHMENT ANALYZER TOOL
         # -----------------------------------------------------------
@@ -277,7 +338,7 @@ def _execute_tool(
             
             # Auto-fix: If query looks like model number, set model_number parameter
             query = action_input.get("query", "")
-            if query and _looks_like_model_number(query) and "model_number" not in action_input:
+            if query and is_identifier(query) and "model_number" not in action_input:
                 logger.info(f"[TOOL_EXEC] Auto-detected model number in query: {query}")
                 action_input["model_number"] = query
                 action_input.pop("query", None)  # Remove query param
@@ -365,7 +426,14 @@ def _execute_tool(
                     obs += f"\n🔧 RELATED SPARE PARTS:\n"
                     for part in related[:3]:
                         obs += f"   • {part['model_no']} - {part['title']}\n"
-                
+
+                # Products a spare part fits
+                used_in = output.get("used_in_products", [])
+                if used_in:
+                    obs += f"\n🚿 USED IN PRODUCTS:\n"
+                    for product in used_in[:5]:
+                        obs += f"   • {product['model_no']} - {product['title']}\n"
+
                 logger.info(f"[TOOL_EXEC] Product search: {count} result(s) via {method}")
                 return output, obs
             else:
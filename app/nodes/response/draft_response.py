@@ -12,7 +12,8 @@ from typing import Dict, Any, List
 
 from app.graph.state import TicketState
 from app.utils.audit import add_audit_event
-from app.clients.llm_client import call_llm
+from app.utils.node_steps import NodeSteps, run_steps, arun_steps, llm_call
+from app.config.settings import settings
 from app.config.constants import DRAFT_RESPONSE_PROMPT, ENHANCED_DRAFT_RESPONSE_PROMPT
 from app.utils.detailed_logger import (
     log_node_start, log_node_complete, log_llm_interaction
@@ -273,6 +274,15 @@ def draft_final_response(state: TicketState) -> Dict[str, Any]:
             - draft_response
             - audit_events
     """
+    return run_steps(_draft_final_response_steps(state))
+
+
+async def adraft_final_response(state: TicketState) -> Dict[str, Any]:
+    """Async variant for graph.ainvoke."""
+    return await arun_steps(_draft_final_response_steps(state))
+
+
+def _draft_final_response_steps(state: TicketState) -> NodeSteps:
     start_time = time.time()
     logger.info(f"{STEP_NAME} | ▶ Generating customer response...")
     
@@ -723,10 +733,12 @@ RETRIEVED CONTEXT:
         llm_start = time.time()
         
         # Use enhanced prompt for structured response
-        raw_response = call_llm(
+        raw_response = yield llm_call(
             system_prompt=ENHANCED_DRAFT_RESPONSE_PROMPT,
             user_prompt=user_prompt,
             response_format=None,  # plain text
+            cache_ttl=settings.llm_cache_ttl_draft_response,
+            cache_system_prompt=True,
         )
         
         llm_duration = time.time() - llm_start
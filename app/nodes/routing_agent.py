@@ -11,8 +11,11 @@ import re
 from typing import Dict, Any
 
 from app.graph.state import TicketState
+from app.graph.checkpointing import current_run_key
+from app.nodes.attachment_preanalysis import discard_preanalysis
 from app.utils.audit import add_audit_event
-from app.clients.llm_client import call_llm
+from app.utils.node_steps import NodeSteps, run_steps, arun_steps, llm_call
+from app.config.settings import settings
 from app.config.constants import (
     ROUTING_SYSTEM_PROMPT, 
     SKIP_CATEGORIES,
@@ -140,6 +143,22 @@ def classify_ticket_category(state: TicketState) -> Dict[str, Any]:
     Falls back to rule-based classification on errors.
     Detects skip categories (PO, auto-reply) for fast processing.
     """
+    return _discard_preanalysis_if_skipped(state, run_steps(_classify_ticket_steps(state)))
+
+
+async def aclassify_ticket_category(state: TicketState) -> Dict[str, Any]:
+    """Async variant for graph.ainvoke."""
+    return _discard_preanalysis_if_skipped(state, await arun_steps(_classify_ticket_steps(state)))
+
+
+def _discard_preanalysis_if_skipped(state: TicketState, updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Cancel the OCR / document analysis fetch_ticket started when the ticket will not reach the agent."""
+    if updates.get("should_skip", state.get("should_skip", False)):
+        discard_preanalysis(current_run_key(state.get("ticket_id", "")))
+    return updates
+
+
+def _classify_ticket_steps(state: TicketState) -> NodeSteps:
     start_time = time.time()
     
     logger.info(f"{'='*60}")
@@ -270,11 +289,13 @@ def classify_ticket_category(state: TicketState) -> Dict[str, Any]:
         logger.info(f"{STEP_NAME} | Calling LLM for classification...")
         llm_start = time.time()
         
-        response = call_llm(
+        response = yield llm_call(
             system_prompt=ROUTING_SYSTEM_PROMPT,
             user_prompt=content,
             response_format="json",
-            temperature=0.1
+            temperature=0.1,
+            cache_ttl=settings.llm_cache_ttl_routing,
+            cache_system_prompt=True
         )
         
         llm_duration = time.time() - llm_start
@@ -0,0 +1,135 @@
+"""
+BM25 Index - Field-Weighted Keyword Ranking for Product Search
+Ranks documents with BM25F: each field's term frequencies are scaled by a
+field weight before BM25 saturation, so a query word in a product title
+counts for more than the same word in its category.
+
+Scores for every (term, document) pair are computed once at build time and
+stored as flat NumPy arrays (document ids + impacts, one slice per term).
+A query adds up its terms' slices and picks the top-k with argpartition,
+so rare, specific terms outrank common ones like "faucet" or "chrome"
+instead of tying with them.
+"""
+
+import math
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r'\b[a-z0-9]+(?:\.[a-z0-9]+)*\b')
+MIN_TOKEN_LENGTH = 2  # Skip single chars
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word / model-number tokens (e.g. "100.1170", "chrome")."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) >= MIN_TOKEN_LENGTH]
+
+
+class BM25Index:
+    """Immutable BM25F index over keyed documents made of named text fields."""
+
+    def __init__(
+        self,
+        documents: Iterable[Tuple[str, Mapping[str, str]]] = (),
+        field_weights: Optional[Mapping[str, float]] = None,
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+    ):
+        field_weights = field_weights or {}
+        self._keys: List[str] = []
+        doc_terms: List[Dict[str, float]] = []
+        doc_lengths: List[float] = []
+
+        for key, fields in documents:
+            weighted_tf: Dict[str, float] = {}
+            length = 0.0
+            for field, text in fields.items():
+                weight = field_weights.get(field, 1.0)
+                tokens = tokenize(text)
+                length += weight * len(tokens)
+                for token in tokens:
+                    weighted_tf[token] = weighted_tf.get(token, 0.0) + weight
+            self._keys.append(key)
+            doc_terms.append(weighted_tf)
+            doc_lengths.append(length)
+
+        postings: Dict[str, List[int]] = {}
+        for doc_id, terms in enumerate(doc_terms):
+            for token in terms:
+                postings.setdefault(token, []).append(doc_id)
+
+        total = len(self._keys)
+        avg_length = (sum(doc_lengths) / total) if total else 0.0
+        doc_ids: List[int] = []
+        impacts: List[float] = []
+        self._slices: Dict[str, Tuple[int, int]] = {}
+
+        for token, docs in postings.items():
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            start = len(doc_ids)
+            for doc_id in docs:
+                tf = doc_terms[doc_id][token]
+                norm = k1 * (1 - b + b * doc_lengths[doc_id] / avg_length) if avg_length else k1
+                doc_ids.append(doc_id)
+                impacts.append(idf * tf * (k1 + 1) / (tf + norm))
+            self._slices[token] = (start, len(doc_ids))
+
+        self._doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        self._impacts = np.asarray(impacts, dtype=np.float32)
+
+    def __len__(self) -> int:
+        """Vocabulary size."""
+        return len(self._slices)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._slices
+
+    @property
+    def document_count(self) -> int:
+        return len(self._keys)
+
+    def _scores(self, tokens: Iterable[str]) -> np.ndarray:
+        scores = np.zeros(len(self._keys), dtype=np.float32)
+        for token in set(tokens):
+            span = self._slices.get(token)
+            if span:
+                start, end = span
+                # Each document appears once per term, so fancy-index += is safe
+                scores[self._doc_ids[start:end]] += self._impacts[start:end]
+        return scores
+
+    @staticmethod
+    def _top(scores: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+        """Best k candidate ids, highest score first (ties by id)."""
+        if k < len(candidates):
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+    def search(
+        self,
+        tokens: Iterable[str],
+        limit: int,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Top documents for the query tokens.
+
+        Args:
+            tokens: Query tokens (see tokenize)
+            limit: Maximum results to return
+            mask: Optional bool array over document ids (e.g. a FacetIndex filter)
+
+        Returns:
+            Up to `limit` (key, score) pairs, best first
+        """
+        if limit <= 0 or not self._keys:
+            return []
+        scores = self._scores(tokens)
+        if mask is not None:
+            scores[~mask] = 0
+        ranked = self._top(scores, np.flatnonzero(scores), limit)
+        return [(self._keys[doc_id], float(scores[doc_id])) for doc_id in ranked]
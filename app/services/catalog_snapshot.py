@@ -0,0 +1,147 @@
+"""
+Catalog Snapshot - Prebuilt, Memory-Mapped Product Catalog Indexes
+Serializes the fully indexed ProductCatalog once (at image build time) so
+a cold start maps one file instead of parsing the JSON manifest and
+rebuilding every index.
+
+File layout (offsets in the header are relative to the data section):
+
+    MAGIC | header length (uint32 LE) | header JSON | pad | pickle | pad | buffers...
+
+The catalog state is pickled with protocol 5 and NumPy arrays stored
+out-of-band as 64-byte aligned buffers. Loading mmaps the file and hands
+those buffers back to pickle, so the columns and index arrays are
+read-only views of the page cache rather than copies.
+
+The header carries a format version plus the SHA-256 of the source
+manifest; ProductCatalog.load_from_snapshot treats any mismatch as stale
+and falls back to the JSON manifest. Snapshots are pickles: only load
+files this service built.
+
+Build offline:
+    python -m app.services.catalog_snapshot
+    python -m app.services.catalog_snapshot --manifest data/metadata_manifest.json --output data/catalog_snapshot.bin
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FLUSCAT\x00"
+ALIGNMENT = 64
+_LENGTH = struct.Struct("<I")
+
+
+def fingerprint(path: str) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_snapshot(path: str, state: Any, metadata: Dict[str, Any]) -> int:
+    """
+    Write `state` to a snapshot file (atomically, via a temp file + rename).
+
+    Args:
+        path: Output path
+        state: Picklable object; contiguous NumPy arrays are stored out-of-band
+        metadata: JSON-serializable header fields (version, source hash, ...)
+
+    Returns:
+        Size of the written file in bytes
+    """
+    buffers = []
+    payload = pickle.dumps(state, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+
+    layout = []
+    offset = _aligned(len(payload))
+    for raw in raws:
+        layout.append([offset, raw.nbytes])
+        offset = _aligned(offset + raw.nbytes)
+
+    header = json.dumps(dict(metadata, pickle=[0, len(payload)], buffers=layout)).encode("utf-8")
+    preamble = MAGIC + _LENGTH.pack(len(header)) + header
+    data_start = _aligned(len(preamble))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(preamble)
+        f.write(b"\x00" * (data_start - len(preamble)))
+        f.write(payload)
+        for (start, _), raw in zip(layout, raws):
+            f.seek(data_start + start)
+            f.write(raw)
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+def _read_preamble(f) -> Tuple[Dict[str, Any], int]:
+    magic = f.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError("Not a catalog snapshot")
+    (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+    header = json.loads(f.read(length).decode("utf-8"))
+    return header, _aligned(len(MAGIC) + _LENGTH.size + length)
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    """Snapshot header only (cheap staleness check before mapping)."""
+    with open(path, "rb") as f:
+        return _read_preamble(f)[0]
+
+
+def read_snapshot(path: str) -> Tuple[Dict[str, Any], Any]:
+    """
+    Map a snapshot file and unpickle its state.
+
+    Returns:
+        (header, state); NumPy arrays in state are read-only views of the mapping
+    """
+    with open(path, "rb") as f:
+        header, data_start = _read_preamble(f)
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapping)
+    start, length = header["pickle"]
+    buffers = [view[data_start + offset:data_start + offset + size] for offset, size in header["buffers"]]
+    state = pickle.loads(view[data_start + start:data_start + start + length], buffers=buffers)
+    return header, state
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Build the catalog snapshot from the JSON manifest."""
+    from app.services.product_catalog import ProductCatalog
+
+    parser = argparse.ArgumentParser(description="Build the prebuilt product catalog snapshot")
+    parser.add_argument("--manifest", default=None, help="JSON manifest (default: data/metadata_manifest.json)")
+    parser.add_argument("--output", default=None, help="Snapshot path (default: data/catalog_snapshot.bin)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    catalog = ProductCatalog()
+    if not catalog.load_from_json(args.manifest):
+        return 1
+    catalog.save_snapshot(args.output, args.manifest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Catalog Store - Columnar (Struct-of-Arrays) Storage for Normalized Products
+Holds the catalog as one column per field instead of one dict per product:
+
+- Categorical fields (category, collection, finish, ...) are dictionary
+  encoded: a NumPy code array plus one shared copy of each distinct value
+- Prices, dimensions, flow rates and flags are NumPy numeric / bool arrays
+- Free text (titles, descriptions, URLs) is packed into one string per
+  column plus a NumPy offsets array, so the thousands of small strings
+  parsed from the manifest can be freed
+
+Products are exposed as ProductRow views (two slots: store + ordinal) that
+read like the old product dicts (product["title"], product.get(...)) and
+only build a real dict on to_dict(). The search indexes hold rows, so the
+catalog pays for the data once instead of a ~45-key dict per product.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+import numpy as np
+
+# Field layout of ProductCatalog._normalize_product output.
+# Fields not listed here are kept as plain object columns.
+CATEGORICAL_FIELDS = [
+    "group_number", "category", "sub_category", "sub_sub_category", "collection",
+    "style", "finish_code", "finish_name", "status", "warranty", "collection_url",
+]
+FLOAT_FIELDS = [
+    "list_price", "map_price", "cad_price", "flow_rate_gpm",
+    "height_inches", "length_inches", "width_inches", "weight_lbs",
+]
+INT_FIELDS = ["holes_needed", "popularity"]
+BOOL_FIELDS = [
+    "is_touch_capable", "is_active", "is_spare_part", "is_special_finish",
+    "display_on_website", "can_sell_online",
+]
+LIST_FIELDS = ["features"]
+
+
+class ProductStore:
+    """Immutable struct-of-arrays product table."""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.size = len(records)
+        self.fields: List[str] = list(dict.fromkeys(f for record in records for f in record))
+        self.columns: Dict[str, Any] = {}
+        self.categories: Dict[str, List[Any]] = {}  # categorical field -> distinct values
+        self.kinds: Dict[str, str] = {}  # field -> column kind
+        self._getters: Dict[str, Callable[[int], Any]] = {}
+
+        for field in self.fields:
+            if field in CATEGORICAL_FIELDS:
+                self._add_categorical(field, [record.get(field, "") for record in records])
+            elif field in FLOAT_FIELDS:
+                self._add_numeric(field, [record.get(field, 0.0) for record in records], np.float64)
+            elif field in INT_FIELDS:
+                self._add_numeric(field, [record.get(field, 0) for record in records], np.int64)
+            elif field in BOOL_FIELDS:
+                self._add_numeric(field, [record.get(field, False) for record in records], np.bool_)
+            elif field in LIST_FIELDS:
+                self._add_list(field, [record.get(field) or () for record in records])
+            else:
+                values = [record.get(field, "") for record in records]
+                if all(isinstance(v, str) for v in values):
+                    self._add_text(field, values)
+                else:
+                    self._add_object(field, values)
+
+    def _add_categorical(self, field: str, values: List[Any]) -> None:
+        codes_by_value: Dict[Any, int] = {}
+        codes = np.fromiter(
+            (codes_by_value.setdefault(v, len(codes_by_value)) for v in values),
+            dtype=np.int32, count=len(values),
+        )
+        distinct = list(codes_by_value)
+        self.columns[field] = codes
+        self.categories[field] = distinct
+        self._bind(field, "categorical")
+
+    def _add_numeric(self, field: str, values: List[Any], dtype) -> None:
+        column = np.asarray(values, dtype=dtype)
+        self.columns[field] = column
+        self._bind(field, "numeric")
+
+    def _add_list(self, field: str, values: List[Iterable[Any]]) -> None:
+        column = [tuple(v) for v in values]
+        self.columns[field] = column
+        self._bind(field, "list")
+
+    def _add_text(self, field: str, values: List[str]) -> None:
+        blob = "".join(values)
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in values], out=offsets[1:])
+        self.columns[field] = (blob, offsets)
+        self._bind(field, "text")
+
+    def _add_object(self, field: str, values: List[Any]) -> None:
+        self.columns[field] = values
+        self._bind(field, "object")
+
+    def _bind(self, field: str, kind: str) -> None:
+        """Record the column kind and build its ordinal -> value getter."""
+        self.kinds[field] = kind
+        column = self.columns[field]
+        if kind == "categorical":
+            distinct = self.categories[field]
+            getter = lambda i: distinct[column[i]]
+        elif kind == "numeric":
+            getter = lambda i: column[i].item()
+        elif kind == "list":
+            getter = lambda i: list(column[i])
+        elif kind == "text":
+            blob, offsets = column
+            getter = lambda i: blob[offsets[i]:offsets[i + 1]]
+        else:
+            getter = column.__getitem__
+        self._getters[field] = getter
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Getters are closures; rebuild them from the columns on unpickle
+        return {
+            "size": self.size, "fields": self.fields, "columns": self.columns,
+            "categories": self.categories, "kinds": self.kinds,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._getters = {}
+        for field, kind in self.kinds.items():
+            self._bind(field, kind)
+
+    def value(self, field: str, ordinal: int) -> Any:
+        return self._getters[field](ordinal)
+
+    def rows(self) -> List["ProductRow"]:
+        return [ProductRow(self, i) for i in range(self.size)]
+
+    def nbytes(self) -> int:
+        """Approximate size of the column buffers (arrays, text blobs, list slots)."""
+        total = 0
+        for column in self.columns.values():
+            if isinstance(column, np.ndarray):
+                total += column.nbytes
+            elif isinstance(column, tuple):  # (text blob, offsets)
+                total += len(column[0]) + column[1].nbytes
+            else:
+                total += 8 * len(column)
+        return total
+
+
+class ProductRow(Mapping):
+    """Read-only dict-like view of one product in a ProductStore."""
+
+    __slots__ = ("_store", "_ordinal")
+
+    def __init__(self, store: ProductStore, ordinal: int):
+        self._store = store
+        self._ordinal = ordinal
+
+    def __getitem__(self, field: str) -> Any:
+        try:
+            getter = self._store._getters[field]
+        except KeyError:
+            raise KeyError(field) from None
+        return getter(self._ordinal)
+
+    def __contains__(self, field: object) -> bool:
+        return field in self._store._getters
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.fields)
+
+    def __len__(self) -> int:
+        return len(self._store.fields)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ProductRow):
+            return self._store is other._store and self._ordinal == other._ordinal
+        return super().__eq__(other)
+
+    def __reduce__(self):
+        return (ProductRow, (self._store, self._ordinal))
+
+    @property
+    def ordinal(self) -> int:
+        return self._ordinal
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the product as a plain dict."""
+        return {field: self[field] for field in self._store.fields}
+
+    def __repr__(self) -> str:
+        return f"ProductRow({self.get('model_no', self._ordinal)!r})"
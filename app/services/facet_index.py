@@ -0,0 +1,77 @@
+"""
+Facet Index - Bitmap Filters for Product Catalog Attributes
+Keeps one NumPy bool array per (facet, value) pair over product ordinals,
+e.g. category=KITCHEN or finish_code=MB. A multi-facet filter is the AND
+of one bitmap per facet (OR within a facet when several values are
+given), which costs the same however many products each value matches.
+
+Ordinals are the document ids used by BM25Index, so a filter mask can be
+applied directly to keyword scores.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+
+def normalize_facet_value(value: Any) -> Any:
+    """Facet values compare case-insensitively; booleans are kept as-is."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().upper()
+
+
+class FacetIndex:
+    """Immutable bitmap index: facet -> value -> bool array over ordinals."""
+
+    def __init__(self, rows: Iterable[Mapping[str, Any]] = (), facets: Iterable[str] = ()):
+        self.facets = list(facets)
+        ordinals: Dict[str, Dict[Any, List[int]]] = {facet: {} for facet in self.facets}
+        size = 0
+        for ordinal, row in enumerate(rows):
+            size = ordinal + 1
+            for facet in self.facets:
+                value = normalize_facet_value(row.get(facet, ""))
+                if value != "":
+                    ordinals[facet].setdefault(value, []).append(ordinal)
+
+        self.size = size
+        self._bitmaps: Dict[str, Dict[Any, np.ndarray]] = {}
+        for facet, values in ordinals.items():
+            self._bitmaps[facet] = {}
+            for value, members in values.items():
+                bitmap = np.zeros(size, dtype=bool)
+                bitmap[members] = True
+                self._bitmaps[facet][value] = bitmap
+
+    def values(self, facet: str) -> Dict[Any, int]:
+        """Value -> product count for one facet."""
+        return {value: int(bitmap.sum()) for value, bitmap in self._bitmaps.get(facet, {}).items()}
+
+    def mask(self, filters: Mapping[str, Any]) -> Optional[np.ndarray]:
+        """
+        Bitmap of ordinals matching every filter.
+
+        Args:
+            filters: facet -> value, or a list of values (any of them matches).
+                     None values are ignored.
+
+        Returns:
+            Bool array over ordinals, or None when no filter is set
+        """
+        result = None
+        for facet, wanted in filters.items():
+            if wanted is None:
+                continue
+            if facet not in self._bitmaps:
+                raise KeyError(f"Unknown facet: {facet}")
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+
+            facet_mask = np.zeros(self.size, dtype=bool)
+            for value in wanted:
+                bitmap = self._bitmaps[facet].get(normalize_facet_value(value))
+                if bitmap is not None:
+                    facet_mask |= bitmap
+
+            result = facet_mask if result is None else (result & facet_mask)
+        return result
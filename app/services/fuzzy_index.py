@@ -0,0 +1,139 @@
+"""
+Fuzzy Index - Character N-Gram Index for Typo-Tolerant Model Number Lookups
+Finds the model numbers closest to a query by edit distance without
+comparing the query against every model.
+
+Model numbers are compared with separators stripped ('.', '-', ' '), so
+PBV2105 and PBV.2105 are identical. Each one is split into padded
+trigrams; a typo only disturbs the 3-4 trigrams around it, so the right
+model shares most of the query's trigrams. Candidates are ranked by
+shared trigrams (trigrams found in a large share of the catalog, like a
+common "100" prefix, are skipped) and only the best CANDIDATE_POOL are
+verified with a bit-parallel edit distance that counts swapped neighbours
+as one typo.
+
+Score = 1 - distance / max(len(query), len(model)), so 0.75 allows one
+typo per four characters.
+"""
+
+import heapq
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.services.prefix_index import strip_separators
+
+N = 3  # Trigrams
+CANDIDATE_POOL = 24           # Candidates verified with edit distance per query
+COMMON_GRAM_FRACTION = 0.02   # Skip trigrams found in more than 2% of models...
+MIN_COMMON_POSTINGS = 64      # ...once the catalog is big enough for that to matter
+MIN_GRAMS = 2                 # Use at least this many trigrams when all are common
+
+
+def _grams(text: str) -> Set[str]:
+    padded = "^" * (N - 1) + text + "$" * (N - 1)
+    return {padded[i:i + N] for i in range(len(padded) - N + 1)}
+
+
+def _pattern_masks(text: str) -> Dict[str, int]:
+    masks: Dict[str, int] = {}
+    for i, ch in enumerate(text):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+
+def _osa_distance(masks: Dict[str, int], length: int, other: str) -> int:
+    """
+    Bit-parallel optimal string alignment distance (Hyyrö 2003): insert,
+    delete, substitute, or swap adjacent characters. `masks` / `length`
+    describe the first string (see _pattern_masks).
+    """
+    if not length:
+        return len(other)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    vp, vn, d0, previous_pm = full, 0, 0, 0
+    distance = length
+    for ch in other:
+        pm = masks.get(ch, 0)
+        transposed = (((~d0) & pm) << 1) & previous_pm
+        d0 = ((((pm & vp) + vp) ^ vp) | pm | vn | transposed) & full
+        hp = vn | ~(d0 | vp)
+        hn = d0 & vp
+        if hp & last:
+            distance += 1
+        elif hn & last:
+            distance -= 1
+        hp = (hp << 1) | 1
+        hn = hn << 1
+        vp = (hn | ~(d0 | hp)) & full
+        vn = hp & d0 & full
+        previous_pm = pm
+    return distance
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Typo distance between two strings (swapped neighbours count as one)."""
+    return _osa_distance(_pattern_masks(a), len(a), b)
+
+
+class NGramIndex:
+    """Immutable trigram inverted index over model numbers."""
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self._keys: List[str] = list(dict.fromkeys(keys))
+        self._texts: List[str] = [strip_separators(key) for key in self._keys]
+        self._exact: Dict[str, List[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        for key_id, text in enumerate(self._texts):
+            self._exact.setdefault(text, []).append(key_id)
+            for gram in _grams(text):
+                self._postings.setdefault(gram, []).append(key_id)
+        self._common_limit = max(MIN_COMMON_POSTINGS, int(len(self._keys) * COMMON_GRAM_FRACTION))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _candidates(self, query: str, pool: int) -> List[int]:
+        """Key ids sharing the most trigrams with the query, best first."""
+        postings = sorted(
+            (self._postings[gram] for gram in sorted(_grams(query)) if gram in self._postings),
+            key=len,
+        )
+        selective = [p for p in postings if len(p) <= self._common_limit] or postings[:MIN_GRAMS]
+
+        counts = Counter()
+        for key_ids in selective:
+            counts.update(key_ids)
+        # Ties go to the earlier key, so results don't depend on set / hash order
+        ranked = heapq.nlargest(pool, counts.items(), key=lambda item: (item[1], -item[0]))
+        return [key_id for key_id, _ in ranked]
+
+    def search(self, query: str, threshold: float, limit: int) -> List[Tuple[str, float]]:
+        """
+        Keys with similarity >= threshold to the query.
+
+        Returns:
+            Up to `limit` (key, score) pairs, best first (ties in insertion order)
+        """
+        text = strip_separators(query.strip().upper())
+        if not text or limit <= 0:
+            return []
+
+        candidates = list(self._exact.get(text, ()))
+        candidates += self._candidates(text, max(CANDIDATE_POOL, limit * 2))
+
+        masks = _pattern_masks(text)
+        scored = {}
+        for key_id in candidates:
+            if key_id in scored:
+                continue
+            other = self._texts[key_id]
+            longest = max(len(text), len(other))
+            if abs(len(text) - len(other)) > (1 - threshold) * longest:
+                continue
+            score = 1 - _osa_distance(masks, len(text), other) / longest
+            if score >= threshold:
+                scored[key_id] = score
+
+        best = heapq.nsmallest(limit, ((-score, key_id) for key_id, score in scored.items()))
+        return [(self._keys[key_id], -neg) for neg, key_id in best]
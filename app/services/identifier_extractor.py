@@ -0,0 +1,274 @@
+"""
+Identifier Extractor - Single-Pass Model / Part / Order / Serial Number Extraction
+One precompiled engine for every place that pulls identifiers out of free
+text (ticket text, OCR output, document text, search results):
+
+- Pattern pass: one compiled alternation scanned once with finditer. Each
+  alternative is a named group (model, part, code, order, serial), so the
+  match says which class it is; order and serial numbers need a label
+  ("Order #", "PO", "S/N", ...) in front of them
+- Catalog pass: an Aho-Corasick automaton over every model and group
+  number in the loaded catalog, so catalog-verified mentions are found in
+  time linear in the text no matter how many products there are. It also
+  finds catalog numbers the patterns don't cover (15100, 160.6CSA). Until a
+  catalog is loaded, a loose NNN.N... pattern stands in for it, unverified
+
+Both passes honour alphanumeric boundaries: 100.1170 is not reported
+inside 100.1170CP. The automaton is built lazily from the catalog
+generation being served and rebuilt when the catalog version changes.
+"""
+
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODEL = "model"    # Product model / group number (100.1170CP, DKM.2420, HS6270MB)
+PART = "part"      # Spare part number (160.1168-9862, 156297-435, RP-12345)
+CODE = "code"      # Other product-like code (F2580CP, PBV1005A)
+ORDER = "order"    # Labelled order / PO / invoice number
+SERIAL = "serial"  # Labelled serial number
+PRODUCT_KINDS = (MODEL, PART, CODE)
+
+_LABEL_VALUE = r"\s*(?:\#|no\.?|num(?:ber)?\.?)?\s*[:\#]?\s*"
+
+# Alternatives are tried in order at each position: labelled numbers first,
+# then the most specific product patterns. Every group name is a kind.
+IDENTIFIER_PATTERN = re.compile(
+    r"""
+    \b(?:purchase\s+order|order|p\.?o|invoice|confirmation)\b\.?""" + _LABEL_VALUE + r"""
+        (?P<order>(?=[A-Z-]*\d)[A-Z0-9][A-Z0-9-]{3,19})(?![A-Z0-9])
+    | \b(?:serial|s/n|sn)\b\.?""" + _LABEL_VALUE + r"""
+        (?P<serial>(?=[A-Z-]*\d)[A-Z0-9][A-Z0-9-]{3,29})(?![A-Z0-9])
+    | (?<![A-Z0-9])(?P<part>
+          \d{3}\.\d{4}-\d{4}                    # 160.1168-9862
+        | \d{6}-\d{3}[A-Z]{0,4}                 # 156297-435
+        | \d{4}-\d{3}[A-Z]{0,3}                 # 7764-441BB
+        | RP-?\d{4,6}                           # RP-12345
+      )(?![A-Z0-9])
+    | (?<![A-Z0-9])(?P<model>
+          \d{2,3}\.[A-Z]{2,4}\.\d{4}[A-Z]{0,3}  # 10.GGC.4026CP
+        | \d{3}\.\d{4}(?:[A-Z]{1,3}|-[A-Z]{1,3})?  # 100.1050SB, 100.1170-PC
+        | \d{3}\.\d{2}[A-Z]{3,5}                # 160.16CSASG
+        | [A-Z]{1,4}\.\d{4}[A-Z]{0,3}           # DKM.2420, B.1200SS
+        | [A-Z]{2}\d{4}[A-Z]{0,2}               # HS6270MB, HS1006
+        | [A-Z]{2,3}-\d{3,4}(?:-?[A-Z]{1,3})?   # CFB-2250, HS-6270-MB
+      )(?![A-Z0-9])
+    | (?<![A-Z0-9])(?P<code>
+          [A-Z]{1,3}\d{4,6}[A-Z]{0,3}           # F2580CP, PBV1005A
+      )(?![A-Z0-9])
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+# Loose catalog-style model number (160.6CSA), only used when no catalog
+# automaton is available
+_FALLBACK_MODEL_PATTERN = re.compile(r"(?<![A-Z0-9])\d{3}\.\d+[A-Z]*(?![A-Z0-9])", re.IGNORECASE)
+
+_ASCII_UPPER = str.maketrans("abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+
+@dataclass(frozen=True)
+class Identifier:
+    """One identifier found in a text."""
+    kind: str               # MODEL, PART, CODE, ORDER or SERIAL
+    value: str              # Upper-cased identifier
+    start: int              # Span in the original text
+    end: int
+    verified: bool = False  # Exact catalog model / group number
+
+
+class Identifiers:
+    """Identifiers found in one text, in text order."""
+
+    def __init__(self, items: List[Identifier]):
+        self.items = items
+
+    def __iter__(self) -> Iterator[Identifier]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def values(self, *kinds: str, verified: bool = False, limit: Optional[int] = None) -> List[str]:
+        """
+        Distinct values of the given kinds (all kinds if none given), in text order.
+
+        Args:
+            kinds: Identifier kinds to include
+            verified: Only catalog-verified identifiers
+            limit: Maximum number of values
+        """
+        seen: Dict[str, None] = {}
+        for item in self.items:
+            if kinds and item.kind not in kinds:
+                continue
+            if verified and not item.verified:
+                continue
+            seen[item.value] = None
+            if limit is not None and len(seen) >= limit:
+                break
+        return list(seen)
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of keywords.
+
+    Keywords are matched case-sensitively; callers upper-case both sides.
+    Each keyword carries a kind that is reported with its matches.
+    """
+
+    def __init__(self, keywords: Dict[str, str]):
+        goto: List[Dict[str, int]] = [{}]
+        own: List[Tuple[Tuple[int, str], ...]] = [()]
+        for keyword, kind in keywords.items():
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    own.append(())
+                state = nxt
+            own[state] = ((len(keyword), kind),)
+
+        # Breadth-first failure links; each state's outputs include those of its failure chain
+        fail = [0] * len(goto)
+        outputs = list(own)
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fallback = goto[f].get(ch, 0)
+                fail[nxt] = fallback if fallback != nxt else 0
+                outputs[nxt] = own[nxt] + outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        self.size = len(keywords)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, kind) for every keyword occurrence, overlapping ones included."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, kind in outputs[state]:
+                yield i + 1 - length, i + 1, kind
+
+
+# =============================================================================
+# CATALOG AUTOMATON (one per catalog version)
+# =============================================================================
+
+_automaton: Tuple[Optional[str], Optional[KeywordAutomaton]] = (None, None)
+_automaton_lock = threading.Lock()
+
+
+def _catalog_keywords(catalog) -> Dict[str, str]:
+    """Catalog group / model numbers -> kind; spare parts are PART, everything else MODEL."""
+    keywords: Dict[str, str] = {}
+    for group in catalog.group_index:
+        keywords[group.upper()] = MODEL
+    for model_no, product in catalog.model_index.items():
+        keywords[model_no.upper()] = PART if product["is_spare_part"] else MODEL
+    # Catalog pseudo-products ("SPECIAL FINISH BOOK") are not identifiers
+    return {k: kind for k, kind in keywords.items() if any(ch.isdigit() for ch in k)}
+
+
+def _catalog_automaton() -> Optional[KeywordAutomaton]:
+    """Automaton for the catalog currently served, or None if no catalog is loaded (never loads it)."""
+    global _automaton
+    from app.services.product_catalog import get_catalog_version, get_product_catalog
+
+    version = get_catalog_version()
+    if version is None:
+        return None
+    cached_version, automaton = _automaton
+    if cached_version == version:
+        return automaton
+
+    with _automaton_lock:
+        cached_version, automaton = _automaton
+        if cached_version == version:
+            return automaton
+        indexes = get_product_catalog().indexes  # One generation, so keys and version agree
+        if not indexes.products:
+            return None
+        automaton = KeywordAutomaton(_catalog_keywords(indexes))
+        _automaton = (indexes.version, automaton)
+        logger.info(f"[IDENTIFIERS] Catalog automaton built: {automaton.size} numbers (version {indexes.version})")
+        return automaton
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+
+def _is_boundary(text: str, start: int, end: int) -> bool:
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+def extract_identifiers(text: str, use_catalog: bool = True) -> Identifiers:
+    """
+    Find every model, part, code, order and serial number in a text.
+
+    Args:
+        text: Free text (ticket, OCR output, document text, ...)
+        use_catalog: Also run the catalog pass (marks catalog numbers as verified)
+
+    Returns:
+        Identifiers in text order
+    """
+    if not text:
+        return Identifiers([])
+
+    found: Dict[Tuple[int, int], Identifier] = {}
+    for match in IDENTIFIER_PATTERN.finditer(text):
+        kind = match.lastgroup
+        start, end = match.span(kind)
+        found[(start, end)] = Identifier(kind, match.group(kind).upper(), start, end)
+
+    automaton = _catalog_automaton() if use_catalog else None
+    if automaton is not None:
+        upper = text.translate(_ASCII_UPPER)
+        for start, end, kind in automaton.iter_matches(upper):
+            if not _is_boundary(upper, start, end):
+                continue
+            existing = found.get((start, end))
+            if existing is not None and existing.kind in (ORDER, SERIAL):
+                continue
+            found[(start, end)] = Identifier(kind, upper[start:end], start, end, verified=True)
+    elif use_catalog:
+        # No catalog loaded yet: keep catching catalog-style numbers unverified
+        for match in _FALLBACK_MODEL_PATTERN.finditer(text):
+            start, end = match.span()
+            if not any(start < e and s < end for s, e in found):
+                found[(start, end)] = Identifier(MODEL, match.group().upper(), start, end)
+
+    return Identifiers([found[span] for span in sorted(found, key=lambda s: (s[0], -s[1]))])
+
+
+def is_identifier(text: str, kinds: Iterable[str] = PRODUCT_KINDS) -> bool:
+    """True if the whole (stripped) text is one identifier of the given kinds."""
+    if not isinstance(text, str):
+        return False
+    stripped = text.strip()
+    if not stripped or len(stripped) > 30:
+        return False
+    kinds = tuple(kinds)
+    return any(
+        item.start == 0 and item.end == len(stripped) and item.kind in kinds
+        for item in extract_identifiers(stripped)
+    )
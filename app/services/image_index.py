@@ -0,0 +1,417 @@
+"""
+Image Index - Local Mirror of the Pinecone Image Index
+Exact (brute-force) NumPy search over the same 512-d CLIP catalog
+embeddings the Pinecone image index holds, so vision search can skip the
+network round trip ("primary") or keep answering when Pinecone is down
+("fallback"); see settings.vision_local_index_mode.
+
+- Vectors are one float32 matrix, L2-normalized once for cosine indexes;
+  a query is one matrix-vector product plus argpartition. The catalog's
+  few thousand product images are a ~12 MB matrix searched in about a
+  millisecond, so an approximate graph (HNSW) would only cost recall
+- Metadata filters take Pinecone's syntax (bare values, $eq, $ne, $in,
+  $nin, $gt, $gte, $lt, $lte, $exists, $and, $or) and are evaluated as
+  boolean masks over per-field metadata columns; scalar fields are
+  dictionary encoded on first use, so equality / membership filters are
+  NumPy comparisons
+- Hits have the same shape as PineconeClient.query_images
+
+The mirror is stored with the catalog snapshot format (mmap'd, see
+catalog_snapshot) and refreshed by a sync job that pages through the
+Pinecone index with list() + fetch():
+
+    python -m app.services.image_index
+    python -m app.services.image_index --output data/image_index.bin
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.catalog_snapshot import read_snapshot, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent.parent
+IMAGE_INDEX_PATH = BASE_DIR / "data" / "image_index.bin"
+IMAGE_INDEX_FORMAT_VERSION = 1
+FETCH_BATCH_SIZE = 100  # Ids per Pinecone fetch() call
+SUPPORTED_METRICS = ("cosine", "dotproduct")
+
+
+def image_hit(vector_id: str, score: float, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """RetrievalHit for an image index match (shared by Pinecone and the local mirror)."""
+    # readable content summary
+    parts = []
+    for key in ["product_title", "model_no", "finish", "product_category"]:
+        if key in metadata:
+            parts.append(f"{key.capitalize()}: {metadata[key]}")
+
+    return {
+        "id": vector_id,
+        "score": score,
+        "metadata": metadata,
+        "content": " | ".join(parts) if parts else "Product Match",
+    }
+
+
+# =============================================================================
+# METADATA FILTERS (Pinecone syntax)
+# =============================================================================
+
+_MISSING = object()
+
+
+def _as_list(value: Any) -> Sequence[Any]:
+    return value if isinstance(value, (list, tuple)) else (value,)
+
+
+def _compare(op: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    def test(value: Any, operand: Any) -> bool:
+        try:
+            return value is not _MISSING and op(value, operand)
+        except TypeError:
+            return False
+    return test
+
+
+# List-valued metadata (e.g. tags) matches $eq / $in when any element matches
+_FILTER_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda v, x: v is not _MISSING and x in _as_list(v),
+    "$ne": lambda v, x: v is not _MISSING and x not in _as_list(v),
+    "$in": lambda v, x: v is not _MISSING and any(e in x for e in _as_list(v)),
+    "$nin": lambda v, x: v is not _MISSING and not any(e in x for e in _as_list(v)),
+    "$gt": _compare(lambda v, x: v > x),
+    "$gte": _compare(lambda v, x: v >= x),
+    "$lt": _compare(lambda v, x: v < x),
+    "$lte": _compare(lambda v, x: v <= x),
+    "$exists": lambda v, x: (v is not _MISSING) == bool(x),
+}
+
+
+class LocalImageIndex:
+    """Immutable in-memory image vector index (exact search)."""
+
+    def __init__(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        metadata: List[Dict[str, Any]],
+        metric: str = "cosine",
+        synced_at: Optional[float] = None,
+    ):
+        """
+        Args:
+            ids: Vector ids
+            vectors: (n, dim) float32 matrix, already L2-normalized for cosine (see build())
+            metadata: Metadata dict per vector
+            metric: Pinecone metric of the mirrored index ("cosine" or "dotproduct")
+            synced_at: Unix time of the Pinecone sync
+        """
+        if metric not in SUPPORTED_METRICS:
+            raise ValueError(f"Unsupported metric '{metric}' (supported: {', '.join(SUPPORTED_METRICS)})")
+        if len(ids) != len(vectors) or len(ids) != len(metadata):
+            raise ValueError("ids, vectors and metadata must have the same length")
+        self.ids = ids
+        self.vectors = vectors
+        self.metadata = metadata
+        self.metric = metric
+        self.synced_at = synced_at
+        self._columns: Dict[str, List[Any]] = {}  # metadata field -> values (built on first filter)
+        self._encoded: Dict[str, Optional[Tuple[np.ndarray, Dict[Any, int]]]] = {}  # field -> (codes, value -> code)
+
+    @classmethod
+    def build(
+        cls,
+        ids: Iterable[str],
+        vectors: Iterable[Sequence[float]],
+        metadata: Iterable[Optional[Dict[str, Any]]],
+        metric: str = "cosine",
+        synced_at: Optional[float] = None,
+    ) -> "LocalImageIndex":
+        """Index raw vectors (normalizing them for cosine)."""
+        rows = list(vectors)
+        matrix = np.array(rows, dtype=np.float32) if rows else np.zeros((0, 0), dtype=np.float32)
+        if metric == "cosine":
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms > 0, norms, 1.0)
+        return cls(list(ids), matrix, [dict(m or {}) for m in metadata], metric, synced_at)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        return self.vectors.shape[1] if self.vectors.ndim == 2 else 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "vectors": len(self),
+            "dimension": self.dimension,
+            "metric": self.metric,
+            "synced_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.synced_at)) if self.synced_at else None,
+            "matrix_mb": round(self.vectors.nbytes / 1024 / 1024, 2),
+        }
+
+    # -------------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------------
+
+    def query(
+        self,
+        vector: Sequence[float],
+        top_k: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Exact top-k search, same arguments and hit format as PineconeClient.query_images.
+
+        Returns:
+            Hits sorted by score (highest first)
+        """
+        if not len(self):
+            return []
+        query = np.asarray(vector, dtype=np.float32).ravel()
+        if query.shape[0] != self.dimension:
+            raise ValueError(f"Query has {query.shape[0]} dimensions, index has {self.dimension}")
+        if self.metric == "cosine":
+            norm = np.linalg.norm(query)
+            if not norm:
+                return []
+            query = query / norm
+
+        scores = self.vectors @ query
+        candidates = np.flatnonzero(self._mask(filter_dict)) if filter_dict else None
+        candidate_scores = scores[candidates] if candidates is not None else scores
+
+        k = min(top_k, len(candidate_scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-candidate_scores, k - 1)[:k]
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+        rows = candidates[top] if candidates is not None else top
+        return [image_hit(self.ids[i], float(scores[i]), self.metadata[i]) for i in rows]
+
+    def _column(self, field: str) -> List[Any]:
+        column = self._columns.get(field)
+        if column is None:
+            column = [m.get(field, _MISSING) for m in self.metadata]
+            self._columns[field] = column
+        return column
+
+    def _encode(self, field: str) -> Optional[Tuple[np.ndarray, Dict[Any, int]]]:
+        """Dictionary-encode a scalar metadata field (missing = -1); None if it holds lists."""
+        if field not in self._encoded:
+            lookup: Dict[Any, int] = {}
+            codes = np.full(len(self), -1, dtype=np.int32)
+            encoded: Optional[Tuple[np.ndarray, Dict[Any, int]]] = (codes, lookup)
+            for i, value in enumerate(self._column(field)):
+                if value is _MISSING:
+                    continue
+                if isinstance(value, (list, tuple, dict)):
+                    encoded = None
+                    break
+                codes[i] = lookup.setdefault(value, len(lookup))
+            self._encoded[field] = encoded
+        return self._encoded[field]
+
+    def _field_mask(self, field: str, op: str, operand: Any) -> np.ndarray:
+        test = _FILTER_OPS.get(op)
+        if test is None:
+            raise ValueError(f"Unsupported filter operator '{op}'")
+
+        encoded = self._encode(field) if op in ("$eq", "$ne", "$in", "$nin") else None
+        if encoded is not None:
+            codes, lookup = encoded
+            if op in ("$eq", "$ne"):
+                hit = codes == lookup.get(operand, -2)
+            else:
+                hit = np.isin(codes, [lookup[v] for v in operand if v in lookup])
+            return hit if op in ("$eq", "$in") else ~hit & (codes >= 0)
+
+        column = self._column(field)
+        return np.fromiter((test(value, operand) for value in column), dtype=bool, count=len(column))
+
+    def _mask(self, filter_dict: Dict[str, Any]) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        for key, condition in filter_dict.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._mask(clause)
+            elif key == "$or":
+                any_mask = np.zeros(len(self), dtype=bool)
+                for clause in condition:
+                    any_mask |= self._mask(clause)
+                mask &= any_mask
+            else:
+                if not isinstance(condition, dict):
+                    condition = {"$eq": condition}
+                for op, operand in condition.items():
+                    mask &= self._field_mask(key, op, operand)
+        return mask
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self, path: Optional[str] = None, source: Optional[str] = None) -> int:
+        """Write the index to a mirror file (atomic); returns its size in bytes."""
+        path = Path(path) if path else IMAGE_INDEX_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = {"ids": self.ids, "vectors": self.vectors, "metadata": self.metadata}
+        return write_snapshot(str(path), state, {
+            "format_version": IMAGE_INDEX_FORMAT_VERSION,
+            "source": source,
+            "metric": self.metric,
+            "dimension": self.dimension,
+            "vectors": len(self),
+            "synced_at": self.synced_at,
+        })
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "LocalImageIndex":
+        """Map a mirror file written by save(); the matrix stays a read-only view of the file."""
+        header, state = read_snapshot(str(path or IMAGE_INDEX_PATH))
+        if header.get("format_version") != IMAGE_INDEX_FORMAT_VERSION:
+            raise ValueError(f"Image index format {header.get('format_version')} != {IMAGE_INDEX_FORMAT_VERSION}")
+        return cls(state["ids"], state["vectors"], state["metadata"], header["metric"], header.get("synced_at"))
+
+
+# =============================================================================
+# SYNC FROM PINECONE
+# =============================================================================
+
+def fetch_pinecone_image_index(client=None, namespace: str = "", batch_size: int = FETCH_BATCH_SIZE) -> LocalImageIndex:
+    """
+    Copy every vector + metadata of the Pinecone image index into a LocalImageIndex.
+
+    Args:
+        client: PineconeClient (default: the shared client)
+        namespace: Pinecone namespace
+        batch_size: Ids per fetch() call
+    """
+    if client is None:
+        from app.clients.pinecone_client import get_pinecone_client
+        client = get_pinecone_client()
+
+    start = time.time()
+    metric = client.image_index_metric()
+    ids: List[str] = []
+    vectors: List[Sequence[float]] = []
+    metadata: List[Dict[str, Any]] = []
+    for page in client.list_image_ids(namespace=namespace):
+        page = list(page)
+        for offset in range(0, len(page), batch_size):
+            fetched = client.fetch_images(page[offset:offset + batch_size], namespace=namespace)
+            for vector_id, vector in fetched.items():
+                ids.append(vector_id)
+                vectors.append(vector.values)
+                metadata.append(vector.metadata or {})
+
+    logger.info(f"[IMAGE_INDEX] Fetched {len(ids)} vectors from Pinecone in {time.time() - start:.1f}s")
+    return LocalImageIndex.build(ids, vectors, metadata, metric=metric, synced_at=start)
+
+
+_local_index: Optional[LocalImageIndex] = None
+_load_attempted = False
+_lock = threading.Lock()
+
+
+def get_local_image_index() -> Optional[LocalImageIndex]:
+    """The local mirror, loaded from disk on first use; None if it has not been synced yet."""
+    global _local_index, _load_attempted
+    if _local_index is not None or _load_attempted:
+        return _local_index
+    with _lock:
+        if not _load_attempted:
+            _load_attempted = True
+            _local_index = _load_mirror()
+    return _local_index
+
+
+def _mirror_path() -> Path:
+    from app.config.settings import settings
+    if not settings.vision_local_index_path:
+        return IMAGE_INDEX_PATH
+    path = Path(settings.vision_local_index_path)
+    return path if path.is_absolute() else BASE_DIR / path
+
+
+def _load_mirror() -> Optional[LocalImageIndex]:
+    path = _mirror_path()
+    if not path.exists():
+        logger.info(f"[IMAGE_INDEX] No local mirror at {path} (run the sync job)")
+        return None
+    try:
+        index = LocalImageIndex.load(str(path))
+        logger.info(f"[IMAGE_INDEX] Loaded local mirror: {len(index)} vectors ({index.metric})")
+        return index
+    except Exception as e:
+        logger.error(f"[IMAGE_INDEX] Failed to load local mirror {path}: {e}")
+        return None
+
+
+def sync_local_image_index(path: Optional[str] = None) -> LocalImageIndex:
+    """Fetch the Pinecone image index, write the mirror file and start serving it."""
+    global _local_index, _load_attempted
+    from app.config.settings import settings
+
+    index = fetch_pinecone_image_index()
+    size = index.save(path or str(_mirror_path()), source=settings.pinecone_image_index)
+    _local_index = index  # Single reference swap; queries in flight keep the old one
+    _load_attempted = True
+    logger.info(f"[IMAGE_INDEX] Mirror synced: {len(index)} vectors, {size / 1024 / 1024:.1f} MB")
+    return index
+
+
+def _sync_loop(interval_seconds: float) -> None:
+    """Background thread that re-syncs the mirror periodically."""
+    logger.info("[IMAGE_INDEX] Background sync thread started")
+    while True:
+        index = get_local_image_index()
+        age = time.time() - (index.synced_at or 0) if index else None
+        if age is None or age >= interval_seconds:
+            try:
+                sync_local_image_index()
+            except Exception as e:
+                logger.error(f"[IMAGE_INDEX] Sync failed (keeping current mirror): {e}")
+        time.sleep(min(interval_seconds, 3600))
+
+
+def init_local_image_index() -> Optional[LocalImageIndex]:
+    """Load the mirror on startup and start the periodic Pinecone sync (settings.vision_local_index_sync_hours)."""
+    from app.config.settings import settings
+
+    index = get_local_image_index()
+    if settings.vision_local_index_sync_hours > 0:
+        thread = threading.Thread(
+            target=_sync_loop, args=(settings.vision_local_index_sync_hours * 3600,),
+            name="image-index-sync", daemon=True,
+        )
+        thread.start()
+    return index
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Sync the local image index mirror from Pinecone."""
+    parser = argparse.ArgumentParser(description="Mirror the Pinecone image index to a local file")
+    parser.add_argument("--output", default=None, help="Mirror path (default: settings.vision_local_index_path)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        sync_local_image_index(args.output)
+    except Exception as e:
+        logger.error(f"[IMAGE_INDEX] Sync failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Parts Index - Spare Part <-> Product Group Adjacency
+Precomputed both ways at catalog load, so "which spare parts fit this
+product?" and "which products use this part?" are dict lookups instead of
+scans over every model number.
+
+Links are (group number, spare part model number) pairs; how they are
+derived (part numbers built on the group, groups named in the part's
+title / keywords) is up to the catalog building the index. Each adjacency
+list keeps the order the links were given in.
+"""
+
+from typing import Dict, Iterable, Tuple
+
+_EMPTY: Tuple[str, ...] = ()
+
+
+class SparePartsIndex:
+    """Immutable bidirectional group <-> spare part adjacency."""
+
+    def __init__(self, links: Iterable[Tuple[str, str]] = ()):
+        parts: Dict[str, Dict[str, None]] = {}
+        groups: Dict[str, Dict[str, None]] = {}
+        for group, part in links:
+            parts.setdefault(group, {})[part] = None
+            groups.setdefault(part, {})[group] = None
+
+        self._parts: Dict[str, Tuple[str, ...]] = {group: tuple(p) for group, p in parts.items()}
+        self._groups: Dict[str, Tuple[str, ...]] = {part: tuple(g) for part, g in groups.items()}
+
+    def __len__(self) -> int:
+        """Number of spare parts linked to at least one group."""
+        return len(self._groups)
+
+    @property
+    def link_count(self) -> int:
+        return sum(len(parts) for parts in self._parts.values())
+
+    def parts_for(self, group: str) -> Tuple[str, ...]:
+        """Spare part model numbers linked to a group."""
+        return self._parts.get(group, _EMPTY)
+
+    def groups_for(self, part: str) -> Tuple[str, ...]:
+        """Group numbers a spare part is linked to."""
+        return self._groups.get(part, _EMPTY)
@@ -0,0 +1,88 @@
+"""
+Prefix Index - Sorted-Array Index for Model / Group Number Lookups
+Answers "keys starting with X" and "keys that X starts with" in
+O(log n + k) using bisect over a sorted array, instead of scanning every key.
+
+Each entry is an (indexed text, key) pair, so one key can be indexed under
+several forms (raw, separator-stripped, suffixes for substring search).
+Results come back in the order keys were first added, which matches the
+dict iteration order of the scans this replaces.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_MAX_CHAR = "\U0010FFFF"  # Sorts after every real character
+
+
+def strip_separators(text: str) -> str:
+    """Drop '.', '-' and ' ' so PBV2105, PBV.2105 and PBV-2105 compare equal."""
+    return text.replace(".", "").replace("-", "").replace(" ", "")
+
+
+class PrefixIndex:
+    """Immutable sorted-array prefix index."""
+
+    def __init__(self, entries: Iterable[Tuple[str, str]] = ()):
+        order: Dict[str, int] = {}
+        rows = []
+        for text, key in entries:
+            rows.append((text, order.setdefault(key, len(order))))
+        rows.sort()
+
+        self._texts: List[str] = [text for text, _ in rows]
+        self._ordinals: List[int] = [ordinal for _, ordinal in rows]
+        self._text_set = set(self._texts)
+        self._keys: List[str] = list(order)  # ordinal -> key
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[str]) -> "PrefixIndex":
+        """Index keys under their own text."""
+        return cls((key, key) for key in keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _with_prefix(self, prefix: str) -> List[int]:
+        lo = bisect_left(self._texts, prefix)
+        hi = bisect_left(self._texts, prefix + _MAX_CHAR, lo)
+        return self._ordinals[lo:hi]
+
+    def _prefixes_of(self, text: str) -> List[int]:
+        ordinals = []
+        for end in range(len(text) + 1):
+            head = text[:end]
+            if head in self._text_set:
+                lo = bisect_left(self._texts, head)
+                ordinals.extend(self._ordinals[lo:bisect_right(self._texts, head, lo)])
+        return ordinals
+
+    def lookup(
+        self,
+        prefixes: Iterable[str] = (),
+        prefix_of: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Keys with an indexed text starting with any of `prefixes`, plus keys
+        with an indexed text that `prefix_of` starts with.
+
+        Returns:
+            Unique keys in insertion order, at most `limit`
+        """
+        ordinals = set()
+        for prefix in prefixes:
+            ordinals.update(self._with_prefix(prefix))
+        if prefix_of is not None:
+            ordinals.update(self._prefixes_of(prefix_of))
+
+        if limit is not None and limit < len(ordinals):
+            ranked = heapq.nsmallest(limit, ordinals)
+        else:
+            ranked = sorted(ordinals)
+        return [self._keys[ordinal] for ordinal in ranked]
+
+    def starting_with(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Keys with an indexed text starting with `prefix`."""
+        return self.lookup((prefix,), limit=limit)
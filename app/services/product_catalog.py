@@ -4,23 +4,44 @@ Loads product data from JSON manifest and provides fast multi-strategy search.
 
 Features:
 - Multiple search indexes (model, group, category, collection, finish, keywords)
-- Exact, prefix, fuzzy, and keyword-based search
+- Exact, prefix, fuzzy (trigram index + edit distance), and keyword-based search
+- BM25 keyword ranking with per-field weights
+- Bitmap facet filters (category, sub-category, collection, finish, spare part)
+- Sorted-array prefix indexes for model / group lookups
+- Spare part <-> product group adjacency (related parts, products using a part)
 - Finish code to name mapping
 - Group/variation awareness
-- Rich product data with 70 fields
+- Rich product data with 70 fields, stored columnar (see catalog_store)
+- Prebuilt memory-mapped snapshot for fast cold starts (see catalog_snapshot)
+- Hot reload from a new manifest / sheet export with an atomic index swap
+  and a catalog version (short SHA-256 of the source) in get_stats()
 
 Data Source: metadata_manifest.json (5,687 products)
 """
 
+import csv
+import hashlib
+import io
 import json
 import logging
 import os
 import re
+import sys
 import threading
 import time
-from typing import Dict, Any, List, Optional, Set, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
-from difflib import SequenceMatcher
+
+import numpy as np
+import requests
+
+from app.services.bm25_index import BM25Index, tokenize
+from app.services.catalog_snapshot import fingerprint, read_header, read_snapshot, write_snapshot
+from app.services.catalog_store import ProductRow, ProductStore
+from app.services.facet_index import FacetIndex
+from app.services.fuzzy_index import NGramIndex
+from app.services.parts_index import SparePartsIndex
+from app.services.prefix_index import PrefixIndex, strip_separators
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +51,34 @@ logger = logging.getLogger(__name__)
 # Path to the JSON manifest file (relative to project root)
 JSON_MANIFEST_PATH = "data/metadata_manifest.json"
 
+# Prebuilt snapshot of the indexed catalog (python -m app.services.catalog_snapshot)
+CATALOG_SNAPSHOT_PATH = "data/catalog_snapshot.bin"
+SNAPSHOT_FORMAT_VERSION = 3  # Bump when the store or index layouts change
+
+# Hot reload
+CATALOG_VERSION_LENGTH = 12      # Hex chars of the source SHA-256 used as the catalog version
+SOURCE_DOWNLOAD_TIMEOUT = 60     # Seconds, for manifest / sheet export URLs
+
 # Search configuration
-FUZZY_MATCH_THRESHOLD = 0.75  # Minimum similarity for fuzzy matches
-MAX_FUZZY_CANDIDATES = 100     # Max candidates to check for fuzzy match
+FUZZY_MATCH_THRESHOLD = 0.75  # Minimum similarity for fuzzy matches (1 typo per 4 chars)
 MAX_RESULTS_DEFAULT = 10       # Default number of results to return
 
+# BM25 field weights for keyword search (title > model/group > features > category)
+KEYWORD_FIELD_WEIGHTS = {
+    "title": 3.0,
+    "model_no": 2.0,
+    "group_number": 2.0,
+    "keywords": 1.5,
+    "features": 1.0,
+    "collection": 1.0,
+    "finish_name": 1.0,
+    "category": 0.5,
+    "sub_category": 0.5,
+}
+
+# Product fields with a bitmap in the facet index
+FACET_FIELDS = ["category", "sub_category", "collection", "finish_code", "is_spare_part"]
+
 # =============================================================================
 # FINISH CODE MAPPING
 # =============================================================================
@@ -77,27 +121,19 @@ FINISH_NAME_TO_CODE = {v.upper(): k for k, v in FINISH_CODE_MAP.items()}
 # =============================================================================
 # GLOBAL STATE
 # =============================================================================
-class ProductCatalog:
-    """In-memory product catalog with multiple search indexes."""
-    
-    _instance = None
-    _lock = threading.Lock()
+class CatalogIndexes:
+    """
+    One immutable generation of the catalog: the columnar store plus every
+    search index built from it.
     
-    def __new__(cls):
-        """Singleton pattern to ensure single catalog instance."""
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
+    ProductCatalog serves reads from its current generation and replaces it
+    wholesale on reload, so a search never sees two generations at once.
+    """
     
-    def __init__(self):
-        if self._initialized:
-            return
-            
-        self._initialized = True
-        self.products: List[Dict[str, Any]] = []
+    def __init__(self, records: List[Dict[str, Any]] = (), version: Optional[str] = None):
+        self.version = version  # Short SHA-256 of the source manifest / sheet export
+        self.store: Optional[ProductStore] = None  # Columnar product data
+        self.products: List[Dict[str, Any]] = []  # ProductRow views into the store
         
         # Primary indexes
         self.model_index: Dict[str, Dict[str, Any]] = {}  # MODEL_NO -> product
@@ -109,220 +145,51 @@ class ProductCatalog:
         self.collection_index: Dict[str, List[Dict[str, Any]]] = {}
         self.finish_index: Dict[str, List[Dict[str, Any]]] = {}
         
-        # Keyword index (inverted index for text search)
-        self.keyword_index: Dict[str, Set[str]] = {}  # keyword -> set of MODEL_NOs
+        # Keyword index (BM25 over MODEL_NOs) and facet bitmaps over the same ordinals
+        self.keyword_index = BM25Index()
+        self.facet_index = FacetIndex(facets=FACET_FIELDS)  # Facets known before load: filters match nothing
+        self.ordinal_products: List[Dict[str, Any]] = []  # ordinal -> product
         
-        # Model numbers list for fuzzy search
+        # Model numbers list and trigram index for fuzzy search
         self.all_model_numbers: List[str] = []
+        self.fuzzy_index = NGramIndex()
         
-        # Statistics
-        self.stats = {
-            "total_products": 0,
-            "total_groups": 0,
-            "total_categories": 0,
-            "total_collections": 0,
-            "load_time_ms": 0,
-            "last_loaded": None
-        }
-        
-        logger.info("[PRODUCT_CATALOG] ProductCatalog instance created")
-    
-    def load_from_json(self, json_path: Optional[str] = None) -> bool:
-        """
-        Load product data from JSON manifest file.
-        
-        Args:
-            json_path: Path to JSON file. If None, uses default path.
-            
-        Returns:
-            True if loaded successfully, False otherwise.
-        """
-        start_time = time.time()
-        
-        if json_path is None:
-            # Try to find the JSON file relative to project root
-            project_root = Path(__file__).parent.parent.parent
-            json_path = project_root / JSON_MANIFEST_PATH
-        else:
-            json_path = Path(json_path)
+        # Prefix indexes (sorted arrays, O(log n + k) prefix lookups)
+        self.model_prefix_index = PrefixIndex()   # MODEL_NO
+        self.group_prefix_index = PrefixIndex()   # GROUP
+        self.group_nosep_index = PrefixIndex()    # GROUP without '.' / '-' -> GROUP
         
-        if not json_path.exists():
-            logger.error(f"[PRODUCT_CATALOG] JSON file not found: {json_path}")
-            return False
+        # Spare part MODEL_NO <-> GROUP links, both directions
+        self.parts_index = SparePartsIndex()
         
-        try:
-            logger.info(f"[PRODUCT_CATALOG] Loading products from: {json_path}")
-            
-            with open(json_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
+        if records:
+            # Store columnar and index the row views
+            for product in self._build_store(records):
+                self.products.append(product)
+                self._index_product(product)
             
-            logger.info(f"[PRODUCT_CATALOG] Loaded {len(raw_data)} raw records")
-            
-            # Parse and index products
-            self._clear_indexes()
-            
-            for item in raw_data:
-                metadata = item.get("metadata", {})
-                if not metadata:
-                    continue
-                
-                # Normalize and store product
-                product = self._normalize_product(metadata, item)
-                if product and product.get("model_no"):
-                    self.products.append(product)
-                    self._index_product(product)
-            
-            # Build keyword index
             self._build_keyword_index()
-            
-            # Update statistics
-            load_time = (time.time() - start_time) * 1000
-            self.stats = {
-                "total_products": len(self.products),
-                "total_groups": len(self.group_index),
-                "total_categories": len(self.category_index),
-                "total_collections": len(self.collection_index),
-                "load_time_ms": round(load_time, 2),
-                "last_loaded": time.strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            logger.info(f"[PRODUCT_CATALOG] ✅ Loaded {self.stats['total_products']} products "
-                       f"in {load_time:.0f}ms ({self.stats['total_groups']} groups)")
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"[PRODUCT_CATALOG] Failed to load JSON: {e}", exc_info=True)
-            return False
-    
-    def _clear_indexes(self):
-        """Clear all indexes."""
-        self.products = []
-        self.model_index = {}
-        self.group_index = {}
-        self.category_index = {}
-        self.sub_category_index = {}
-        self.collection_index = {}
-        self.finish_index = {}
-        self.keyword_index = {}
-        self.all_model_numbers = []
-    
-    def _normalize_product(self, metadata: Dict[str, Any], raw_item: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Normalize product data into a clean, consistent structure.
-        
-        Extracts and normalizes all 70 fields into a usable format.
-        """
-        model_no = str(metadata.get("Model_NO", "")).strip().upper()
-        if not model_no:
-            return None
-        
-        group_no = str(metadata.get("Common_Group_Number", "")).strip().upper()
-        
-        # Extract finish code from model number
-        finish_code = ""
-        finish_name = metadata.get("Finish", "")
-        if group_no and model_no.startswith(group_no):
-            finish_code = model_no[len(group_no):].strip()
+            self._build_facet_index()
+            self._build_prefix_indexes()
+            self._build_parts_index()
+            self._build_fuzzy_index()
         
-        # Build feature bullets list
-        features = []
-        for i in range(1, 7):
-            bullet = metadata.get(f"Description Bullet {i}", "")
-            if bullet and str(bullet).strip():
-                features.append(str(bullet).strip())
-        
-        # Parse dimensions
-        def safe_float(val, default=0.0):
-            try:
-                return float(val) if val else default
-            except (ValueError, TypeError):
-                return default
-        
-        # Build normalized product
-        product = {
-            # Core identification
-            "model_no": model_no,
-            "group_number": group_no or model_no,
-            "main_model_number": str(metadata.get("Main_Model_Number", "")).strip(),
-            "upc": str(metadata.get("Item_UPC_Number", "")).strip(),
-            
-            # Product info
-            "title": str(metadata.get("Product_Title", "")).strip(),
-            "description": str(metadata.get("Description", "")).strip(),
-            "keywords": str(metadata.get("Keywords", "")).strip(),
-            "features": features,
-            
-            # Classification
-            "category": str(metadata.get("Product_Category", "")).strip(),
-            "sub_category": str(metadata.get("Sub_Product_Category", "")).strip(),
-            "sub_sub_category": str(metadata.get("Sub_Sub_Product_Category", "")).strip(),
-            "collection": str(metadata.get("Collection", "")).strip(),
-            "style": str(metadata.get("Style", "")).strip(),
-            
-            # Finish
-            "finish_code": finish_code,
-            "finish_name": finish_name,
-            
-            # Pricing
-            "list_price": safe_float(metadata.get("List_Price")),
-            "map_price": safe_float(metadata.get("MAP_Price")),
-            "cad_price": safe_float(metadata.get("CAD_List_Price")),
-            
-            # Specifications
-            "flow_rate_gpm": safe_float(metadata.get("Flow_Rate_GPM")),
-            "holes_needed": int(safe_float(metadata.get("Holes_Needed_For_Installation"))),
-            "height_inches": safe_float(metadata.get("Product_Height_Inches")),
-            "length_inches": safe_float(metadata.get("Product_Length_Inches")),
-            "width_inches": safe_float(metadata.get("Product_Width_Inches")),
-            "weight_lbs": safe_float(metadata.get("Package_Weight_lbs")),
-            "is_touch_capable": str(metadata.get("IS_Touch_Capable", "")).upper() == "TRUE",
-            
-            # Status flags
-            "status": str(metadata.get("Product_Status", "")).strip(),
-            "is_active": str(metadata.get("Product_Status", "")).upper() in ["ACTIVE", ""],
-            "is_spare_part": str(metadata.get("Is_Spare_Part", "")).upper() == "TRUE",
-            "is_special_finish": str(metadata.get("Is_Special_Finish", "")).upper() == "TRUE",
-            "display_on_website": str(metadata.get("Display_On_Website", "")).upper() == "YES",
-            "can_sell_online": str(metadata.get("Can_Sell_Online", "")).upper() == "YES",
-            
-            # URLs
-            "product_url": self._ensure_https(metadata.get("product_url", "")),
-            "image_url": self._ensure_https(metadata.get("Image_URL", "")),
-            "collection_url": str(metadata.get("Collection_URL", "")).strip(),
-            
-            # Document URLs
-            "spec_sheet_url": self._ensure_https(metadata.get("Spec_Sheet_Full_URL", "")),
-            "install_manual_url": self._ensure_https(metadata.get("Installation_manual_Full_URL", "")),
-            "parts_diagram_url": self._ensure_https(metadata.get("Part_Diagram_Full_URL", "")),
-            
-            # Document filenames
-            "spec_sheet_file": str(metadata.get("Spec_Sheet_File_Name", "")).strip(),
-            "install_manual_file": str(metadata.get("Installation_Manual_File_Name", "")).strip(),
-            "parts_diagram_file": str(metadata.get("Parts_Diagram_File_Name", "")).strip(),
-            
-            # Video URLs
-            "install_video_url": str(metadata.get("Installation_video_Link", "")).strip(),
-            "operational_video_url": str(metadata.get("Operational_Video_Link", "")).strip(),
-            "lifestyle_video_url": str(metadata.get("Lifestyle_Video_Link", "")).strip(),
-            
-            # Warranty
-            "warranty": str(metadata.get("Warranty", "")).strip(),
-            
-            # Popularity (for ranking)
-            "popularity": int(safe_float(metadata.get("Popularity", 0))),
+        # Statistics (ProductCatalog adds load time / source when it swaps this in)
+        self.stats = {
+            "version": version,
+            "total_products": len(self.products),
+            "total_groups": len(self.group_index),
+            "total_categories": len(self.category_index),
+            "total_collections": len(self.collection_index),
+            "store_column_bytes": self.store.nbytes() if self.store else 0,
+            "load_time_ms": 0,
+            "last_loaded": None
         }
-        
-        return product
     
-    def _ensure_https(self, url: str) -> str:
-        """Ensure URL has https:// prefix."""
-        if not url:
-            return ""
-        url = str(url).strip()
-        if url and not url.startswith("http"):
-            return f"https://{url}"
-        return url
+    def _build_store(self, records: List[Dict[str, Any]]) -> List[ProductRow]:
+        """Move normalized products into the columnar store; returns one row view per product."""
+        self.store = ProductStore(records)
+        return self.store.rows()
     
     def _index_product(self, product: Dict[str, Any]):
         """Add product to all relevant indexes."""
@@ -367,35 +234,87 @@ class ProductCatalog:
             self.finish_index[finish].append(product)
     
     def _build_keyword_index(self):
-        """Build inverted index for keyword search."""
+        """Build BM25 index for keyword search."""
         logger.info("[PRODUCT_CATALOG] Building keyword index...")
         
-        for product in self.products:
-            model_no = product["model_no"]
-            
-            # Combine searchable text
-            searchable = " ".join([
-                product["model_no"],
-                product["group_number"],
-                product["title"],
-                product["keywords"],
-                product["category"],
-                product["sub_category"],
-                product["collection"],
-                product["finish_name"],
-                " ".join(product["features"]),
-            ]).lower()
-            
-            # Tokenize and index
-            tokens = re.findall(r'\b[a-z0-9]+(?:\.[a-z0-9]+)*\b', searchable)
-            for token in tokens:
-                if len(token) >= 2:  # Skip single chars
-                    if token not in self.keyword_index:
-                        self.keyword_index[token] = set()
-                    self.keyword_index[token].add(model_no)
+        documents = (
+            (model_no, {
+                "model_no": product["model_no"],
+                "group_number": product["group_number"],
+                "title": product["title"],
+                "keywords": product["keywords"],
+                "category": product["category"],
+                "sub_category": product["sub_category"],
+                "collection": product["collection"],
+                "finish_name": product["finish_name"],
+                "features": " ".join(product["features"]),
+            })
+            for model_no, product in self.model_index.items()
+        )
+        self.keyword_index = BM25Index(documents, KEYWORD_FIELD_WEIGHTS)
         
         logger.info(f"[PRODUCT_CATALOG] Keyword index built with {len(self.keyword_index)} unique tokens")
     
+    def _build_facet_index(self):
+        """Build facet bitmaps over model_index order (same ordinals as the keyword index)."""
+        self.ordinal_products = list(self.model_index.values())
+        self.facet_index = FacetIndex(self.ordinal_products, FACET_FIELDS)
+        logger.info(f"[PRODUCT_CATALOG] Facet index built ({', '.join(f'{len(self.facet_index.values(f))} {f}' for f in FACET_FIELDS)})")
+    
+    def _build_prefix_indexes(self):
+        """Build sorted-array indexes for prefix-style model and group lookups."""
+        self.model_prefix_index = PrefixIndex.from_keys(self.model_index)
+        self.group_prefix_index = PrefixIndex.from_keys(self.group_index)
+        self.group_nosep_index = PrefixIndex(
+            (group.replace(".", "").replace("-", ""), group) for group in self.group_index
+        )
+        
+        logger.info(f"[PRODUCT_CATALOG] Prefix indexes built ({len(self.model_prefix_index)} models, "
+                   f"{len(self.group_prefix_index)} groups)")
+    
+    def _build_parts_index(self):
+        """
+        Link each spare part to the product groups it belongs to.
+        
+        A part belongs to a group when its model number contains the group
+        number (100.1000-9853 -> 100.1000) or shares the group's first 7
+        characters, or when its title / keywords name the group
+        ("Hot Cartridge For 240.1000").
+        """
+        groups = set(self.group_index)
+        groups_by_head: Dict[str, List[str]] = {}  # first 7 chars -> groups of 7+ chars
+        groups_by_text: Dict[str, str] = {}        # GROUP without separators -> GROUP
+        for group in self.group_index:
+            if len(group) >= 7:
+                groups_by_head.setdefault(group[:7], []).append(group)
+            groups_by_text.setdefault(strip_separators(group), group)
+        
+        links = []
+        for part_model, part in self.model_index.items():
+            if not part["is_spare_part"]:
+                continue
+            linked = [
+                part_model[start:end]
+                for start in range(len(part_model))
+                for end in range(start + 1, len(part_model) + 1)
+                if part_model[start:end] in groups
+            ]
+            linked.extend(groups_by_head.get(part_model[:7], ()))
+            for token in tokenize(f"{part['title']} {part['keywords']}"):
+                group = groups_by_text.get(strip_separators(token.upper()))
+                if group and any(c.isdigit() for c in group):
+                    linked.append(group)
+            links.extend((group, part_model) for group in linked)
+        
+        self.parts_index = SparePartsIndex(links)
+        logger.info(f"[PRODUCT_CATALOG] Parts index built ({len(self.parts_index)} spare parts, "
+                   f"{self.parts_index.link_count} group links)")
+    
+    def _build_fuzzy_index(self):
+        """Build trigram index for typo-tolerant model number search."""
+        self.fuzzy_index = NGramIndex(self.model_index)
+        logger.info(f"[PRODUCT_CATALOG] Fuzzy index built over {len(self.fuzzy_index)} model numbers")
+    
     # =========================================================================
     # SEARCH METHODS
     # =========================================================================
@@ -493,17 +412,14 @@ class ProductCatalog:
         # Try prefix match (group might be partial)
         normalized = group_no.strip().upper()
         matches = []
-        for group_key, products in self.group_index.items():
-            if group_key.startswith(normalized):
-                matches.extend(products)
+        for group_key in self.group_prefix_index.starting_with(normalized):
+            matches.extend(self.group_index[group_key])
         
-        # Also try prefix match with no-separator variant
+        # Also try prefix match with no-separator variant (either side may be the prefix)
         if not matches:
-            no_sep = normalized.replace(".", "").replace("-", "").replace(" ", "")
-            for group_key, products in self.group_index.items():
-                group_no_sep = group_key.replace(".", "").replace("-", "")
-                if group_no_sep.startswith(no_sep) or no_sep.startswith(group_no_sep):
-                    matches.extend(products)
+            no_sep = strip_separators(normalized)
+            for group_key in self.group_nosep_index.lookup(prefixes=(no_sep,), prefix_of=no_sep):
+                matches.extend(self.group_index[group_key])
         
         return matches
     
@@ -519,21 +435,19 @@ class ProductCatalog:
             List of matching products
         """
         normalized = prefix.strip().upper()
-        matches = []
-        
-        for model_no, product in self.model_index.items():
-            if model_no.startswith(normalized):
-                matches.append(product)
-                if len(matches) >= limit:
-                    break
-        
-        return matches
+        return [
+            self.model_index[model_no]
+            for model_no in self.model_prefix_index.starting_with(normalized, limit=limit)
+        ]
     
     def search_fuzzy(self, query: str, threshold: float = FUZZY_MATCH_THRESHOLD, 
                      limit: int = MAX_RESULTS_DEFAULT) -> List[Tuple[Dict[str, Any], float]]:
         """
         Find products with similar model numbers (handles typos).
         
+        Searches every model number within the allowed edit distance
+        (separators ignored, swapped neighbours count as one typo).
+        
         Args:
             query: Model number to search for (possibly with typos)
             threshold: Minimum similarity ratio (0.0-1.0)
@@ -542,29 +456,18 @@ class ProductCatalog:
         Returns:
             List of (product, similarity_score) tuples
         """
-        normalized = query.strip().upper()
-        candidates = []
-        
-        # First try prefix candidates (faster)
-        prefix = normalized[:3] if len(normalized) >= 3 else normalized
-        relevant_models = [m for m in self.all_model_numbers if m.startswith(prefix)]
-        
-        # If not enough prefix matches, check more
-        if len(relevant_models) < MAX_FUZZY_CANDIDATES:
-            relevant_models = self.all_model_numbers[:MAX_FUZZY_CANDIDATES * 2]
-        
-        for model_no in relevant_models[:MAX_FUZZY_CANDIDATES]:
-            ratio = SequenceMatcher(None, normalized, model_no).ratio()
-            if ratio >= threshold:
-                candidates.append((self.model_index[model_no], ratio))
-        
-        # Sort by similarity (highest first)
-        candidates.sort(key=lambda x: x[1], reverse=True)
-        return candidates[:limit]
+        # Sorted by similarity (highest first)
+        return [
+            (self.model_index[model_no], score)
+            for model_no, score in self.fuzzy_index.search(query, threshold, limit)
+        ]
     
     def search_keywords(self, query: str, category: Optional[str] = None,
                        collection: Optional[str] = None,
-                       limit: int = MAX_RESULTS_DEFAULT) -> List[Dict[str, Any]]:
+                       limit: int = MAX_RESULTS_DEFAULT,
+                       sub_category: Optional[str] = None,
+                       finish: Optional[str] = None,
+                       is_spare_part: Optional[bool] = None) -> List[Dict[str, Any]]:
         """
         Search products by keywords in title, description, features.
         
@@ -573,47 +476,70 @@ class ProductCatalog:
             category: Optional category filter
             collection: Optional collection filter
             limit: Maximum results to return
+            sub_category: Optional sub-category filter
+            finish: Optional finish filter (code like "MB" or name like "Matte Black")
+            is_spare_part: Optional spare part filter
             
         Returns:
-            List of matching products (ranked by relevance)
+            List of matching products (ranked by BM25 relevance)
         """
         # Tokenize query
-        query_tokens = set(re.findall(r'\b[a-z0-9]+(?:\.[a-z0-9]+)*\b', query.lower()))
+        query_tokens = tokenize(query)
         
         if not query_tokens:
             return []
         
-        # Find matching model numbers
-        matching_models: Dict[str, int] = {}  # model_no -> match count
-        
-        for token in query_tokens:
-            if token in self.keyword_index:
-                for model_no in self.keyword_index[token]:
-                    matching_models[model_no] = matching_models.get(model_no, 0) + 1
-        
-        if not matching_models:
-            return []
+        mask = self._facet_mask(category, sub_category, collection, finish, is_spare_part)
+        return [
+            self.model_index[model_no]
+            for model_no, _ in self.keyword_index.search(query_tokens, limit, mask=mask)
+        ]
+    
+    def _resolve_finish(self, finish: str) -> List[str]:
+        """Finish codes for a finish code or (partial) finish name, e.g. "Brushed Nickel" -> ["BN"]."""
+        normalized = finish.strip().upper()
+        if normalized in FINISH_CODE_MAP or normalized in self.facet_index.values("finish_code"):
+            return [normalized]
+        if normalized in FINISH_NAME_TO_CODE:
+            return [FINISH_NAME_TO_CODE[normalized]]
+        return [code for name, code in FINISH_NAME_TO_CODE.items() if name.startswith(normalized)]
+    
+    def _facet_mask(self, category: Optional[str] = None, sub_category: Optional[str] = None,
+                    collection: Optional[str] = None, finish: Optional[str] = None,
+                    is_spare_part: Optional[bool] = None):
+        """Bitmap of products matching every given filter (None when no filter is set)."""
+        return self.facet_index.mask({
+            "category": category or None,
+            "sub_category": sub_category or None,
+            "collection": collection or None,
+            "finish_code": self._resolve_finish(finish) if finish else None,
+            "is_spare_part": is_spare_part,
+        })
+    
+    def search_by_facets(self, category: Optional[str] = None, sub_category: Optional[str] = None,
+                         collection: Optional[str] = None, finish: Optional[str] = None,
+                         is_spare_part: Optional[bool] = None,
+                         limit: int = MAX_RESULTS_DEFAULT) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get products matching several filters at once (e.g. Kitchen + Matte Black + Serie 100).
         
-        # Get products and apply filters
-        results = []
-        for model_no, score in sorted(matching_models.items(), key=lambda x: -x[1]):
-            product = self.model_index.get(model_no)
-            if not product:
-                continue
-            
-            # Apply category filter
-            if category and product["category"].upper() != category.upper():
-                continue
-            
-            # Apply collection filter
-            if collection and product["collection"].upper() != collection.upper():
-                continue
+        Args:
+            category: Optional category filter
+            sub_category: Optional sub-category filter
+            collection: Optional collection filter
+            finish: Optional finish filter (code like "MB" or name like "Matte Black")
+            is_spare_part: Optional spare part filter
+            limit: Maximum results to return
             
-            results.append(product)
-            if len(results) >= limit:
-                break
+        Returns:
+            (first `limit` matching products in catalog order, total number of matches)
+        """
+        mask = self._facet_mask(category, sub_category, collection, finish, is_spare_part)
+        if mask is None:
+            return [], 0
         
-        return results
+        ordinals = np.flatnonzero(mask)
+        return [self.ordinal_products[i] for i in ordinals[:limit]], len(ordinals)
     
     def search_by_category(self, category: str, limit: int = MAX_RESULTS_DEFAULT) -> List[Dict[str, Any]]:
         """Get products by category."""
@@ -665,18 +591,30 @@ class ProductCatalog:
         if not product:
             return []
         
-        group = product["group_number"]
-        related = []
+        part_models = self.parts_index.parts_for(product["group_number"])[:limit]
+        return [self.model_index[part_model] for part_model in part_models]
+    
+    def get_products_using_part(self, part_model_no: str, limit: int = MAX_RESULTS_DEFAULT) -> List[Dict[str, Any]]:
+        """
+        Find the products a spare part is used in (reverse of get_related_parts).
         
-        # Search for parts with similar group number
-        for part_model, part_product in self.model_index.items():
-            if part_product["is_spare_part"]:
-                if group in part_model or part_model.startswith(group[:7]):
-                    related.append(part_product)
-                    if len(related) >= limit:
-                        break
+        Args:
+            part_model_no: Spare part model number
+            limit: Maximum products to return
+            
+        Returns:
+            Non-spare-part products of every group the part belongs to
+        """
+        part = self.search_exact_model(part_model_no)
+        if not part or not part["is_spare_part"]:
+            return []
         
-        return related
+        products = []
+        for group in self.parts_index.groups_for(part["model_no"]):
+            products.extend(p for p in self.group_index[group] if not p["is_spare_part"])
+            if len(products) >= limit:
+                break
+        return products[:limit]
     
     def get_categories(self) -> List[str]:
         """Get all available categories."""
@@ -685,10 +623,337 @@ class ProductCatalog:
     def get_collections(self) -> List[str]:
         """Get all available collections."""
         return sorted(self.collection_index.keys())
+
+
+class ProductCatalog:
+    """
+    In-memory product catalog with multiple search indexes.
+    
+    Data and indexes live in a CatalogIndexes generation; searches and index
+    attributes (catalog.search_keywords, catalog.model_index, ...) resolve to
+    the current one. reload() builds the next generation off to the side and
+    swaps it in with a single reference assignment, so readers never wait.
+    """
+    
+    _instance = None
+    _lock = threading.Lock()
+    
+    def __new__(cls):
+        """Singleton pattern to ensure single catalog instance."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+    
+    def __init__(self):
+        if self._initialized:
+            return
+            
+        self._initialized = True
+        self._indexes = CatalogIndexes()  # Current generation (replaced, never mutated)
+        self._reload_lock = threading.Lock()  # One build at a time; readers never take it
+        
+        logger.info("[PRODUCT_CATALOG] ProductCatalog instance created")
+    
+    def __getattr__(self, name: str):
+        # Only called for names not on ProductCatalog: searches and index
+        # attributes come from the current generation
+        indexes = self.__dict__.get("_indexes")
+        if indexes is None:
+            raise AttributeError(name)
+        return getattr(indexes, name)
+    
+    @property
+    def indexes(self) -> CatalogIndexes:
+        """Current generation; hold on to it to read several indexes consistently across a reload."""
+        return self._indexes
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get catalog statistics."""
-        return self.stats.copy()
+        """Get catalog statistics (including the catalog version)."""
+        return self._indexes.stats.copy()
+    
+    def _swap(self, indexes: CatalogIndexes, source: str, start_time: float) -> None:
+        """Publish a fully built generation (single reference assignment)."""
+        indexes.stats.update(
+            load_time_ms=round((time.time() - start_time) * 1000, 2),
+            source=source,
+            last_loaded=time.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        previous = self._indexes.version
+        self._indexes = indexes
+        if previous and previous != indexes.version:
+            logger.info(f"[PRODUCT_CATALOG] Catalog version {previous} -> {indexes.version}")
+    
+    def load_from_json(self, json_path: Optional[str] = None) -> bool:
+        """
+        Load product data from JSON manifest file.
+        
+        Args:
+            json_path: Path to JSON file (a CSV sheet export also works). If None, uses default path.
+            
+        Returns:
+            True if loaded successfully, False otherwise.
+        """
+        json_path = _project_path(json_path, JSON_MANIFEST_PATH)
+        
+        if not json_path.exists():
+            logger.error(f"[PRODUCT_CATALOG] JSON file not found: {json_path}")
+            return False
+        
+        return self.reload(str(json_path))
+    
+    def reload(self, source: Optional[str] = None) -> bool:
+        """
+        Rebuild the catalog from a manifest or sheet export and swap it in.
+        
+        The new generation is built while searches keep using the current
+        one; on any failure the current generation stays in service.
+        
+        Args:
+            source: JSON manifest or CSV sheet export, as a path or http(s) URL.
+                    If None, uses the default manifest path.
+            
+        Returns:
+            True if the new catalog was swapped in, False otherwise.
+        """
+        source = source or str(_project_path(None, JSON_MANIFEST_PATH))
+        
+        with self._reload_lock:
+            start_time = time.time()
+            try:
+                logger.info(f"[PRODUCT_CATALOG] Loading products from: {source}")
+                raw_data, digest, source_format = _read_source(source)
+                logger.info(f"[PRODUCT_CATALOG] Loaded {len(raw_data)} raw records")
+                
+                records = []
+                for item in raw_data:
+                    metadata = item.get("metadata", {})
+                    if not metadata:
+                        continue
+                    
+                    # Normalize product
+                    product = self._normalize_product(metadata, item)
+                    if product and product.get("model_no"):
+                        records.append(product)
+                
+                indexes = self._build_indexes(records, digest[:CATALOG_VERSION_LENGTH])
+            except Exception as e:
+                logger.error(f"[PRODUCT_CATALOG] Failed to load {source}: {e}", exc_info=True)
+                return False
+            
+            self._swap(indexes, source_format, start_time)
+        
+        stats = indexes.stats
+        logger.info(f"[PRODUCT_CATALOG] ✅ Loaded {stats['total_products']} products "
+                   f"in {stats['load_time_ms']:.0f}ms ({stats['total_groups']} groups, version {indexes.version})")
+        return True
+    
+    def start_background_reload(self, source: Optional[str] = None) -> threading.Thread:
+        """Run reload(source) on a daemon thread; searches are served throughout."""
+        thread = threading.Thread(target=self.reload, args=(source,), name="catalog-reload", daemon=True)
+        thread.start()
+        return thread
+    
+    def _build_indexes(self, records: List[Dict[str, Any]], version: str) -> CatalogIndexes:
+        return CatalogIndexes(records, version)
+    
+    def _snapshot_metadata(self, json_path: Path) -> Dict[str, Any]:
+        """Header fields a snapshot must match to be used with this manifest and runtime."""
+        return {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "python": "%d.%d" % sys.version_info[:2],
+            "numpy": np.__version__,
+            "source_sha256": fingerprint(str(json_path)) if json_path.exists() else None,
+        }
+    
+    def save_snapshot(self, snapshot_path: Optional[str] = None, json_path: Optional[str] = None) -> int:
+        """
+        Write the loaded catalog to a snapshot file for load_from_snapshot.
+        
+        Args:
+            snapshot_path: Output path. If None, uses the default path.
+            json_path: Manifest the catalog was loaded from (its hash goes in the header)
+            
+        Returns:
+            Snapshot size in bytes
+        """
+        indexes = self._indexes
+        if not indexes.products:
+            raise RuntimeError("Catalog is not loaded")
+        snapshot_path = _project_path(snapshot_path, CATALOG_SNAPSHOT_PATH)
+        metadata = self._snapshot_metadata(_project_path(json_path, JSON_MANIFEST_PATH))
+        metadata.update(products=len(indexes.products), version=indexes.version,
+                        created=time.strftime("%Y-%m-%d %H:%M:%S"))
+        
+        size = write_snapshot(str(snapshot_path), indexes, metadata)
+        logger.info(f"[PRODUCT_CATALOG] Wrote snapshot {snapshot_path} "
+                   f"({len(indexes.products)} products, {size / 1024 / 1024:.1f} MB)")
+        return size
+    
+    def load_from_snapshot(self, snapshot_path: Optional[str] = None, json_path: Optional[str] = None) -> bool:
+        """
+        Load the catalog from a prebuilt snapshot (see save_snapshot).
+        
+        Args:
+            snapshot_path: Snapshot file. If None, uses the default path.
+            json_path: Manifest the snapshot must match. If None, uses the default path.
+            
+        Returns:
+            True if loaded; False (catalog untouched) when the snapshot is missing,
+            unreadable, or stale, so the caller can fall back to load_from_json.
+        """
+        start_time = time.time()
+        snapshot_path = _project_path(snapshot_path, CATALOG_SNAPSHOT_PATH)
+        json_path = _project_path(json_path, JSON_MANIFEST_PATH)
+        
+        if not snapshot_path.exists():
+            logger.info(f"[PRODUCT_CATALOG] No snapshot at {snapshot_path}, using JSON manifest")
+            return False
+        
+        try:
+            header = read_header(str(snapshot_path))
+            expected = self._snapshot_metadata(json_path)
+            if expected["source_sha256"] is None:
+                expected.pop("source_sha256")  # No manifest to compare against
+            stale = [key for key, value in expected.items() if header.get(key) != value]
+            if stale:
+                logger.warning(f"[PRODUCT_CATALOG] Snapshot {snapshot_path} is stale "
+                              f"({', '.join(stale)} changed), using JSON manifest")
+                return False
+            
+            _, indexes = read_snapshot(str(snapshot_path))
+            if not isinstance(indexes, CatalogIndexes):
+                raise ValueError(f"unexpected snapshot content {type(indexes).__name__}")
+        except Exception as e:
+            logger.warning(f"[PRODUCT_CATALOG] Failed to read snapshot {snapshot_path}: {e}")
+            return False
+        
+        with self._reload_lock:
+            self._swap(indexes, "snapshot", start_time)
+        
+        stats = indexes.stats
+        logger.info(f"[PRODUCT_CATALOG] ✅ Mapped snapshot with {stats['total_products']} products "
+                   f"in {stats['load_time_ms']:.0f}ms ({stats['total_groups']} groups, version {indexes.version})")
+        return True
+    
+    def _normalize_product(self, metadata: Dict[str, Any], raw_item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Normalize product data into a clean, consistent structure.
+        
+        Extracts and normalizes all 70 fields into a usable format.
+        """
+        model_no = str(metadata.get("Model_NO", "")).strip().upper()
+        if not model_no:
+            return None
+        
+        group_no = str(metadata.get("Common_Group_Number", "")).strip().upper()
+        
+        # Extract finish code from model number
+        finish_code = ""
+        finish_name = metadata.get("Finish", "")
+        if group_no and model_no.startswith(group_no):
+            finish_code = model_no[len(group_no):].strip()
+        
+        # Build feature bullets list
+        features = []
+        for i in range(1, 7):
+            bullet = metadata.get(f"Description Bullet {i}", "")
+            if bullet and str(bullet).strip():
+                features.append(str(bullet).strip())
+        
+        # Parse dimensions
+        def safe_float(val, default=0.0):
+            try:
+                return float(val) if val else default
+            except (ValueError, TypeError):
+                return default
+        
+        # Build normalized product
+        product = {
+            # Core identification
+            "model_no": model_no,
+            "group_number": group_no or model_no,
+            "main_model_number": str(metadata.get("Main_Model_Number", "")).strip(),
+            "upc": str(metadata.get("Item_UPC_Number", "")).strip(),
+            
+            # Product info
+            "title": str(metadata.get("Product_Title", "")).strip(),
+            "description": str(metadata.get("Description", "")).strip(),
+            "keywords": str(metadata.get("Keywords", "")).strip(),
+            "features": features,
+            
+            # Classification
+            "category": str(metadata.get("Product_Category", "")).strip(),
+            "sub_category": str(metadata.get("Sub_Product_Category", "")).strip(),
+            "sub_sub_category": str(metadata.get("Sub_Sub_Product_Category", "")).strip(),
+            "collection": str(metadata.get("Collection", "")).strip(),
+            "style": str(metadata.get("Style", "")).strip(),
+            
+            # Finish
+            "finish_code": finish_code,
+            "finish_name": finish_name,
+            
+            # Pricing
+            "list_price": safe_float(metadata.get("List_Price")),
+            "map_price": safe_float(metadata.get("MAP_Price")),
+            "cad_price": safe_float(metadata.get("CAD_List_Price")),
+            
+            # Specifications
+            "flow_rate_gpm": safe_float(metadata.get("Flow_Rate_GPM")),
+            "holes_needed": int(safe_float(metadata.get("Holes_Needed_For_Installation"))),
+            "height_inches": safe_float(metadata.get("Product_Height_Inches")),
+            "length_inches": safe_float(metadata.get("Product_Length_Inches")),
+            "width_inches": safe_float(metadata.get("Product_Width_Inches")),
+            "weight_lbs": safe_float(metadata.get("Package_Weight_lbs")),
+            "is_touch_capable": str(metadata.get("IS_Touch_Capable", "")).upper() == "TRUE",
+            
+            # Status flags
+            "status": str(metadata.get("Product_Status", "")).strip(),
+            "is_active": str(metadata.get("Product_Status", "")).upper() in ["ACTIVE", ""],
+            "is_spare_part": str(metadata.get("Is_Spare_Part", "")).upper() == "TRUE",
+            "is_special_finish": str(metadata.get("Is_Special_Finish", "")).upper() == "TRUE",
+            "display_on_website": str(metadata.get("Display_On_Website", "")).upper() == "YES",
+            "can_sell_online": str(metadata.get("Can_Sell_Online", "")).upper() == "YES",
+            
+            # URLs
+            "product_url": self._ensure_https(metadata.get("product_url", "")),
+            "image_url": self._ensure_https(metadata.get("Image_URL", "")),
+            "collection_url": str(metadata.get("Collection_URL", "")).strip(),
+            
+            # Document URLs
+            "spec_sheet_url": self._ensure_https(metadata.get("Spec_Sheet_Full_URL", "")),
+            "install_manual_url": self._ensure_https(metadata.get("Installation_manual_Full_URL", "")),
+            "parts_diagram_url": self._ensure_https(metadata.get("Part_Diagram_Full_URL", "")),
+            
+            # Document filenames
+            "spec_sheet_file": str(metadata.get("Spec_Sheet_File_Name", "")).strip(),
+            "install_manual_file": str(metadata.get("Installation_Manual_File_Name", "")).strip(),
+            "parts_diagram_file": str(metadata.get("Parts_Diagram_File_Name", "")).strip(),
+            
+            # Video URLs
+            "install_video_url": str(metadata.get("Installation_video_Link", "")).strip(),
+            "operational_video_url": str(metadata.get("Operational_Video_Link", "")).strip(),
+            "lifestyle_video_url": str(metadata.get("Lifestyle_Video_Link", "")).strip(),
+            
+            # Warranty
+            "warranty": str(metadata.get("Warranty", "")).strip(),
+            
+            # Popularity (for ranking)
+            "popularity": int(safe_float(metadata.get("Popularity", 0))),
+        }
+        
+        return product
+    
+    def _ensure_https(self, url: str) -> str:
+        """Ensure URL has https:// prefix."""
+        if not url:
+            return ""
+        url = str(url).strip()
+        if url and not url.startswith("http"):
+            return f"https://{url}"
+        return url
 
 
 # =============================================================================
@@ -706,20 +971,22 @@ def get_product_catalog() -> ProductCatalog:
     return _catalog
 
 
-def init_product_catalog(json_path: Optional[str] = None) -> bool:
+def init_product_catalog(json_path: Optional[str] = None, snapshot_path: Optional[str] = None) -> bool:
     """
     Initialize the product catalog.
     
-    Should be called at application startup.
+    Should be called at application startup. Maps the prebuilt snapshot when
+    it matches the manifest, otherwise parses and indexes the JSON manifest.
     
     Args:
         json_path: Optional path to JSON file
+        snapshot_path: Optional path to the snapshot file
         
     Returns:
         True if successful
     """
     catalog = get_product_catalog()
-    return catalog.load_from_json(json_path)
+    return catalog.load_from_snapshot(snapshot_path, json_path) or catalog.load_from_json(json_path)
 
 
 def ensure_catalog_loaded() -> ProductCatalog:
@@ -731,14 +998,51 @@ def ensure_catalog_loaded() -> ProductCatalog:
     """
     catalog = get_product_catalog()
     if not catalog.products:
-        catalog.load_from_json()
+        init_product_catalog()
     return catalog
 
 
+def get_catalog_version() -> Optional[str]:
+    """Version of the catalog currently served, or None if it is not loaded (never loads it)."""
+    if _catalog is None:
+        return None
+    return _catalog.version
+
+
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
 
+def _project_path(path: Optional[str], default: str) -> Path:
+    """Explicit path, or `default` relative to the project root."""
+    if path is None:
+        return Path(__file__).parent.parent.parent / default
+    return Path(path)
+
+
+def _read_source(source: str) -> Tuple[List[Dict[str, Any]], str, str]:
+    """
+    Read a JSON manifest or CSV sheet export from a path or http(s) URL.
+    
+    Returns:
+        (raw items shaped like the manifest's {"metadata": {...}},
+         SHA-256 of the raw bytes, "json" or "csv")
+    """
+    if source.startswith(("http://", "https://")):
+        response = requests.get(source, timeout=SOURCE_DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+        data = response.content
+    else:
+        data = Path(source).read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    
+    if data.lstrip()[:1] in (b"[", b"{"):
+        return json.loads(data), digest, "json"
+    # Sheet exports use the manifest's metadata column names (Model_NO, Product_Title, ...)
+    rows = csv.DictReader(io.StringIO(data.decode("utf-8-sig")))
+    return [{"metadata": row} for row in rows], digest, "csv"
+
+
 def looks_like_model_number(text: str) -> bool:
     """
     Heuristic to detect if a string looks like a model/part number.
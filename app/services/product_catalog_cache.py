@@ -1,8 +1,13 @@
+import hashlib
+import io
 import pandas as pd
+import requests
 import time
 import threading
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.services.prefix_index import PrefixIndex
 
 logger = logging.getLogger(__name__)
 
@@ -14,12 +19,21 @@ GOOGLE_SHEET_CSV_URL = "https://docs.google.com/spreadsheets/d/1e9ppexIafl8B3qd-
 
 
 REFRESH_INTERVAL_SECONDS = 43200  # 12 Hours
+DOWNLOAD_TIMEOUT_SECONDS = 60
 
 # ===============================
 # GLOBAL STATE
 # ===============================
 # Cache stores exact uppercase model numbers as keys
 PRODUCTS_CACHE: Dict[str, Dict[str, Any]] = {}
+# Sorted index over PRODUCTS_CACHE keys for prefix lookups
+PREFIX_INDEX = PrefixIndex()
+# Row hash per model and the sheet columns they were computed over (for diffing refreshes)
+ROW_HASHES: Dict[str, int] = {}
+SHEET_COLUMNS: List[str] = []
+# HTTP validators + body digest of the last applied download (conditional requests)
+SHEET_VALIDATORS: Dict[str, Optional[str]] = {"etag": None, "last_modified": None, "sha256": None}
+REFRESH_METRICS: Dict[str, Any] = {"refreshes": 0, "not_modified": 0, "last": None}
 LAST_REFRESH = 0
 IS_REFRESHING = False
 LOCK = threading.Lock()
@@ -27,12 +41,40 @@ LOCK = threading.Lock()
 # ===============================
 # HELPERS
 # ===============================
-def _download_sheet() -> pd.DataFrame:
-    """Download CSV from Google Sheets and return DataFrame."""
+def _download_sheet() -> Tuple[Optional[pd.DataFrame], Dict[str, Optional[str]]]:
+    """
+    Download CSV from Google Sheets and return (DataFrame, validators).
+
+    Sends If-None-Match / If-Modified-Since from the last applied download;
+    returns (None, validators) when the sheet is unchanged (HTTP 304 or an
+    identical body).
+    """
     logger.info("[PRODUCT_CACHE] Downloading product sheet...")
     try:
-        # Use simple error handling for valid CSV download
-        df = pd.read_csv(GOOGLE_SHEET_CSV_URL)
+        headers = {}
+        if PRODUCTS_CACHE:
+            if SHEET_VALIDATORS["etag"]:
+                headers["If-None-Match"] = SHEET_VALIDATORS["etag"]
+            if SHEET_VALIDATORS["last_modified"]:
+                headers["If-Modified-Since"] = SHEET_VALIDATORS["last_modified"]
+
+        response = requests.get(GOOGLE_SHEET_CSV_URL, headers=headers, timeout=DOWNLOAD_TIMEOUT_SECONDS)
+        if response.status_code == 304:
+            logger.info("[PRODUCT_CACHE] Sheet not modified (304).")
+            return None, SHEET_VALIDATORS
+        response.raise_for_status()
+
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": hashlib.sha256(response.content).hexdigest(),
+        }
+        # Sheet exports don't always send validators; an identical body is unchanged too
+        if PRODUCTS_CACHE and validators["sha256"] == SHEET_VALIDATORS["sha256"]:
+            logger.info("[PRODUCT_CACHE] Sheet content unchanged.")
+            return None, validators
+
+        df = pd.read_csv(io.BytesIO(response.content))
         
         # Clean column names
         df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
@@ -50,42 +92,92 @@ def _download_sheet() -> pd.DataFrame:
                 raise ValueError("CSV missing required column 'model_no'")
 
         logger.info(f"[PRODUCT_CACHE] Loaded CSV with {len(df)} rows.")
-        return df.fillna("")  # Replace NaNs with empty strings for safety
+        return df.fillna(""), validators  # Replace NaNs with empty strings for safety
 
     except Exception as e:
         logger.error(f"[PRODUCT_CACHE] ERROR downloading Google Sheet: {e}", exc_info=True)
         raise
 
-def _build_cache(df: pd.DataFrame):
-    """Convert a DataFrame to an optimized lookup dictionary."""
-    global PRODUCTS_CACHE
-    logger.info("[PRODUCT_CACHE] Building in-memory dictionary...")
-    
-    new_cache = {}
-    for _, row in df.iterrows():
-        # Clean the model number key for reliable lookup
-        raw_model = str(row.get("model_no", ""))
-        model_key = raw_model.strip().upper()
-        
-        if model_key:
-            # Store the full row data
-            new_cache[model_key] = row.to_dict()
-            
+def _build_cache(df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Apply a downloaded sheet to the lookup dictionary.
+
+    Rows are hashed (vectorized) and compared with the previous refresh;
+    only new or changed rows are converted to dicts. Returns row counts.
+    """
+    global PRODUCTS_CACHE, PREFIX_INDEX, ROW_HASHES, SHEET_COLUMNS
+    logger.info("[PRODUCT_CACHE] Diffing sheet against in-memory dictionary...")
+
+    # Clean the model number key for reliable lookup; later rows win on duplicates
+    keys = df["model_no"].astype(str).str.strip().str.upper()
+    keep = ((keys != "") & ~keys.duplicated(keep="last")).to_numpy()
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    columns = list(df.columns)
+    old_hashes = ROW_HASHES if columns == SHEET_COLUMNS else {}  # New layout: every row changed
+    new_hashes: Dict[str, int] = {}
+    changed: List[Tuple[int, str]] = []  # (row position, model key)
+    for position, (key, row_hash) in enumerate(zip(keys.tolist(), row_hashes.tolist())):
+        if not keep[position]:
+            continue
+        new_hashes[key] = row_hash
+        if old_hashes.get(key) != row_hash:
+            changed.append((position, key))
+    removed = [key for key in PRODUCTS_CACHE if key not in new_hashes]
+    added = sum(1 for _, key in changed if key not in PRODUCTS_CACHE)
+
+    new_cache = dict(PRODUCTS_CACHE)
+    for key in removed:
+        del new_cache[key]
+    records = df.iloc[[position for position, _ in changed]].to_dict("records")
+    for (_, key), record in zip(changed, records):
+        # Store the full row data
+        new_cache[key] = record
+
+    if added or removed:
+        PREFIX_INDEX = PrefixIndex.from_keys(new_cache)
     PRODUCTS_CACHE = new_cache
+    ROW_HASHES = new_hashes
+    SHEET_COLUMNS = columns
     logger.info(f"[PRODUCT_CACHE] Cache ready with {len(PRODUCTS_CACHE)} products.")
+    return {
+        "rows": len(new_hashes),
+        "added": added,
+        "changed": len(changed) - added,
+        "removed": len(removed),
+    }
 
 def _refresh_cache():
-    """Download and rebuild cache safely."""
-    global LAST_REFRESH, IS_REFRESHING
+    """Download and apply sheet changes safely."""
+    global LAST_REFRESH, IS_REFRESHING, SHEET_VALIDATORS
     if IS_REFRESHING: return
 
     with LOCK:
         try:
             IS_REFRESHING = True
-            df = _download_sheet()
-            _build_cache(df)
+            start = time.time()
+            df, validators = _download_sheet()
+            if df is None:
+                counts = {"rows": len(PRODUCTS_CACHE), "added": 0, "changed": 0, "removed": 0}
+                REFRESH_METRICS["not_modified"] += 1
+            else:
+                counts = _build_cache(df)
+            # Only remember validators once their content is applied
+            SHEET_VALIDATORS = validators
             LAST_REFRESH = time.time()
-            logger.info("[PRODUCT_CACHE] Refresh complete.")
+
+            REFRESH_METRICS["refreshes"] += 1
+            REFRESH_METRICS["last"] = dict(
+                counts,
+                refresh_ms=round((LAST_REFRESH - start) * 1000, 1),
+                modified=df is not None,
+                finished_at=LAST_REFRESH,
+            )
+            logger.info(
+                f"[PRODUCT_CACHE] Refresh complete in {REFRESH_METRICS['last']['refresh_ms']:.0f}ms: "
+                f"{counts['rows']} rows, {counts['added']} added, {counts['changed']} changed, "
+                f"{counts['removed']} removed{'' if df is not None else ' (sheet unchanged)'}"
+            )
         except Exception as e:
             logger.error(f"[PRODUCT_CACHE] Refresh failed: {e}")
         finally:
@@ -134,13 +226,19 @@ def find_products_by_model(model_query: str, limit: int = 10) -> List[Dict[str,
 
     # 2. Prefix Match (Variations)
     # If the user searched '100.1170', we want '100.1170-PC', '100.1170-BN'
-    # Iterate through keys (fast enough for <100k items in memory)
-    for key, data in PRODUCTS_CACHE.items():
+    # Sorted-index lookup, O(log n + k)
+    for key in PREFIX_INDEX.starting_with(target, limit=limit + 1):
         if len(matches) >= limit:
             break
         
-        # Check if key starts with target (and isn't the exact match we already added)
-        if key.startswith(target) and key != target:
+        # Skip the exact match we already added (and keys from a mid-refresh index)
+        data = PRODUCTS_CACHE.get(key)
+        if key != target and data is not None:
             matches.append(data)
             
-    return matches
\ No newline at end of file
+    return matches
+
+
+def get_cache_metrics() -> Dict[str, Any]:
+    """Refresh counters and the last refresh's time / row-change counts."""
+    return {"products": len(PRODUCTS_CACHE), "last_refresh": LAST_REFRESH, **REFRESH_METRICS}
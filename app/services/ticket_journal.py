@@ -0,0 +1,382 @@
+"""
+Ticket Job Journal
+Durable SQLite (WAL) record of accepted webhook tickets so queued and
+in-flight work survives process restarts.
+
+Job states: queued -> running -> done | failed
+
+Writes are batched: the webhook path only appends to an in-memory buffer and
+a background writer commits the buffer in one transaction every
+flush interval. The webhook awaits wait_accepted() before answering, so a
+ticket is on disk when Freshdesk gets its 200. A failed batch is retried
+write by write; writes that keep failing are dropped and logged.
+
+Startup replay re-queues every job left in 'queued' or 'running'; jobs that
+keep crashing the worker are marked failed after max_attempts.
+
+The database must live on persistent storage (k8s: the StatefulSet volume
+claim) for replay to survive a pod being rescheduled.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ===============================
+# CONFIG
+# ===============================
+DEFAULT_JOURNAL_PATH = ".cache/ticket_journal.db"
+DEFAULT_FLUSH_INTERVAL_SECONDS = 0.05
+DEFAULT_MAX_ATTEMPTS = 3
+DONE_RETENTION_SECONDS = 7 * 24 * 3600  # Prune finished jobs after 7 days
+MAX_WRITE_ATTEMPTS = 5  # Flushes a failing write is retried in before it is dropped
+
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      TEXT PRIMARY KEY,
+    ticket_id   TEXT NOT NULL,
+    priority    INTEGER NOT NULL DEFAULT 0,
+    state       TEXT NOT NULL,
+    payload     TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state);
+"""
+
+
+class _Write(NamedTuple):
+    sql: str
+    params: Tuple[Any, ...]
+    job_id: str
+    label: str  # For logs: "ticket #123" or "job <job_id>"
+    attempts: int = 0
+
+
+class TicketJournal:
+    """
+    Write-behind SQLite journal of ticket jobs.
+
+    All SQL runs on one connection guarded by a lock; the webhook path never
+    touches it directly.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_JOURNAL_PATH,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_attempts = max(1, max_attempts)
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._buffer: List[_Write] = []
+        self._buffer_lock = threading.Lock()
+        self._accepted: Dict[str, Future] = {}  # job_id -> resolved when its queued row commits
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+        self.stats = {
+            "flushes": 0,
+            "writes": 0,
+            "last_flush_ms": 0.0,
+            "write_errors": 0,
+            "dropped_writes": 0,
+        }
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    def open(self) -> None:
+        """Open the database, apply schema, prune old jobs, start the writer."""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conn.execute(
+            "DELETE FROM jobs WHERE state IN (?, ?) AND updated_at < ?",
+            (STATE_DONE, STATE_FAILED, time.time() - DONE_RETENTION_SECONDS),
+        )
+        self._conn = conn
+
+        self._stopped.clear()
+        self._writer = threading.Thread(target=self._writer_loop, name="ticket-journal-writer", daemon=True)
+        self._writer.start()
+
+        logger.info(f"[TICKET_JOURNAL] Opened {self.db_path} (flush every {self.flush_interval * 1000:.0f}ms)")
+
+    def close(self) -> None:
+        """Flush pending writes and close the database."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._writer:
+            self._writer.join(timeout=5.0)
+            self._writer = None
+        self.flush()
+        with self._db_lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+        logger.info("[TICKET_JOURNAL] Closed")
+
+    # =========================================================================
+    # HOT-PATH API (buffered)
+    # =========================================================================
+
+    def _enqueue(self, sql: str, params: Tuple[Any, ...], job_id: str, label: Optional[str] = None) -> None:
+        with self._buffer_lock:
+            self._buffer.append(_Write(sql, params, job_id, label or f"job {job_id}"))
+
+    def record_queued(self, job_id: str, ticket_id: str, priority: int, initial_state: Dict[str, Any]) -> None:
+        """Record an accepted ticket (replaces any earlier row for the same job)."""
+        now = time.time()
+        with self._buffer_lock:
+            self._accepted.setdefault(job_id, Future())
+        self._enqueue(
+            "INSERT OR REPLACE INTO jobs "
+            "(job_id, ticket_id, priority, state, payload, attempts, error, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, 0, NULL, ?, ?)",
+            (job_id, ticket_id, priority, STATE_QUEUED, json.dumps(initial_state, default=str), now, now),
+            job_id,
+            f"ticket #{ticket_id}",
+        )
+        self._wakeup.set()  # Don't make the waiting webhook sit out a full flush interval
+
+    async def wait_accepted(self, job_id: str, timeout: float = 5.0) -> bool:
+        """
+        Wait until a record_queued() row is committed. Returns False if the
+        write was dropped or did not commit within timeout.
+        """
+        with self._buffer_lock:
+            pending = self._accepted.get(job_id)
+        if pending is None:
+            return True  # Already committed
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(pending)), timeout)
+            return True
+        except Exception:
+            return False
+
+    def mark_running(self, job_id: str) -> None:
+        self._enqueue(
+            "UPDATE jobs SET state = ?, attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+            (STATE_RUNNING, time.time(), job_id),
+            job_id,
+        )
+
+    def mark_done(self, job_id: str) -> None:
+        self._enqueue(
+            "UPDATE jobs SET state = ?, error = NULL, updated_at = ? WHERE job_id = ?",
+            (STATE_DONE, time.time(), job_id),
+            job_id,
+        )
+
+    def mark_failed(self, job_id: str, error: str = "") -> None:
+        self._enqueue(
+            "UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE job_id = ?",
+            (STATE_FAILED, (error or "")[:1000], time.time(), job_id),
+            job_id,
+        )
+
+    # =========================================================================
+    # WRITER
+    # =========================================================================
+
+    def _writer_loop(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Commit all buffered writes in a single transaction.
+
+        If the batch fails it is rolled back and retried write by write;
+        writes that still fail go back to the buffer for the next flush, and
+        are dropped (and logged) after MAX_WRITE_ATTEMPTS.
+        """
+        with self._buffer_lock:
+            if not self._buffer:
+                return 0
+            batch, self._buffer = self._buffer, []
+
+        start = time.time()
+        failed: List[Tuple[_Write, Exception]] = []
+        with self._db_lock:
+            if self._conn is None:
+                with self._buffer_lock:
+                    self._buffer[:0] = batch
+                return 0
+            try:
+                self._conn.execute("BEGIN")
+                for write in batch:
+                    self._conn.execute(write.sql, write.params)
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                try:
+                    self._conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+                self.stats["write_errors"] += 1
+                logger.warning(f"[TICKET_JOURNAL] Batch write failed ({len(batch)} ops), retrying one by one: {e}")
+                failed = self._apply_each_locked(batch)
+
+        if failed:
+            self._requeue_or_drop(failed)
+        failed_writes = {id(write) for write, _ in failed}
+        committed = [write for write in batch if id(write) not in failed_writes]
+        self._resolve_accepted(committed)
+
+        self.stats["flushes"] += 1
+        self.stats["writes"] += len(committed)
+        self.stats["last_flush_ms"] = round((time.time() - start) * 1000, 3)
+        return len(committed)
+
+    def _apply_each_locked(self, batch: List[_Write]) -> List[Tuple[_Write, Exception]]:
+        """Run each write in its own autocommit statement; return the ones that failed."""
+        failed = []
+        for write in batch:
+            try:
+                self._conn.execute(write.sql, write.params)
+            except Exception as e:
+                failed.append((write, e))
+        return failed
+
+    def _requeue_or_drop(self, failed: List[Tuple[_Write, Exception]]) -> None:
+        retry = []
+        for write, error in failed:
+            if write.attempts + 1 < MAX_WRITE_ATTEMPTS:
+                retry.append(write._replace(attempts=write.attempts + 1))
+                continue
+            self.stats["dropped_writes"] += 1
+            logger.error(f"[TICKET_JOURNAL] Dropped write for {write.label} after "
+                         f"{MAX_WRITE_ATTEMPTS} attempts: {error}")
+            if write.sql.startswith("INSERT"):
+                with self._buffer_lock:
+                    pending = self._accepted.pop(write.job_id, None)
+                if pending is not None and not pending.done():
+                    pending.set_exception(error)
+        if retry:
+            with self._buffer_lock:
+                self._buffer[:0] = retry  # Keep them ahead of newer writes for the same jobs
+
+    def _resolve_accepted(self, committed: List[_Write]) -> None:
+        for write in committed:
+            if not write.sql.startswith("INSERT"):
+                continue
+            with self._buffer_lock:
+                pending = self._accepted.pop(write.job_id, None)
+            if pending is not None and not pending.done():
+                pending.set_result(True)
+
+    # =========================================================================
+    # REPLAY / INSPECTION
+    # =========================================================================
+
+    def pending_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Get jobs to replay after a restart (queued or interrupted while running).
+
+        Jobs that already used max_attempts are marked failed instead of
+        being returned, so a ticket that crashes the worker cannot loop.
+        """
+        self.flush()
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT job_id, ticket_id, priority, state, payload, attempts FROM jobs "
+                "WHERE state IN (?, ?) ORDER BY priority DESC, created_at ASC",
+                (STATE_QUEUED, STATE_RUNNING),
+            ).fetchall()
+
+        jobs = []
+        for job_id, ticket_id, priority, state, payload, attempts in rows:
+            if attempts >= self.max_attempts:
+                logger.warning(f"[TICKET_JOURNAL] Giving up on ticket #{ticket_id} after {attempts} attempt(s)")
+                self.mark_failed(job_id, f"Exceeded max attempts ({self.max_attempts})")
+                continue
+            try:
+                initial_state = json.loads(payload) if payload else {"ticket_id": ticket_id}
+            except json.JSONDecodeError:
+                initial_state = {"ticket_id": ticket_id}
+            jobs.append({
+                "job_id": job_id,
+                "ticket_id": ticket_id,
+                "priority": priority,
+                "state": state,
+                "attempts": attempts,
+                "initial_state": initial_state,
+            })
+
+        self.flush()
+        return jobs
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get job counts per state and writer statistics."""
+        counts = {}
+        with self._db_lock:
+            if self._conn is not None:
+                counts = dict(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+        with self._buffer_lock:
+            buffered = len(self._buffer)
+        return {"jobs": counts, "buffered_writes": buffered, **self.stats}
+
+
+# =============================================================================
+# SINGLETON INSTANCE AND PUBLIC API
+# =============================================================================
+
+_journal: Optional[TicketJournal] = None
+
+
+def init_ticket_journal(
+    db_path: str = DEFAULT_JOURNAL_PATH,
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> TicketJournal:
+    """
+    Open the global ticket journal.
+
+    Should be called at application startup, before the work queue starts.
+    """
+    global _journal
+    if _journal is not None:
+        _journal.close()
+    _journal = TicketJournal(db_path=db_path, flush_interval=flush_interval, max_attempts=max_attempts)
+    _journal.open()
+    return _journal
+
+
+def get_ticket_journal() -> Optional[TicketJournal]:
+    """Get the global ticket journal (None if disabled or before startup)."""
+    return _journal
+
+
+def shutdown_ticket_journal() -> None:
+    """Flush and close the global ticket journal."""
+    global _journal
+    if _journal is not None:
+        _journal.close()
+        _journal = None
@@ -0,0 +1,391 @@
+"""
+Ticket Work Queue Service
+Bounded, prioritized in-process queue that feeds the ReACT workflow.
+
+Replaces FastAPI BackgroundTasks for webhook processing:
+- Fixed pool of worker threads for graph.invoke, or worker coroutines on
+  the event loop when the handler is async (graph.ainvoke)
+- Priority ordering by Freshdesk priority and VIP status (FIFO within a level)
+- Queue-depth, wait-time and run-time metrics
+- Admission control: reject with a Retry-After hint when the queue is full
+- Optional durable journal (see ticket_journal.py) for restart replay
+"""
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from app.services.ticket_journal import TicketJournal
+
+logger = logging.getLogger(__name__)
+
+# ===============================
+# CONFIG
+# ===============================
+DEFAULT_WORKER_COUNT = 4
+DEFAULT_MAX_QUEUE_SIZE = 100
+
+# Freshdesk priorities: 1=Low, 2=Medium, 3=High, 4=Urgent
+FRESHDESK_PRIORITY_DEFAULT = 2
+VIP_PRIORITY_BOOST = 2  # VIP Medium ranks with non-VIP Urgent
+
+# Rolling window used for wait/run time metrics
+METRICS_WINDOW = 200
+
+# Retry-After bounds (seconds) returned to Freshdesk on rejection
+MIN_RETRY_AFTER_SECONDS = 30
+MAX_RETRY_AFTER_SECONDS = 600
+
+
+class TicketQueueFull(Exception):
+    """Raised when a ticket is rejected by admission control."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Ticket queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def compute_priority(priority: Any = None, is_vip: bool = False) -> int:
+    """
+    Compute effective queue priority (higher runs first).
+
+    Args:
+        priority: Freshdesk priority (1-4), int or numeric string
+        is_vip: Whether the requester is a VIP customer
+
+    Returns:
+        Effective priority score
+    """
+    try:
+        level = int(priority)
+    except (TypeError, ValueError):
+        level = FRESHDESK_PRIORITY_DEFAULT
+    level = max(1, min(level, 4))
+    return level + (VIP_PRIORITY_BOOST if is_vip else 0)
+
+
+class TicketWorkQueue:
+    """
+    Priority work queue with a fixed pool of worker threads.
+
+    Items are ordered by (-priority, sequence) so higher priority tickets run
+    first and tickets of equal priority run in arrival order.
+
+    If handler is a coroutine function, workers are asyncio tasks on the
+    running event loop instead of threads, so worker_count can be set in the
+    hundreds without extra OS threads. start() must then be called from
+    that loop.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, Dict[str, Any]], Any],  # sync or async
+        worker_count: int = DEFAULT_WORKER_COUNT,
+        max_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        admission_control: bool = True,
+        journal: Optional["TicketJournal"] = None,
+    ):
+        self.handler = handler
+        self.journal = journal
+        self.worker_count = max(1, worker_count)
+        self.max_size = max(1, max_size)
+        self.admission_control = admission_control
+
+        self._heap: List[Tuple[int, int, float, str, str, Dict[str, Any]]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._running = False
+        self._in_flight = 0
+
+        # Async mode (coroutine handler)
+        self.is_async = inspect.iscoroutinefunction(handler)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List["asyncio.Task"] = []
+
+        # Metrics
+        self._wait_times: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._run_times: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._counters = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+        }
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    def start(self) -> None:
+        """Start worker threads."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+
+        if self.is_async:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            for i in range(self.worker_count):
+                self._tasks.append(self._loop.create_task(self._async_worker_loop(), name=f"ticket-worker-{i}"))
+        else:
+            for i in range(self.worker_count):
+                t = threading.Thread(target=self._worker_loop, name=f"ticket-worker-{i}", daemon=True)
+                t.start()
+                self._workers.append(t)
+
+        logger.info(f"[TICKET_QUEUE] Started {self.worker_count} {'async ' if self.is_async else ''}worker(s), "
+                    f"max_size={self.max_size}, admission_control={self.admission_control}")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop accepting work and wait briefly for in-flight tickets.
+
+        Async workers are cancelled; their tickets stay 'running' in the
+        journal and are replayed on the next start.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+        deadline = time.time() + timeout
+        for t in self._workers:
+            t.join(timeout=max(0.0, deadline - time.time()))
+        self._workers = []
+
+        logger.info(f"[TICKET_QUEUE] Stopped ({len(self._heap)} ticket(s) left in queue)")
+
+    # =========================================================================
+    # SUBMISSION
+    # =========================================================================
+
+    def submit(
+        self,
+        ticket_id: str,
+        initial_state: Dict[str, Any],
+        priority: int,
+        job_id: Optional[str] = None,
+        replay: bool = False,
+    ) -> int:
+        """
+        Enqueue a ticket for processing.
+
+        Args:
+            ticket_id: Freshdesk ticket ID
+            initial_state: Initial graph state
+            priority: Effective priority from compute_priority()
+            job_id: Journal key, unique per accepted submission (defaults to a new uuid)
+            replay: Job comes from the journal - skip admission control
+                    and keep its existing journal row
+
+        Returns:
+            Backlog (waiting + in-flight tickets) after insertion
+
+        Raises:
+            TicketQueueFull: If the backlog (waiting + in-flight) has reached
+                             max_size and admission control is on
+        """
+        job_id = job_id or uuid.uuid4().hex
+        with self._cond:
+            depth = self._backlog_locked()
+            if depth >= self.max_size and not replay:
+                if self.admission_control:
+                    self._counters["rejected"] += 1
+                    retry_after = self._estimate_retry_after_locked()
+                    logger.warning(f"[TICKET_QUEUE] Rejecting ticket #{ticket_id}: queue full "
+                                   f"({depth}/{self.max_size}), retry after {retry_after}s")
+                    raise TicketQueueFull(retry_after)
+                logger.warning(f"[TICKET_QUEUE] Queue over capacity ({depth}/{self.max_size}), "
+                               f"accepting ticket #{ticket_id} anyway")
+
+            if self.journal and not replay:
+                self.journal.record_queued(job_id, ticket_id, priority, initial_state)
+            heapq.heappush(self._heap, (-priority, next(self._seq), time.time(), job_id, ticket_id, initial_state))
+            self._counters["submitted"] += 1
+            self._cond.notify()
+            depth = self._backlog_locked()
+
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+        logger.info(f"[TICKET_QUEUE] Queued ticket #{ticket_id} (priority={priority}, depth={depth})")
+        return depth
+
+    # =========================================================================
+    # WORKERS
+    # =========================================================================
+
+    def _pop_locked(self) -> Tuple[int, float, str, str, Dict[str, Any]]:
+        """Take the highest priority item (caller holds the lock)."""
+        neg_priority, _, enqueued_at, job_id, ticket_id, initial_state = heapq.heappop(self._heap)
+        self._in_flight += 1
+        return -neg_priority, enqueued_at, job_id, ticket_id, initial_state
+
+    def _begin(self, priority: int, enqueued_at: float, job_id: str, ticket_id: str) -> float:
+        wait_time = time.time() - enqueued_at
+        logger.info(f"[TICKET_QUEUE] Ticket #{ticket_id} dequeued after {wait_time:.2f}s "
+                    f"(priority={priority})")
+        if self.journal:
+            self.journal.mark_running(job_id)
+        return wait_time
+
+    def _finish(self, job_id: str, ticket_id: str, wait_time: float, run_time: float,
+                error: Optional[Exception]) -> None:
+        if error is not None:
+            logger.error(f"[TICKET_QUEUE] Handler error for ticket #{ticket_id}: {error}", exc_info=error)
+            if self.journal:
+                self.journal.mark_failed(job_id, str(error))
+        elif self.journal:
+            self.journal.mark_done(job_id)
+
+        with self._cond:
+            self._in_flight -= 1
+            self._wait_times.append(wait_time)
+            self._run_times.append(run_time)
+            self._counters["failed" if error is not None else "completed"] += 1
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._heap:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                priority, enqueued_at, job_id, ticket_id, initial_state = self._pop_locked()
+
+            wait_time = self._begin(priority, enqueued_at, job_id, ticket_id)
+            start = time.time()
+            error = None
+            try:
+                self.handler(ticket_id, initial_state)
+            except Exception as e:
+                error = e
+            self._finish(job_id, ticket_id, wait_time, time.time() - start, error)
+
+    async def _async_worker_loop(self) -> None:
+        while self._running:
+            # Clear before checking so a submit() between the check and the wait is not lost
+            self._wakeup.clear()
+            with self._cond:
+                item = self._pop_locked() if self._heap else None
+            if item is None:
+                await self._wakeup.wait()
+                continue
+
+            priority, enqueued_at, job_id, ticket_id, initial_state = item
+            wait_time = self._begin(priority, enqueued_at, job_id, ticket_id)
+            start = time.time()
+            error = None
+            try:
+                await self.handler(ticket_id, initial_state)
+            except Exception as e:
+                error = e
+            self._finish(job_id, ticket_id, wait_time, time.time() - start, error)
+
+    # =========================================================================
+    # METRICS
+    # =========================================================================
+
+    def _backlog_locked(self) -> int:
+        """Tickets waiting or being processed (caller holds the lock)."""
+        return len(self._heap) + self._in_flight
+
+    def _estimate_retry_after_locked(self) -> int:
+        """Estimate seconds until a slot frees up (caller holds the lock)."""
+        avg_run = (sum(self._run_times) / len(self._run_times)) if self._run_times else 60.0
+        estimate = avg_run * (self._backlog_locked() / self.worker_count)
+        return int(max(MIN_RETRY_AFTER_SECONDS, min(estimate, MAX_RETRY_AFTER_SECONDS)))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue depth, wait-time and throughput metrics."""
+        with self._cond:
+            waits = sorted(self._wait_times)
+            runs = list(self._run_times)
+            metrics = {
+                "depth": len(self._heap),
+                "in_flight": self._in_flight,
+                "backlog": self._backlog_locked(),
+                "workers": self.worker_count,
+                "async_workers": self.is_async,
+                "max_size": self.max_size,
+                "admission_control": self.admission_control,
+                "running": self._running,
+                **self._counters,
+            }
+
+        metrics["wait_seconds"] = {
+            "avg": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "p50": round(_percentile(waits, 0.50), 3),
+            "p95": round(_percentile(waits, 0.95), 3),
+            "max": round(waits[-1], 3) if waits else 0.0,
+        }
+        metrics["run_seconds_avg"] = round(sum(runs) / len(runs), 3) if runs else 0.0
+        return metrics
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(pct * len(sorted_values)))
+    return sorted_values[idx]
+
+
+# =============================================================================
+# SINGLETON INSTANCE AND PUBLIC API
+# =============================================================================
+
+_queue: Optional[TicketWorkQueue] = None
+
+
+def init_ticket_queue(
+    handler: Callable[[str, Dict[str, Any]], Any],
+    worker_count: int = DEFAULT_WORKER_COUNT,
+    max_size: int = DEFAULT_MAX_QUEUE_SIZE,
+    admission_control: bool = True,
+    journal: Optional["TicketJournal"] = None,
+) -> TicketWorkQueue:
+    """
+    Create and start the global ticket work queue.
+
+    Should be called at application startup.
+    """
+    global _queue
+    if _queue is not None:
+        _queue.stop()
+    _queue = TicketWorkQueue(
+        handler=handler,
+        worker_count=worker_count,
+        max_size=max_size,
+        admission_control=admission_control,
+        journal=journal,
+    )
+    _queue.start()
+    return _queue
+
+
+def get_ticket_queue() -> Optional[TicketWorkQueue]:
+    """Get the global ticket work queue (None before startup)."""
+    return _queue
+
+
+def shutdown_ticket_queue(timeout: float = 10.0) -> None:
+    """Stop the global ticket work queue."""
+    global _queue
+    if _queue is not None:
+        _queue.stop(timeout=timeout)
+        _queue = None
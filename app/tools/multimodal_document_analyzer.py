@@ -11,19 +11,19 @@ LARGE DOCUMENT HANDLING:
 """
 
 import logging
-import os
 import json
-import re
-import requests
-import tempfile
+import mimetypes
 from typing import Dict, Any, List, Optional, Tuple
 from langchain.tools import tool
 from google import genai
 from google.genai import types
-from requests.auth import HTTPBasicAuth
 
 # Import settings globally
 from app.config.settings import settings
+from app.utils.rate_limiter import gemini_slot, estimate_tokens
+from app.utils.attachment_processor import fetch_attachment
+from app.utils.attachment_store import Blob, get_attachment
+from app.services.identifier_extractor import extract_identifiers, MODEL, PART, CODE, ORDER, SERIAL
 
 logger = logging.getLogger(__name__)
 
@@ -165,38 +165,18 @@ IMPORTANT:
 - Focus on providing useful context for customer support"""
 
 
-# Patterns for extracting product-related identifiers
-PRODUCT_IDENTIFIER_PATTERNS = [
-    r'\b(\d{3}\.\d{4}[A-Z]{0,3})\b',                 # 100.1050SB, 196.1280
-    r'\b([A-Z]{2,4}\.\d{4}[A-Z]{0,3})\b',            # DKM.2420, CFB.2250
-    r'\b(\d{2,3}\.[A-Z]{2,4}\.\d{4}[A-Z]{0,3})\b',   # 10.GGC.4026CP
-    r'\b(\d{3}\.\d{2}[A-Z]{3,5})\b',                 # 160.16CSASG
-    r'\b(\d{6}-\d{3}[A-Z]{0,4})\b',                  # 156297-435
-    r'\b(\d{4}-\d{3}[A-Z]{0,3})\b',                  # 7764-441BB
-    r'\b([A-Z]{2}\d{4}[A-Z]{2})\b',                  # HS6270MB
-    r'\b([A-Z]{3}-\d{4}[A-Z]{0,2})\b',               # CFB-2250
-    r'\b(RP-?\d{4,6})\b',                            # RP-12345 (part numbers)
-    r'\b([A-Z]{1,3}\d{4,6}[A-Z]{0,3})\b',            # F2580CP, A1234
-]
-
-
 def _extract_identifiers_from_text(text: str) -> Dict[str, List[str]]:
     """
-    Extract product identifiers from text using regex patterns.
+    Extract product codes plus labelled order / serial numbers from text.
     Post-processing step to catch any codes Gemini might have missed.
     """
-    if not text:
-        return {}
-    
-    found = []
-    for pattern in PRODUCT_IDENTIFIER_PATTERNS:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        found.extend(matches)
-    
-    # Deduplicate and uppercase
-    unique = list(set(m.upper() for m in found if len(m) >= 4))
-    
-    return {"additional_codes": unique[:20]} if unique else {}
+    found = extract_identifiers(text)
+    extracted = {
+        "additional_codes": [c for c in found.values(MODEL, PART, CODE) if len(c) >= 4][:20],
+        "order_numbers": found.values(ORDER, limit=10),
+        "serial_numbers": found.values(SERIAL, limit=10),
+    }
+    return {key: values for key, values in extracted.items() if values}
 
 
 def _parse_document_response(response_text: str) -> Dict[str, Any]:
@@ -271,54 +251,37 @@ def _parse_document_response(response_text: str) -> Dict[str, Any]:
         }
 
 
-def _download_attachment(url: str, name: str) -> str:
+def _download_attachment(url: str, name: str) -> Tuple[Blob, float]:
     """
-    Download attachment to temp file and return path.
+    Get an attachment's bytes and size in MB.
     
-    IMPORTANT: Freshdesk uses two types of attachment URLs:
-    1. Direct Freshdesk API URLs - require Basic Auth with API key
-    2. S3 signed URLs (amazonaws.com) - already contain AWS signature, NO auth needed
-    
-    Adding auth to S3 signed URLs causes HTTP 400 errors!
+    Ticket attachments come from the attachment store: downloaded once per
+    ticket and shared with fetch_ticket's text extraction and the other
+    analyzers (see app.utils.attachment_processor.fetch_attachment for the
+    Freshdesk / S3 auth rules).
     """
     try:
         logger.info(f"[DOC_ANALYZER] Downloading: {name}")
-        
-        # Detect if this is an S3 signed URL
-        is_s3_signed_url = (
-            "amazonaws.com" in url.lower() or 
-            "X-Amz-Signature" in url or
-            "x-amz-signature" in url.lower()
-        )
-        
-        if is_s3_signed_url:
-            # S3 signed URLs should NOT use authentication
-            logger.info(f"[DOC_ANALYZER] S3 signed URL detected - no auth needed")
-            response = requests.get(url, timeout=30)
-        else:
-            # Direct Freshdesk API URLs require Basic Auth
-            auth = HTTPBasicAuth(settings.freshdesk_api_key, "X")
-            response = requests.get(url, auth=auth, timeout=30)
-        
-        response.raise_for_status()
-        
-        # Create temp file with proper extension
-        suffix = "." + name.split(".")[-1] if "." in name else ".pdf"
-        fd, path = tempfile.mkstemp(suffix=suffix)
-        os.close(fd)
-        
-        with open(path, "wb") as f:
-            f.write(response.content)
-        
-        file_size_mb = len(response.content) / (1024 * 1024)
-        logger.info(f"[DOC_ANALYZER] Downloaded to: {path} ({file_size_mb:.2f} MB)")
-        return path, file_size_mb
+        blob = get_attachment(url, fetch_attachment)
+        file_size_mb = blob.size / (1024 * 1024)
+        logger.info(f"[DOC_ANALYZER] Got {name} ({file_size_mb:.2f} MB)")
+        return blob, file_size_mb
         
     except Exception as e:
         logger.error(f"[DOC_ANALYZER] Download failed for {name}: {e}")
         raise
 
 
+def _upload_mime_type(att: Dict[str, Any], name: str, blob: Blob) -> str:
+    """MIME type for the Gemini upload: attachment metadata, file extension, download header."""
+    return (
+        att.get("content_type")
+        or mimetypes.guess_type(name)[0]
+        or (blob.content_type or "").split(";")[0]
+        or "application/pdf"
+    )
+
+
 def _check_file_size(file_size_mb: float, filename: str) -> Tuple[bool, str]:
     """
     Check if file size is within acceptable limits.
@@ -429,7 +392,6 @@ def multimodal_document_analyzer_tool(
         client = genai.Client(api_key=settings.gemini_api_key)
         
         documents = []
-        temp_files = []
         all_identifiers = {
             "model_numbers": [],
             "part_numbers": [],
@@ -450,9 +412,8 @@ def multimodal_document_analyzer_tool(
                 continue
             
             try:
-                # 1. Download to temp file (now returns file size too)
-                local_path, file_size_mb = _download_attachment(url, name)
-                temp_files.append(local_path)
+                # 1. Get the bytes (shared per-ticket download, no temp file)
+                blob, file_size_mb = _download_attachment(url, name)
                 
                 # 2. Check file size limits
                 is_valid, size_message = _check_file_size(file_size_mb, name)
@@ -479,31 +440,36 @@ def multimodal_document_analyzer_tool(
                 
                 # 3. Upload to Gemini Files API
                 logger.info(f"[DOC_ANALYZER] Uploading {name} to Gemini ({file_size_mb:.2f}MB)")
-                file_obj = client.files.upload(file=local_path)
+                file_obj = client.files.upload(
+                    file=blob.path or blob.open(),  # Spilled blobs upload from their file
+                    config=types.UploadFileConfig(mime_type=_upload_mime_type(att, name, blob), display_name=name)
+                )
                 
                 # 4. Call Gemini for intelligent analysis
                 logger.info(f"[DOC_ANALYZER] Analyzing {name} with gemini-2.5-flash (~{estimated_pages} pages)")
                 
-                response = client.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=[
-                        types.Content(
-                            parts=[
-                                types.Part(text=DOCUMENT_ANALYSIS_PROMPT),
-                                types.Part(
-                                    file_data=types.FileData(
-                                        file_uri=file_obj.uri,
-                                        mime_type=file_obj.mime_type
+                with gemini_slot("gemini-2.5-flash", estimate_tokens(DOCUMENT_ANALYSIS_PROMPT, images=estimated_pages)) as slot:
+                    response = client.models.generate_content(
+                        model="gemini-2.5-flash",
+                        contents=[
+                            types.Content(
+                                parts=[
+                                    types.Part(text=DOCUMENT_ANALYSIS_PROMPT),
+                                    types.Part(
+                                        file_data=types.FileData(
+                                            file_uri=file_obj.uri,
+                                            mime_type=file_obj.mime_type
+                                        )
                                     )
-                                )
-                            ]
+                                ]
+                            )
+                        ],
+                        config=types.GenerateContentConfig(
+                            response_mime_type="application/json",
+                            temperature=0.1
                         )
-                    ],
-                    config=types.GenerateContentConfig(
-                        response_mime_type="application/json",
-                        temperature=0.1
                     )
-                )
+                    slot.record(response)
                 
                 # 5. Parse response
                 response_text = response.text if response.text else ""
@@ -520,15 +486,16 @@ def multimodal_document_analyzer_tool(
                 
                 # Merge identifiers
                 identifiers = analysis.get("identifiers", {})
-                if additional.get("additional_codes"):
+                if additional:
                     existing_codes = set()
                     for key in identifiers:
                         if isinstance(identifiers[key], list):
                             existing_codes.update(identifiers[key])
                     
-                    new_codes = [c for c in additional["additional_codes"] if c not in existing_codes]
-                    if new_codes:
-                        identifiers["additional_codes"] = new_codes
+                    for key, values in additional.items():
+                        new_codes = [c for c in values if c not in existing_codes]
+                        if new_codes:
+                            identifiers[key] = list(identifiers.get(key) or []) + new_codes
                 
                 # Collect all identifiers
                 for key in all_identifiers:
@@ -577,14 +544,6 @@ def multimodal_document_analyzer_tool(
                     "error": str(e)
                 })
         
-        # Cleanup temp files
-        for temp_file in temp_files:
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-            except Exception as e:
-                logger.warning(f"[DOC_ANALYZER] Failed to delete temp file {temp_file}: {e}")
-        
         # Deduplicate all_identifiers
         for key in all_identifiers:
             all_identifiers[key] = list(set(all_identifiers[key]))
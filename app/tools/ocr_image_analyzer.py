@@ -15,10 +15,12 @@ from google.genai import types
 import httpx
 import logging
 import json
-import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from app.config.settings import settings
+from app.utils.rate_limiter import gemini_slot, estimate_tokens
+from app.utils.attachment_store import get_attachment
+from app.services.identifier_extractor import extract_identifiers, MODEL, PART
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -126,35 +128,12 @@ IMPORTANT:
 - DO NOT confuse order numbers with product model numbers"""
 
 
-# Flusso-specific model number patterns for post-processing
-FLUSSO_MODEL_PATTERNS = [
-    r'\b(\d{3}\.\d{4}[A-Z]{0,3})\b',                 # 100.1050SB, 196.1280
-    r'\b([A-Z]{2,4}\.\d{4}[A-Z]{0,3})\b',            # DKM.2420, CFB.2250
-    r'\b(\d{2,3}\.[A-Z]{2,4}\.\d{4}[A-Z]{0,3})\b',   # 10.GGC.4026CP
-    r'\b(\d{3}\.\d{2}[A-Z]{3,5})\b',                 # 160.16CSASG
-    r'\b(\d{6}-\d{3}[A-Z]{0,2})\b',                  # 156297-435
-    r'\b(\d{4}-\d{3}[A-Z]{0,3})\b',                  # 7764-441BB
-    r'\b([A-Z]{2}\d{4}[A-Z]{2})\b',                  # HS6270MB
-    r'\b([A-Z]{3}-\d{4}[A-Z]{0,2})\b',               # CFB-2250
-]
-
-
 def _extract_flusso_model_numbers(text: str) -> List[str]:
     """
-    Extract valid Flusso model numbers from text using regex patterns.
+    Extract valid Flusso model numbers from text.
     This is a post-processing step to catch any models Gemini might have missed.
     """
-    if not text:
-        return []
-    
-    found_models = []
-    for pattern in FLUSSO_MODEL_PATTERNS:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        found_models.extend(matches)
-    
-    # Deduplicate and uppercase
-    unique_models = list(set(m.upper() for m in found_models))
-    return unique_models[:10]
+    return extract_identifiers(text).values(MODEL, PART, limit=10)
 
 
 def _parse_analysis_response(response_text: str) -> Dict[str, Any]:
@@ -231,6 +210,17 @@ def _parse_analysis_response(response_text: str) -> Dict[str, Any]:
         }
 
 
+def _download_image(url: str) -> Tuple[bytes, Optional[str]]:
+    """Download an image; returns (bytes, content type)."""
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    }
+    with httpx.Client(timeout=30.0, follow_redirects=True) as http_client:
+        image_resp = http_client.get(url, headers=headers)
+        image_resp.raise_for_status()
+        return image_resp.content, image_resp.headers.get("content-type")
+
+
 @tool
 def ocr_image_analyzer_tool(image_urls: List[str]) -> Dict[str, Any]:
     """
@@ -284,38 +274,33 @@ def ocr_image_analyzer_tool(image_urls: List[str]) -> Dict[str, Any]:
         try:
             logger.info(f"[IMAGE_ANALYZER] Processing image {index + 1}/{len(image_urls)}: {url[:80]}...")
             
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-
-            # Download image
-            with httpx.Client(timeout=30.0, follow_redirects=True) as http_client:
-                image_resp = http_client.get(url, headers=headers)
-                image_resp.raise_for_status()
-                
-                mime_type = image_resp.headers.get("content-type", "image/jpeg")
-                image_bytes = image_resp.content
+            # Download image (once per ticket - shared with vision search via the attachment store)
+            image = get_attachment(url, _download_image)
+            mime_type = image.content_type or "image/jpeg"
+            image_bytes = image.data
 
             # 3. Send to Gemini for intelligent analysis
             # Using gemini-2.5-flash for better vision capabilities
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=[
-                    types.Content(
-                        parts=[
-                            types.Part(text=IMAGE_ANALYSIS_PROMPT),
-                            types.Part.from_bytes(
-                                data=image_bytes,
-                                mime_type=mime_type
-                            )
-                        ]
+            with gemini_slot("gemini-2.5-flash", estimate_tokens(IMAGE_ANALYSIS_PROMPT, images=1)) as slot:
+                response = client.models.generate_content(
+                    model="gemini-2.5-flash",
+                    contents=[
+                        types.Content(
+                            parts=[
+                                types.Part(text=IMAGE_ANALYSIS_PROMPT),
+                                types.Part.from_bytes(
+                                    data=image_bytes,
+                                    mime_type=mime_type
+                                )
+                            ]
+                        )
+                    ],
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json",
+                        temperature=0.1  # Low temp for accurate analysis
                     )
-                ],
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    temperature=0.1  # Low temp for accurate analysis
                 )
-            )
+                slot.record(response)
             
             # 4. Parse response
             response_text = response.text if response.text else ""
@@ -6,7 +6,7 @@ This tool provides intelligent product search capabilities with multiple strateg
 2. Group/prefix matching for variations (instant)
 3. Fuzzy matching for typos (fast)
 4. Keyword-based text search (fast)
-5. Category and collection filtering
+5. Category, collection and finish filtering (combinable)
 
 Data: 5,687 products with 70 fields each, including:
 - Full product details (title, description, features)
@@ -22,7 +22,7 @@ Use this tool to:
 - Get product specifications and pricing
 - Find available finish variations
 - Search by product description or keywords
-- Filter by category or collection
+- Filter by category, collection and/or finish
 """
 
 import logging
@@ -44,7 +44,7 @@ def _format_product_summary(product: Dict[str, Any], include_details: bool = Tru
     Format a product for output with essential fields.
     
     Args:
-        product: Raw product dict from catalog
+        product: Product row (dict-like view) from catalog
         include_details: Whether to include full details or just essentials
         
     Returns:
@@ -98,6 +98,7 @@ def product_catalog_tool(
     model_number: Optional[str] = None,
     category: Optional[str] = None,
     collection: Optional[str] = None,
+    finish: Optional[str] = None,
     include_variations: bool = True,
     limit: int = 10
 ) -> Dict[str, Any]:
@@ -129,6 +130,10 @@ def product_catalog_tool(
        
     6. **Collection Filter** - Filter by collection
        Collections: Serie 100, Serie 196, Universal Fixtures, Cascade, etc.
+       
+    7. **Combined Filters** - Any mix of category, collection and finish
+       Example: category="Kitchen", finish="Matte Black", collection="Serie 100"
+       Filters also narrow keyword searches.
     
     PRODUCT DATA INCLUDES:
     - Identification: model_no, group_number, UPC
@@ -151,24 +156,26 @@ def product_catalog_tool(
         model_number: Specific model or group number (e.g., "100.1170CP" or "100.1170")
         category: Filter by category (Showering, Bathing, Sink Faucets, Kitchen, etc.)
         collection: Filter by collection (Serie 100, Serie 196, etc.)
+        finish: Filter by finish code or name (MB, "Matte Black", etc.)
         include_variations: If True and searching by group, include all finish variations
         limit: Maximum number of results to return (default: 10)
     
     Returns:
         {
             "success": bool,
-            "search_method": "exact" | "group" | "prefix" | "fuzzy" | "keyword" | "category",
+            "search_method": "exact" | "group" | "prefix" | "fuzzy" | "keyword" | "category" | "collection" | "filter",
             "query_interpreted": str,
             "products": [...],
             "count": int,
             "variations": {...} (if group search),
             "suggestions": [...] (if fuzzy match),
             "related_parts": [...] (if exact match found),
+            "used_in_products": [...] (if the exact match is a spare part),
             "message": str
         }
     """
     logger.info(f"[PRODUCT_CATALOG] Search: query={query}, model={model_number}, "
-               f"cat={category}, collection={collection}")
+               f"cat={category}, collection={collection}, finish={finish}")
     
     # Ensure catalog is loaded
     try:
@@ -204,13 +211,16 @@ def product_catalog_tool(
     elif query and looks_like_model_number(query):
         search_target = query.strip().upper()
         search_method = "model"
-    # Priority 3: Category-only search
+    # Priority 3: Combined filters (e.g. Kitchen + Matte Black + Serie 100)
+    elif not query and (finish or (category and collection)):
+        search_method = "filter"
+    # Priority 4: Category-only search
     elif category and not query:
         search_method = "category"
-    # Priority 4: Collection-only search
+    # Priority 5: Collection-only search
     elif collection and not query:
         search_method = "collection"
-    # Priority 5: Keyword search
+    # Priority 6: Keyword search
     elif query:
         search_method = "keyword"
     else:
@@ -219,7 +229,7 @@ def product_catalog_tool(
             "search_method": "none",
             "products": [],
             "count": 0,
-            "message": "Please provide a query, model_number, category, or collection to search."
+            "message": "Please provide a query, model_number, category, collection, or finish to search."
         }
     
     # ==========================================================================
@@ -241,10 +251,10 @@ def product_catalog_tool(
                 variations = catalog.get_finish_variations(exact_product["group_number"])
             
             # Get related parts
-            related_parts = catalog.get_related_parts(search_target)
+            related_parts = catalog.get_related_parts(exact_product["model_no"])
             related_formatted = [_format_product_summary(p, include_details=False) for p in related_parts]
             
-            return {
+            result = {
                 "success": True,
                 "search_method": "exact",
                 "query_interpreted": search_target,
@@ -254,6 +264,13 @@ def product_catalog_tool(
                 "related_parts": related_formatted,
                 "message": f"Found exact match for model {search_target}"
             }
+            
+            # Spare part: list the products it fits
+            if exact_product["is_spare_part"]:
+                used_in = catalog.get_products_using_part(exact_product["model_no"], limit=limit)
+                result["used_in_products"] = [_format_product_summary(p, include_details=False) for p in used_in]
+            
+            return result
         
         # Try group match (base model without finish suffix)
         group_products = catalog.search_by_group(search_target)
@@ -387,13 +404,47 @@ def product_catalog_tool(
             }
     
     # ==========================================================================
-    # STRATEGY 4: KEYWORD SEARCH
+    # STRATEGY 4: COMBINED FILTER SEARCH
+    # ==========================================================================
+    if search_method == "filter":
+        filters = {"category": category, "collection": collection, "finish": finish}
+        filter_desc = " + ".join(f"{k}='{v}'" for k, v in filters.items() if v)
+        logger.info(f"[PRODUCT_CATALOG] Filter search: {filter_desc}")
+        
+        products_raw, total = catalog.search_by_facets(
+            category=category, collection=collection, finish=finish, limit=limit
+        )
+        
+        if products_raw:
+            products = [_format_product_summary(p, include_details=False) for p in products_raw]
+            return {
+                "success": True,
+                "search_method": "filter",
+                "query_interpreted": filter_desc,
+                "products": products,
+                "count": total,
+                "message": f"Found {total} product(s) with {filter_desc} (showing first {len(products)})"
+            }
+        else:
+            return {
+                "success": False,
+                "search_method": "filter",
+                "query_interpreted": filter_desc,
+                "products": [],
+                "count": 0,
+                "message": f"No products found with {filter_desc}. Available categories: "
+                           f"{', '.join(catalog.get_categories()[:10])}"
+            }
+    
+    # ==========================================================================
+    # STRATEGY 5: KEYWORD SEARCH
     # ==========================================================================
     if search_method == "keyword":
         logger.info(f"[PRODUCT_CATALOG] Keyword search: {query}")
         
         products_raw = catalog.search_keywords(query, category=category, 
-                                               collection=collection, limit=limit)
+                                               collection=collection, limit=limit,
+                                               finish=finish)
         
         if products_raw:
             products = [_format_product_summary(p, include_details=True) for p in products_raw]
@@ -403,6 +454,8 @@ def product_catalog_tool(
                 filter_msg += f" in category '{category}'"
             if collection:
                 filter_msg += f" in collection '{collection}'"
+            if finish:
+                filter_msg += f" in finish '{finish}'"
             
             return {
                 "success": True,
@@ -4,15 +4,19 @@ Identifies products from customer-provided images
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
 from langchain.tools import tool
 
-from app.clients.embeddings import embed_image
+from app.clients.embeddings import embed_images
 from app.clients.pinecone_client import get_pinecone_client
 from app.config.settings import settings
+from app.services.image_index import get_local_image_index
 
 logger = logging.getLogger(__name__)
 
+MAX_CONCURRENT_QUERIES = 6  # Image index queries in flight per tool call
+
 
 @tool
 def vision_search_tool(
@@ -67,27 +71,32 @@ def vision_search_tool(
         }
     
     try:
-        client = get_pinecone_client()
         all_matches = []
         
-        # Process each image
-        for idx, img_url in enumerate(image_urls, 1):
-            logger.info(f"[VISION_SEARCH] Processing image {idx}/{len(image_urls)}: {img_url}")
-            
+        # Generate CLIP embeddings for all images (concurrent downloads, one batched forward pass)
+        vectors = embed_images(image_urls)
+        embedded = []
+        for idx, vector in enumerate(vectors, 1):
+            if vector is None:
+                logger.error(f"[VISION_SEARCH] Failed to embed image {idx}: {image_urls[idx - 1]}")
+            else:
+                embedded.append((idx, vector))
+        
+        # Query Pinecone (or the local mirror) for all images concurrently
+        def search(item):
+            idx, vector = item
             try:
-                # Generate CLIP embedding
-                vector = embed_image(img_url)
-                
-                # Query Pinecone
-                results = client.query_images(vector=vector, top_k=top_k)
-                
-                if results:
-                    all_matches.extend(results)
-                    logger.info(f"[VISION_SEARCH] Image {idx}: Found {len(results)} matches")
-                    
+                return idx, _query_image_index(vector, top_k)
             except Exception as e:
                 logger.error(f"[VISION_SEARCH] Failed to process image {idx}: {e}")
-                continue
+                return idx, []
+        
+        if embedded:
+            with ThreadPoolExecutor(max_workers=min(len(embedded), MAX_CONCURRENT_QUERIES)) as pool:
+                for idx, results in pool.map(search, embedded):
+                    if results:
+                        all_matches.extend(results)
+                        logger.info(f"[VISION_SEARCH] Image {idx}: Found {len(results)} matches")
         
         if not all_matches:
             return {
@@ -166,6 +175,32 @@ def vision_search_tool(
         }
 
 
+def _query_image_index(vector, top_k: int) -> List[Dict]:
+    """
+    Query the image index per settings.vision_local_index_mode:
+    "primary" searches the local mirror only, "fallback" uses it when
+    Pinecone fails or returns nothing, "off" is Pinecone only.
+    """
+    mode = settings.vision_local_index_mode
+    local = get_local_image_index() if mode != "off" else None
+    
+    if local is not None and mode == "primary":
+        return local.query(vector, top_k=top_k)
+    
+    try:
+        results = get_pinecone_client().query_images(vector=vector, top_k=top_k)
+    except Exception as e:
+        if local is None:
+            raise
+        logger.warning(f"[VISION_SEARCH] Pinecone unavailable ({e}), using local image index")
+        results = []
+    
+    if not results and local is not None:
+        logger.info(f"[VISION_SEARCH] Falling back to local image index ({len(local)} vectors)")
+        results = local.query(vector, top_k=top_k)
+    return results
+
+
 def _deduplicate_matches(matches: List[Dict], top_k: int) -> List[Dict]:
     """Remove duplicate products based on model number"""
     seen_models = set()
@@ -2,6 +2,7 @@
 Attachment Processor Utility
 Extracts text content from various attachment types (PDF, DOCX, XLSX, TXT, etc.)
 Primary focus: PDF processing using PyMuPDF
+PDF / DOCX / XLSX extraction runs in a process pool (see EXTRACTION PROCESS POOL)
 
 NOTE: Freshdesk attachment URLs can be:
   1. Direct API URLs - require Freshdesk API key auth
@@ -12,13 +13,19 @@ Adding auth to S3 signed URLs causes HTTP 400 errors!
 
 import logging
 import io
+import multiprocessing
 import requests
 from requests.auth import HTTPBasicAuth
+import threading
 import time
-from typing import Dict, Any, List, Optional, Tuple
+import weakref
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
 from app.config.settings import settings
+from app.utils.attachment_store import get_attachment
 
 logger = logging.getLogger(__name__)
 
@@ -91,9 +98,9 @@ SUPPORTED_TYPES = {
 }
 
 
-def download_attachment(url: str, timeout: int = 30) -> Tuple[Optional[bytes], Optional[str]]:
+def fetch_attachment(url: str, timeout: int = 30) -> Tuple[bytes, Optional[str]]:
     """
-    Download attachment from Freshdesk URL.
+    Download attachment from Freshdesk URL (raises on failure).
     
     IMPORTANT: Freshdesk uses two types of attachment URLs:
     1. Direct Freshdesk API URLs - require Basic Auth with API key
@@ -101,46 +108,47 @@ def download_attachment(url: str, timeout: int = 30) -> Tuple[Optional[bytes], O
     
     Adding auth to S3 signed URLs causes HTTP 400 errors!
     
+    Returns:
+        Tuple of (file_bytes, content_type)
+    """
+    logger.info(f"📥 Downloading attachment: {url[:100]}...")
+    
+    # Detect if this is an S3 signed URL (contains amazonaws.com and signature)
+    # S3 URLs already have authentication built into the URL (X-Amz-Signature)
+    is_s3_signed_url = (
+        "amazonaws.com" in url.lower() or 
+        "X-Amz-Signature" in url or
+        "x-amz-signature" in url.lower()
+    )
+    
+    if is_s3_signed_url:
+        # S3 signed URLs should NOT use authentication - it causes 400 errors
+        logger.info(f"📥 Detected S3 signed URL - downloading without auth")
+        response = requests.get(url, timeout=timeout)
+    else:
+        # Direct Freshdesk API URLs require Basic Auth
+        logger.info(f"📥 Direct Freshdesk URL - using API key auth")
+        auth = HTTPBasicAuth(settings.freshdesk_api_key, "X")
+        response = requests.get(url, auth=auth, timeout=timeout)
+    
+    response.raise_for_status()
+    
+    # Get file size for logging
+    logger.info(f"✅ Downloaded {len(response.content) / 1024:.1f} KB")
+    
+    return response.content, response.headers.get("content-type")
+
+
+def download_attachment(url: str, timeout: int = 30) -> Tuple[Optional[bytes], Optional[str]]:
+    """
+    Download attachment from Freshdesk URL.
+    Ticket attachments are downloaded once and shared through the attachment store.
+    
     Returns:
         Tuple of (file_bytes, error_message)
     """
     try:
-        logger.info(f"📥 Downloading attachment: {url[:100]}...")
-        
-        # Detect if this is an S3 signed URL (contains amazonaws.com and signature)
-        # S3 URLs already have authentication built into the URL (X-Amz-Signature)
-        is_s3_signed_url = (
-            "amazonaws.com" in url.lower() or 
-            "X-Amz-Signature" in url or
-            "x-amz-signature" in url.lower()
-        )
-        
-        if is_s3_signed_url:
-            # S3 signed URLs should NOT use authentication - it causes 400 errors
-            logger.info(f"📥 Detected S3 signed URL - downloading without auth")
-            response = requests.get(
-                url,
-                timeout=timeout,
-                stream=True
-            )
-        else:
-            # Direct Freshdesk API URLs require Basic Auth
-            logger.info(f"📥 Direct Freshdesk URL - using API key auth")
-            auth = HTTPBasicAuth(settings.freshdesk_api_key, "X")
-            response = requests.get(
-                url, 
-                auth=auth,
-                timeout=timeout,
-                stream=True
-            )
-        
-        response.raise_for_status()
-        
-        # Get file size for logging
-        file_size = len(response.content)
-        logger.info(f"✅ Downloaded {file_size / 1024:.1f} KB")
-        
-        return response.content, None
+        return get_attachment(url, lambda u: fetch_attachment(u, timeout)).data, None
     except requests.exceptions.Timeout:
         return None, f"Download timeout after {timeout}s"
     except requests.exceptions.HTTPError as e:
@@ -367,15 +375,13 @@ def extract_text_file(file_bytes: bytes, filename: str) -> AttachmentContent:
         )
 
 
-def process_attachment(attachment: Dict[str, Any]) -> Optional[AttachmentContent]:
+def _classify_attachment(attachment: Dict[str, Any]) -> Tuple[Optional[str], str, Optional[str]]:
     """
-    Process a single attachment and extract its text content.
+    Work out whether and how an attachment's text can be extracted.
     
-    Args:
-        attachment: Freshdesk attachment dict with keys like 'attachment_url', 'content_type', 'name'
-        
     Returns:
-        AttachmentContent with extracted text, or None if unsupported/failed
+        Tuple of (url, filename, file_type); file_type is None for attachments
+        to skip (no URL, unsupported type, images)
     """
     url = attachment.get("attachment_url") or attachment.get("url")
     content_type = str(attachment.get("content_type", "")).lower()
@@ -383,7 +389,7 @@ def process_attachment(attachment: Dict[str, Any]) -> Optional[AttachmentContent
     
     if not url:
         logger.warning(f"⚠️ Attachment {filename} has no URL")
-        return None
+        return None, filename, None
     
     # Determine file type
     file_type = SUPPORTED_TYPES.get(content_type)
@@ -409,25 +415,18 @@ def process_attachment(attachment: Dict[str, Any]) -> Optional[AttachmentContent
     
     if not file_type:
         logger.info(f"⏭️ Skipping unsupported attachment type: {content_type} ({filename})")
-        return None
+        return url, filename, None
     
     # Skip images (handled separately by vision pipeline)
     if file_type == "image":
         logger.debug(f"⏭️ Skipping image attachment (handled by vision pipeline): {filename}")
-        return None
-    
-    # Download the file
-    file_bytes, error = download_attachment(url)
-    if error:
-        logger.error(f"❌ Failed to download {filename}: {error}")
-        return AttachmentContent(
-            filename=filename,
-            file_type=file_type,
-            content="",
-            error=error
-        )
+        return url, filename, None
     
-    # Extract text based on type
+    return url, filename, file_type
+
+
+def extract_content(file_type: str, file_bytes: bytes, filename: str) -> Optional[AttachmentContent]:
+    """Extract text from downloaded attachment bytes based on file type."""
     if file_type == "pdf":
         return extract_pdf_text(file_bytes, filename)
     elif file_type == "docx":
@@ -449,6 +448,284 @@ def process_attachment(attachment: Dict[str, Any]) -> Optional[AttachmentContent
     return None
 
 
+def process_attachment(attachment: Dict[str, Any]) -> Optional[AttachmentContent]:
+    """
+    Process a single attachment and extract its text content (in this process).
+    
+    Args:
+        attachment: Freshdesk attachment dict with keys like 'attachment_url', 'content_type', 'name'
+        
+    Returns:
+        AttachmentContent with extracted text, or None if unsupported/failed
+    """
+    url, filename, file_type = _classify_attachment(attachment)
+    if not file_type:
+        return None
+    
+    # Download the file
+    file_bytes, error = download_attachment(url)
+    if error:
+        logger.error(f"❌ Failed to download {filename}: {error}")
+        return AttachmentContent(
+            filename=filename,
+            file_type=file_type,
+            content="",
+            error=error
+        )
+    
+    return extract_content(file_type, file_bytes, filename)
+
+
+# =============================================================================
+# EXTRACTION PROCESS POOL
+# PyMuPDF, python-docx and openpyxl are CPU bound and hold the GIL: run in
+# the graph thread, a 200-page PDF stalls every other ticket in this worker.
+# =============================================================================
+
+POOLED_TYPES = {"pdf", "docx", "xlsx", "xls"}  # Text / CSV / HTML decoding stays inline
+POLL_SECONDS = 0.5
+
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# One slot per worker: at most that many calls are outstanding process-wide, so
+# a submitted file is on a worker (not queued inside the executor, which also
+# reports queued calls as running) and its timeout only counts its own run
+_extraction_slots: Optional[threading.BoundedSemaphore] = None
+# Pools killed because one file timed out: their other files are re-queued, not crashes
+_timed_out_pools: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+
+
+def _limit_worker_memory(limit_mb: int) -> None:
+    """Pool initializer: cap the worker's address space (a huge file fails with MemoryError)."""
+    if limit_mb <= 0:
+        return
+    try:
+        import resource
+        limit = limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"⚠️ Could not cap extraction worker memory: {e}")
+
+
+def _get_extraction_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared extraction pool (None when attachment_extraction_workers is 0)."""
+    global _extraction_pool, _extraction_slots
+    if settings.attachment_extraction_workers <= 0:
+        return None
+    with _pool_lock:
+        if _extraction_slots is None:
+            _extraction_slots = threading.BoundedSemaphore(settings.attachment_extraction_workers)
+        if _extraction_pool is None:
+            # spawn: forking a process with live threads (uvicorn, tool pools) can deadlock the child
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=settings.attachment_extraction_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_limit_worker_memory,
+                initargs=(settings.attachment_extraction_memory_mb,),
+            )
+            logger.info(f"📄 Extraction pool started: {settings.attachment_extraction_workers} worker(s), "
+                        f"{settings.attachment_extraction_memory_mb} MB cap")
+        return _extraction_pool
+
+
+def _recycle_extraction_pool(pool: ProcessPoolExecutor, timed_out: bool = False) -> None:
+    """
+    Kill a pool's workers; the next extraction starts a fresh pool.
+
+    timed_out: killed for one file's timeout - files of other tickets that
+    were on it are re-queued by their own drain loops instead of counting
+    it as a crash.
+    """
+    global _extraction_pool
+    with _pool_lock:
+        if timed_out:
+            _timed_out_pools.add(pool)
+        if _extraction_pool is pool:
+            _extraction_pool = None
+    # A running task cannot be cancelled through the executor API: terminate its processes
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+def shutdown_extraction_pool() -> None:
+    global _extraction_pool
+    with _pool_lock:
+        pool, _extraction_pool = _extraction_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+@dataclass
+class _ExtractionJob:
+    index: int
+    filename: str
+    file_type: str
+    file_bytes: bytes
+    pool: Optional[ProcessPoolExecutor] = None
+    started: Optional[float] = None  # When a worker picked it up (the timeout runs from here)
+    retried: bool = False
+
+
+def _release_slot(_: Future) -> None:
+    _extraction_slots.release()
+
+
+def _try_submit(job: _ExtractionJob, pending: Dict[Future, _ExtractionJob]) -> bool:
+    """Submit a file if a worker slot is free. Returns False when all workers are busy."""
+    job.pool = _get_extraction_pool()
+    if not _extraction_slots.acquire(blocking=False):
+        return False
+    job.started = None
+    try:
+        try:
+            future = job.pool.submit(extract_content, job.file_type, job.file_bytes, job.filename)
+        except (BrokenProcessPool, RuntimeError):  # Broken or recycled by another ticket meanwhile
+            _recycle_extraction_pool(job.pool)
+            job.pool = _get_extraction_pool()
+            future = job.pool.submit(extract_content, job.file_type, job.file_bytes, job.filename)
+    except BaseException:
+        _extraction_slots.release()
+        raise
+    future.add_done_callback(_release_slot)
+    pending[future] = job
+    return True
+
+
+def _failed(job: _ExtractionJob, error: str) -> AttachmentContent:
+    logger.error(f"❌ Extraction failed for {job.filename}: {error}")
+    return AttachmentContent(
+        filename=job.filename,
+        file_type=job.file_type,
+        content="",
+        size_bytes=len(job.file_bytes),
+        error=error
+    )
+
+
+def _drain_extractions(
+    pending: Dict[Future, _ExtractionJob],
+    queued: List[_ExtractionJob],
+    retries: List[_ExtractionJob],
+    block: bool
+) -> Iterator[Tuple[int, AttachmentContent]]:
+    """
+    Submit queued files as worker slots free up and yield finished pool
+    extractions. With block=True, wait until all are done.
+    
+    A file still running after attachment_extraction_timeout is abandoned:
+    the pool is recycled (its workers terminated) and the unfinished files on
+    it - this ticket's and, through their own drain loops, other tickets' -
+    are queued again. Files in a worker that crashed are retried once, one
+    at a time, so the file that crashed it cannot take the others down with
+    it again.
+    """
+    timeout = settings.attachment_extraction_timeout
+    while pending or queued or retries:
+        if retries and not any(job.retried for job in pending.values()) and _try_submit(retries[0], pending):
+            retries.pop(0)
+        while queued and _try_submit(queued[0], pending):
+            queued.pop(0)
+        
+        if not pending:
+            if not block:
+                return
+            time.sleep(POLL_SECONDS)  # Every worker is busy with other tickets' files
+            continue
+        
+        done, _ = wait(list(pending), timeout=POLL_SECONDS if block else 0, return_when=FIRST_COMPLETED)
+        resubmit: List[_ExtractionJob] = []
+        
+        for future in done:
+            job = pending.pop(future)
+            try:
+                content = future.result()
+            except CancelledError:
+                resubmit.append(job)  # Queued on a pool recycled after a timeout elsewhere
+                continue
+            except BrokenProcessPool:
+                if job.pool in _timed_out_pools:
+                    resubmit.append(job)  # Killed for another file's timeout, not a crash
+                elif job.retried:
+                    yield job.index, _failed(job, "Extraction worker crashed (file too large or corrupt?)")
+                else:
+                    job.retried = True
+                    retries.append(job)
+                continue
+            except Exception as e:
+                yield job.index, _failed(job, str(e))
+                continue
+            if content is not None:
+                yield job.index, content
+        
+        now = time.monotonic()
+        expired = []
+        for future, job in pending.items():
+            if job.started is None and future.running():
+                job.started = now
+            elif job.started is not None and now - job.started > timeout:
+                expired.append(future)
+        
+        recycled = set()
+        for future in expired:
+            job = pending.pop(future)
+            recycled.add(id(job.pool))
+            _recycle_extraction_pool(job.pool, timed_out=True)
+            yield job.index, _failed(job, f"Extraction timeout after {timeout:.0f}s")
+        # Files that were on a recycled pool start again on a fresh one
+        for future in [f for f, job in pending.items() if id(job.pool) in recycled]:
+            resubmit.append(pending.pop(future))
+        
+        queued[:0] = resubmit
+        
+        if not block:
+            return
+
+
+def iter_attachment_contents(attachments: List[Dict[str, Any]]) -> Iterator[Tuple[int, AttachmentContent]]:
+    """
+    Download and extract document attachments, yielding results as each file finishes.
+    
+    PDF / DOCX / XLSX extraction runs in the extraction process pool
+    (per-file timeout, memory-capped workers) and overlaps the remaining
+    downloads; other types are extracted inline.
+    
+    Args:
+        attachments: Freshdesk attachment dicts (images and unsupported types are skipped)
+        
+    Yields:
+        Tuple of (index into attachments, AttachmentContent), in completion order
+    """
+    pool = _get_extraction_pool()
+    pending: Dict[Future, _ExtractionJob] = {}
+    queued: List[_ExtractionJob] = []  # Waiting for a free worker
+    retries: List[_ExtractionJob] = []
+    
+    for index, attachment in enumerate(attachments):
+        url, filename, file_type = _classify_attachment(attachment)
+        if not file_type:
+            continue
+        
+        file_bytes, error = download_attachment(url)
+        if error:
+            logger.error(f"❌ Failed to download {filename}: {error}")
+            yield index, AttachmentContent(filename=filename, file_type=file_type, content="", error=error)
+            continue
+        
+        if pool is None or file_type not in POOLED_TYPES:
+            content = extract_content(file_type, file_bytes, filename)
+            if content is not None:
+                yield index, content
+            continue
+        
+        queued.append(_ExtractionJob(index, filename, file_type, file_bytes))
+        yield from _drain_extractions(pending, queued, retries, block=False)
+    
+    yield from _drain_extractions(pending, queued, retries, block=True)
+
+
 def process_all_attachments(attachments: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Process all attachments from a ticket and extract text content.
@@ -474,7 +751,7 @@ def process_all_attachments(attachments: List[Dict[str, Any]]) -> Dict[str, Any]
     logger.info(f"📎 Processing {len(attachments)} attachment(s)...")
     start_time = time.time()
     
-    extracted_contents: List[AttachmentContent] = []
+    documents: List[Dict[str, Any]] = []
     images: List[str] = []
     failed_count = 0
     
@@ -491,12 +768,15 @@ def process_all_attachments(attachments: List[Dict[str, Any]]) -> Dict[str, Any]
                 images.append(url)
             continue
         
-        # Process document attachments
-        result = process_attachment(att)
-        if result:
-            if result.error and not result.content:
-                failed_count += 1
-            extracted_contents.append(result)
+        documents.append(att)
+    
+    # Process document attachments (results arrive as each file finishes; keep ticket order)
+    results: Dict[int, AttachmentContent] = {}
+    for index, result in iter_attachment_contents(documents):
+        if result.error and not result.content:
+            failed_count += 1
+        results[index] = result
+    extracted_contents = [results[index] for index in sorted(results)]
     
     # Build combined content
     content_parts = []
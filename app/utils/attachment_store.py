@@ -0,0 +1,307 @@
+"""
+Attachment Blob Store
+Run-scoped, content-addressed store for attachment bytes, so every stage
+that reads a ticket's attachments (text extraction in fetch_ticket, OCR,
+document analysis, vision embeddings) shares one download.
+
+fetch_ticket registers the ticket's attachment URLs under its workflow run
+(see current_run_key); the workflow releases them when that run ends, so
+two runs for the same ticket never drop each other's registrations. The
+first reader of a registered URL downloads it (with its own fetch
+function), concurrent readers wait for that download, and later readers
+get the same bytes object - nothing is copied between stages. Blobs are
+keyed by SHA-256, so the same file attached twice is held once.
+
+Blobs live in memory up to settings.attachment_store_memory_mb; beyond that
+they are written to a spill file (outside the store lock) and memory-mapped.
+URLs that no open run registered are fetched straight through and not kept.
+
+    blob = get_attachment(url, fetch)   # fetch(url) -> (bytes, content_type)
+    fitz.open(stream=blob.data)         # bytes
+    Image.open(blob.open())             # zero-copy binary stream
+"""
+
+import hashlib
+import io
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER_SECONDS = 1800  # Release runs never released (crashed or abandoned)
+
+Fetch = Callable[[str], Tuple[bytes, Optional[str]]]
+
+
+class Blob:
+    """One attachment's bytes, in memory or memory-mapped from a spill file."""
+
+    def __init__(self, digest: str, content_type: Optional[str], data: Optional[bytes] = None,
+                 path: Optional[str] = None):
+        self.digest = digest
+        self.content_type = content_type
+        self.path = path  # Spill file (None while the blob is in memory)
+        self._data = data
+        self._mmap: Optional[mmap.mmap] = None
+        if path is not None:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(data) if data is not None else len(self._mmap)
+
+    @property
+    def spilled(self) -> bool:
+        return self.path is not None
+
+    @property
+    def data(self) -> bytes:
+        """The bytes. In memory: the stored object itself; spilled: read from the mapping."""
+        return self._data if self._data is not None else self._mmap[:]
+
+    def open(self) -> BinaryIO:
+        """Binary stream over the blob without copying it (BytesIO shares the bytes buffer)."""
+        if self._data is not None:
+            return io.BytesIO(self._data)
+        with open(self.path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """
+        Unmap and delete the spill file once no run references the blob.
+        Streams from open() keep working (their own mapping outlives the file).
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class AttachmentStore:
+    """Blobs for the attachment URLs of open workflow runs."""
+
+    def __init__(self, memory_limit_mb: int = 256):
+        self.memory_limit = memory_limit_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._runs: Dict[str, Tuple[float, Set[str]]] = {}  # run key -> (opened_at, urls)
+        self._owners: Dict[str, Set[str]] = {}  # url -> run keys that registered it
+        self._urls: Dict[str, str] = {}  # url -> digest
+        self._blobs: Dict[str, Blob] = {}  # digest -> blob
+        self._refs: Dict[str, int] = {}  # digest -> number of urls pointing at it
+        self._inflight: Dict[str, Future] = {}  # url -> download in progress
+        self._resident = 0
+        self._spill_dir: Optional[str] = None
+        self.stats = {"downloads": 0, "hits": 0, "passthrough": 0, "spilled": 0}
+
+    # -------------------------------------------------------------------------
+    # Run scope
+    # -------------------------------------------------------------------------
+
+    def open_run(self, run_key: str, urls: Iterable[str]) -> None:
+        """Register a workflow run's attachment URLs (their downloads become shared)."""
+        urls = {url for url in urls if url}
+        now = time.time()
+        with self._lock:
+            self._prune_stale_locked(now)
+            self._release_locked(run_key)
+            self._runs[run_key] = (now, urls)
+            for url in urls:
+                self._owners.setdefault(url, set()).add(run_key)
+
+    def release_run(self, run_key: str) -> None:
+        """Drop a run's URLs; blobs no open run still uses are freed."""
+        with self._lock:
+            self._release_locked(run_key)
+
+    def _release_locked(self, run_key: str) -> None:
+        entry = self._runs.pop(run_key, None)
+        if entry is None:
+            return
+        for url in entry[1]:
+            owners = self._owners.get(url)
+            if owners is None:
+                continue
+            owners.discard(run_key)
+            if owners:
+                continue
+            del self._owners[url]
+            digest = self._urls.pop(url, None)
+            if digest is not None:
+                self._unref_locked(digest)
+
+    def _unref_locked(self, digest: str) -> None:
+        self._refs[digest] -= 1
+        if self._refs[digest]:
+            return
+        del self._refs[digest]
+        blob = self._blobs.pop(digest)
+        if not blob.spilled:
+            self._resident -= blob.size
+        blob.close()
+
+    def _prune_stale_locked(self, now: float) -> None:
+        for run_key in [r for r, (opened, _) in self._runs.items() if now - opened > STALE_AFTER_SECONDS]:
+            logger.warning(f"[ATTACHMENT_STORE] Releasing stale run {run_key}")
+            self._release_locked(run_key)
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def get(self, url: str, fetch: Fetch) -> Blob:
+        """
+        Return the blob for a URL, downloading it at most once while any run holds it.
+
+        Raises whatever fetch raises; a failed download is not remembered,
+        so the next reader tries again.
+        """
+        leader = False
+        with self._lock:
+            registered = url in self._owners
+            if not registered:
+                self.stats["passthrough"] += 1
+            else:
+                digest = self._urls.get(url)
+                if digest is not None:
+                    self.stats["hits"] += 1
+                    return self._blobs[digest]
+                pending = self._inflight.get(url)
+                if pending is None:
+                    pending = self._inflight[url] = Future()
+                    leader = True
+                else:
+                    self.stats["hits"] += 1
+
+        if not registered:
+            data, content_type = fetch(url)
+            return Blob(hashlib.sha256(data).hexdigest(), content_type, data=data)
+        if not leader:
+            return pending.result()  # Another stage is downloading it right now
+
+        try:
+            data, content_type = fetch(url)
+            blob = self._add(url, data, content_type)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(url, None)
+            pending.set_exception(e)
+            raise
+        pending.set_result(blob)
+        return blob
+
+    def _add(self, url: str, data: bytes, content_type: Optional[str]) -> Blob:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.stats["downloads"] += 1
+            blob = self._register_locked(url, digest)
+            if blob is not None or url not in self._owners:
+                self._inflight.pop(url, None)
+                return blob or Blob(digest, content_type, data=data)  # Unregistered: run released meanwhile
+            if not data or self._resident + len(data) <= self.memory_limit:
+                blob = self._blobs[digest] = Blob(digest, content_type, data=data)
+                self._resident += blob.size
+                self._inflight.pop(url, None)
+                return self._register_locked(url, digest)
+            spill_dir = self._spill_dir_locked()
+
+        # Large write: keep every other reader of the store running meanwhile
+        spilled = Blob(digest, content_type, path=self._spill(spill_dir, digest, data))
+        with self._lock:
+            self._inflight.pop(url, None)
+            blob = self._register_locked(url, digest)  # Same bytes spilled by another URL meanwhile?
+            if blob is not None or url not in self._owners:
+                spilled.close()
+                return blob or Blob(digest, content_type, data=data)
+            self._blobs[digest] = spilled
+            self.stats["spilled"] += 1
+            return self._register_locked(url, digest)
+
+    def _register_locked(self, url: str, digest: str) -> Optional[Blob]:
+        """Point a registered URL at an existing blob. None if the blob is not stored yet (or url is unregistered)."""
+        blob = self._blobs.get(digest)
+        if blob is None or url not in self._owners:
+            return None
+        if self._urls.get(url) != digest:
+            self._urls[url] = digest
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+        return blob
+
+    def _spill_dir_locked(self) -> str:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="attachments_")
+        return self._spill_dir
+
+    @staticmethod
+    def _spill(spill_dir: str, digest: str, data: bytes) -> str:
+        fd, path = tempfile.mkstemp(prefix=f"{digest[:16]}-", dir=spill_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return path
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "runs": len(self._runs),
+                "blobs": len(self._blobs),
+                "resident_bytes": self._resident,
+                "spilled_bytes": sum(b.size for b in self._blobs.values() if b.spilled),
+                "memory_limit_bytes": self.memory_limit,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            for run_key in list(self._runs):
+                self._release_locked(run_key)
+            if self._spill_dir:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+
+
+# =============================================================================
+# SINGLETON INSTANCE
+# =============================================================================
+
+_store: Optional[AttachmentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_attachment_store() -> AttachmentStore:
+    """Get the process-wide attachment store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AttachmentStore(settings.attachment_store_memory_mb)
+    return _store
+
+
+def get_attachment(url: str, fetch: Fetch) -> Blob:
+    """Blob for an attachment URL (shared download for attachments registered by an open run)."""
+    return get_attachment_store().get(url, fetch)
+
+
+def open_run_attachments(run_key: str, urls: Iterable[str]) -> None:
+    get_attachment_store().open_run(run_key, urls)
+
+
+def release_run_attachments(run_key: str) -> None:
+    get_attachment_store().release_run(run_key)
+
+
+def close_attachment_store() -> None:
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
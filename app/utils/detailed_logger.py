@@ -12,12 +12,15 @@ This logger captures:
 Logs are stored in: workflow_logs/ticket_{id}_{timestamp}.json
 
 Thread-safe implementation using thread-local storage for concurrent webhooks.
+Async workflows share the event-loop thread, so they bind a per-run key with
+bind_workflow_log_key() that takes precedence over the thread id.
 """
 
 import logging
 import json
 import time
 import threading
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
@@ -26,9 +29,12 @@ from dataclasses import dataclass, field, asdict
 logger = logging.getLogger(__name__)
 
 # Thread-safe storage for concurrent workflow logs
-_workflow_logs: Dict[int, "WorkflowLog"] = {}
+_workflow_logs: Dict[Any, "WorkflowLog"] = {}
 _logs_lock = threading.Lock()
 
+# Per-run key for async workflows (copied into every node task/executor call)
+_workflow_log_key: ContextVar[Optional[str]] = ContextVar("workflow_log_key", default=None)
+
 LOG_DIR = Path("workflow_logs")
 
 
@@ -88,9 +94,18 @@ class WorkflowLog:
     metrics: Dict[str, Any] = field(default_factory=dict)
 
 
+def bind_workflow_log_key(key: str) -> None:
+    """Key workflow logs by this run instead of the current thread (async workflows)."""
+    _workflow_log_key.set(key)
+
+
+def _log_key() -> Any:
+    return _workflow_log_key.get() or threading.get_ident()
+
+
 def start_workflow_log(ticket_id: str) -> WorkflowLog:
     """Initialize a new workflow log for a ticket (thread-safe)"""
-    thread_id = threading.get_ident()
+    thread_id = _log_key()
     
     with _logs_lock:
         log = WorkflowLog(
@@ -104,14 +119,14 @@ def start_workflow_log(ticket_id: str) -> WorkflowLog:
 
 def get_current_log() -> Optional[WorkflowLog]:
     """Get the current workflow log for this thread"""
-    thread_id = threading.get_ident()
+    thread_id = _log_key()
     with _logs_lock:
         return _workflow_logs.get(thread_id)
 
 
 def log_node_start(node_name: str, input_summary: Dict[str, Any] = None) -> NodeExecution:
     """Log the start of a node execution (thread-safe)"""
-    thread_id = threading.get_ident()
+    thread_id = _log_key()
     
     node = NodeExecution(
         node_name=node_name,
@@ -240,7 +255,7 @@ def complete_workflow_log(
     metrics: Dict[str, Any] = None
 ):
     """Complete the workflow log and save to file (thread-safe)"""
-    thread_id = threading.get_ident()
+    thread_id = _log_key()
     
     with _logs_lock:
         if thread_id not in _workflow_logs:
@@ -361,7 +376,7 @@ def _save_workflow_log_to_file(log: WorkflowLog) -> Path:
 
 def get_node_summary() -> str:
     """Get a summary of all nodes executed in current workflow (thread-safe)"""
-    thread_id = threading.get_ident()
+    thread_id = _log_key()
     current_log = _workflow_logs.get(thread_id)
     
     if not current_log:
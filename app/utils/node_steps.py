@@ -0,0 +1,111 @@
+"""
+Node Step Drivers
+Lets one node implementation serve both graph.invoke and graph.ainvoke.
+
+A node body is written as a generator that yields StepCall requests for
+blocking I/O (Gemini, Freshdesk, other blocking work) and receives each
+result back at the yield:
+
+    def _my_node_steps(state):
+        response = yield llm_call(system_prompt=..., user_prompt=...)
+        return {"field": response}
+
+    def my_node(state):                 # sync graph
+        return run_steps(_my_node_steps(state))
+
+    async def amy_node(state):          # async graph
+        return await arun_steps(_my_node_steps(state))
+
+The sync driver makes the same blocking calls the node made before. The
+async driver awaits native async clients (Gemini aio, httpx) and pushes
+work without an async client onto the default thread pool.
+
+Errors raised by a call are thrown back into the generator at the yield,
+so the node's existing try/except blocks keep working unchanged.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generator, Tuple
+
+logger = logging.getLogger(__name__)
+
+CALL_LLM = "llm"
+CALL_FRESHDESK = "freshdesk"
+CALL_BLOCKING = "blocking"
+
+
+@dataclass
+class StepCall:
+    """A blocking call requested by a node step generator."""
+    kind: str
+    target: Any = None  # Freshdesk method name or callable
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+NodeSteps = Generator[StepCall, Any, Dict[str, Any]]
+
+
+def llm_call(**kwargs) -> StepCall:
+    """Request LLMClient.call_llm(**kwargs)."""
+    return StepCall(CALL_LLM, kwargs=kwargs)
+
+
+def freshdesk_call(method: str, *args, **kwargs) -> StepCall:
+    """Request FreshdeskClient.<method>(*args, **kwargs)."""
+    return StepCall(CALL_FRESHDESK, method, args, kwargs)
+
+
+def blocking_call(fn: Callable[..., Any], *args, **kwargs) -> StepCall:
+    """Request fn(*args, **kwargs) for work that has no async client."""
+    return StepCall(CALL_BLOCKING, fn, args, kwargs)
+
+
+def _execute(call: StepCall) -> Any:
+    if call.kind == CALL_LLM:
+        from app.clients.llm_client import get_llm_client
+        return get_llm_client().call_llm(**call.kwargs)
+    if call.kind == CALL_FRESHDESK:
+        from app.clients.freshdesk_client import get_freshdesk_client
+        return getattr(get_freshdesk_client(), call.target)(*call.args, **call.kwargs)
+    return call.target(*call.args, **call.kwargs)
+
+
+async def _aexecute(call: StepCall) -> Any:
+    if call.kind == CALL_LLM:
+        from app.clients.llm_client import get_llm_client
+        return await get_llm_client().acall_llm(**call.kwargs)
+    if call.kind == CALL_FRESHDESK:
+        from app.clients.freshdesk_client import get_freshdesk_client
+        return await getattr(get_freshdesk_client(), f"a{call.target}")(*call.args, **call.kwargs)
+    return await asyncio.to_thread(call.target, *call.args, **call.kwargs)
+
+
+def run_steps(steps: NodeSteps) -> Dict[str, Any]:
+    """Drive a node step generator with blocking calls."""
+    result, error = None, None
+    while True:
+        try:
+            call = steps.throw(error) if error is not None else steps.send(result)
+        except StopIteration as done:
+            return done.value
+        try:
+            result, error = _execute(call), None
+        except Exception as e:
+            result, error = None, e
+
+
+async def arun_steps(steps: NodeSteps) -> Dict[str, Any]:
+    """Drive a node step generator on the event loop."""
+    result, error = None, None
+    while True:
+        try:
+            call = steps.throw(error) if error is not None else steps.send(result)
+        except StopIteration as done:
+            return done.value
+        try:
+            result, error = await _aexecute(call), None
+        except Exception as e:
+            result, error = None, e
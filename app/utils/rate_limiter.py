@@ -0,0 +1,272 @@
+"""
+Gemini Rate Limiter
+Shared per-model RPM / TPM token buckets and an in-flight cap for every
+Gemini call in the process (LLMClient, GeminiClient file search, image and
+document analyzers, text embeddings).
+
+Buckets are reservation based: a caller takes its request and estimated
+tokens immediately - the bucket may go into debt - and sleeps until the
+debt it joined behind is repaid. Callers are therefore served in arrival
+order and spread across the minute, instead of all firing at once, hitting
+429 and sleeping in tenacity backoff together.
+
+Estimated tokens are corrected with the response's usage metadata, so a
+poor estimate only affects the next few calls.
+
+    with gemini_slot(model, estimate_tokens(prompt)) as slot:
+        response = client.models.generate_content(...)
+        slot.record(response)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Gemini bills a fixed number of tokens per image / PDF page
+TOKENS_PER_IMAGE = 258
+CHARS_PER_TOKEN = 4
+
+# Async callers poll the (thread-shared) in-flight cap with this backoff
+ASYNC_POLL_MIN_SECONDS = 0.005
+ASYNC_POLL_MAX_SECONDS = 0.05
+
+# Built-in per-model limits (rpm, tpm); GEMINI_MODEL_LIMITS overrides these
+DEFAULT_MODEL_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gemini-2.5-flash": (1000, 1_000_000),
+    "gemini-2.5-pro": (150, 2_000_000),
+    "text-embedding-004": (1500, 1_000_000),
+}
+
+
+def estimate_tokens(text: Any = "", images: int = 0) -> int:
+    """Rough input token count: ~4 chars per token plus a flat cost per image/page."""
+    return max(1, len(str(text or "")) // CHARS_PER_TOKEN + images * TOKENS_PER_IMAGE)
+
+
+class _ModelBucket:
+    """RPM and TPM buckets plus in-flight cap for one model."""
+
+    def __init__(self, model: str, rpm: int, tpm: int, max_concurrent: int):
+        self.model = model
+        self.rpm = max(1, rpm)
+        self.tpm = max(1, tpm)
+        self.requests = float(self.rpm)
+        self.tokens = float(self.tpm)
+        self.updated_at = time.monotonic()
+        self.in_flight = threading.BoundedSemaphore(max(1, max_concurrent))
+
+        self.calls = 0
+        self.waited_calls = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+        self.estimated_tokens = 0
+        self.token_correction = 0  # Sum of (actual - estimated)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60.0)
+        self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60.0)
+
+    def reserve(self, tokens: int) -> float:
+        """Take one request and `tokens` tokens. Returns seconds to wait."""
+        now = time.monotonic()
+        self._refill(now)
+        self.requests -= 1
+        self.tokens -= min(tokens, self.tpm)
+        self.calls += 1
+        self.estimated_tokens += tokens
+        return max(0.0, -self.requests * 60.0 / self.rpm, -self.tokens * 60.0 / self.tpm)
+
+    def adjust(self, delta_tokens: int) -> None:
+        """Correct the token bucket once the real usage is known."""
+        self.tokens = min(self.tpm, self.tokens - delta_tokens)
+        self.token_correction += delta_tokens
+
+
+class Reservation:
+    """A granted slot; call record(response) to report real token usage."""
+
+    def __init__(self, limiter: "GeminiRateLimiter", model: str, estimated_tokens: int, waited: float):
+        self.limiter = limiter
+        self.model = model
+        self.estimated_tokens = estimated_tokens
+        self.waited = waited
+
+    def record(self, response: Any) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        actual = getattr(usage, "prompt_token_count", None) if usage else None
+        if isinstance(actual, int):
+            self.limiter._reconcile(self.model, self.estimated_tokens, actual)
+
+
+class GeminiRateLimiter:
+    """Process-wide limiter shared by sync and async Gemini callers."""
+
+    def __init__(
+        self,
+        default_rpm: int,
+        default_tpm: int,
+        max_concurrent: int,
+        model_limits: Optional[Dict[str, Dict[str, int]]] = None,
+    ):
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.max_concurrent = max_concurrent
+        self.model_limits = {m: {"rpm": r, "tpm": t} for m, (r, t) in DEFAULT_MODEL_LIMITS.items()}
+        for model, limits in (model_limits or {}).items():
+            # Merge per key: overriding only "rpm" keeps the built-in "tpm"
+            self.model_limits.setdefault(model, {}).update(limits)
+
+        self._buckets: Dict[str, _ModelBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, model: str) -> _ModelBucket:
+        bucket = self._buckets.get(model)
+        if bucket is None:
+            limits = self.model_limits.get(model, {})
+            bucket = _ModelBucket(
+                model,
+                rpm=limits.get("rpm", self.default_rpm),
+                tpm=limits.get("tpm", self.default_tpm),
+                max_concurrent=limits.get("max_concurrent", self.max_concurrent),
+            )
+            self._buckets[model] = bucket
+        return bucket
+
+    def _reserve(self, model: str, tokens: int) -> Tuple[_ModelBucket, float]:
+        with self._lock:
+            bucket = self._bucket(model)
+            return bucket, bucket.reserve(tokens)
+
+    def _record_wait(self, bucket: _ModelBucket, waited: float) -> None:
+        if waited <= 0.001:
+            return
+        with self._lock:
+            bucket.waited_calls += 1
+            bucket.wait_seconds_total += waited
+            bucket.max_wait_seconds = max(bucket.max_wait_seconds, waited)
+        if waited >= 1.0:
+            logger.info(f"[RATE_LIMIT] {bucket.model}: waited {waited:.2f}s for a slot")
+
+    def _reconcile(self, model: str, estimated: int, actual: int) -> None:
+        with self._lock:
+            self._bucket(model).adjust(actual - estimated)
+
+    @contextmanager
+    def slot(self, model: str, estimated_tokens: int) -> Iterator[Reservation]:
+        """Block until the model has budget and a free in-flight slot."""
+        start = time.monotonic()
+        bucket, delay = self._reserve(model, estimated_tokens)
+        if delay > 0:
+            time.sleep(delay)
+        bucket.in_flight.acquire()
+        try:
+            waited = time.monotonic() - start
+            self._record_wait(bucket, waited)
+            yield Reservation(self, model, estimated_tokens, waited)
+        finally:
+            bucket.in_flight.release()
+
+    @asynccontextmanager
+    async def aslot(self, model: str, estimated_tokens: int):
+        """Async variant of slot(); waits without blocking the event loop."""
+        start = time.monotonic()
+        bucket, delay = self._reserve(model, estimated_tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # The cap is shared with sync callers in worker threads, so poll it
+        # instead of parking an executor thread per waiting coroutine
+        backoff = ASYNC_POLL_MIN_SECONDS
+        while not bucket.in_flight.acquire(blocking=False):
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, ASYNC_POLL_MAX_SECONDS)
+        try:
+            waited = time.monotonic() - start
+            self._record_wait(bucket, waited)
+            yield Reservation(self, model, estimated_tokens, waited)
+        finally:
+            bucket.in_flight.release()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-model call counts, limiter wait time and remaining budget."""
+        with self._lock:
+            now = time.monotonic()
+            models = {}
+            for model, bucket in self._buckets.items():
+                bucket._refill(now)
+                models[model] = {
+                    "rpm_limit": bucket.rpm,
+                    "tpm_limit": bucket.tpm,
+                    "requests_available": round(bucket.requests, 1),
+                    "tokens_available": int(bucket.tokens),
+                    "calls": bucket.calls,
+                    "waited_calls": bucket.waited_calls,
+                    "wait_seconds_total": round(bucket.wait_seconds_total, 3),
+                    "avg_wait_ms": round(bucket.wait_seconds_total / bucket.calls * 1000, 1) if bucket.calls else 0.0,
+                    "max_wait_ms": round(bucket.max_wait_seconds * 1000, 1),
+                    "estimated_tokens": bucket.estimated_tokens,
+                    "token_correction": bucket.token_correction,
+                }
+        return {"enabled": True, "models": models}
+
+
+# =============================================================================
+# SINGLETON INSTANCE AND PUBLIC API
+# =============================================================================
+
+_limiter: Optional[GeminiRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_gemini_limiter() -> Optional[GeminiRateLimiter]:
+    """Get the global Gemini limiter (None when gemini_rate_limit_enabled is off)."""
+    global _limiter
+    if not settings.gemini_rate_limit_enabled:
+        return None
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = GeminiRateLimiter(
+                    default_rpm=settings.gemini_default_rpm,
+                    default_tpm=settings.gemini_default_tpm,
+                    max_concurrent=settings.gemini_max_concurrent,
+                    model_limits=settings.gemini_model_limits,
+                )
+    return _limiter
+
+
+class _NoLimit:
+    """Stand-in reservation when limiting is disabled."""
+
+    def record(self, response: Any) -> None:
+        pass
+
+
+@contextmanager
+def gemini_slot(model: str, estimated_tokens: int) -> Iterator[Any]:
+    """Acquire a rate-limited slot for one Gemini call."""
+    limiter = get_gemini_limiter()
+    if limiter is None:
+        yield _NoLimit()
+        return
+    with limiter.slot(model, estimated_tokens) as reservation:
+        yield reservation
+
+
+@asynccontextmanager
+async def agemini_slot(model: str, estimated_tokens: int):
+    """Async variant of gemini_slot()."""
+    limiter = get_gemini_limiter()
+    if limiter is None:
+        yield _NoLimit()
+        return
+    async with limiter.aslot(model, estimated_tokens) as reservation:
+        yield reservation
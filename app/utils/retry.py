@@ -16,6 +16,7 @@ from tenacity import (
     before_sleep_log,
     after_log,
 )
+import httpx
 import requests
 from urllib3.exceptions import SSLError as Urllib3SSLError
 from requests.exceptions import SSLError as RequestsSSLError
@@ -36,6 +37,16 @@ TRANSIENT_EXCEPTIONS: Tuple[Type[Exception], ...] = (
 )
 
 
+# Transient transport errors for the async (httpx) clients
+ASYNC_TRANSIENT_EXCEPTIONS: Tuple[Type[Exception], ...] = (
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError,
+    ConnectionResetError,
+    TimeoutError,
+)
+
+
 def is_gemini_transient_error(exception: Exception) -> bool:
     """Check if exception is a transient Gemini API error (503, 429, overloaded, etc.)"""
     error_str = str(exception).lower()
@@ -80,6 +91,13 @@ retry_api_call = create_retry_decorator(
     max_wait=10,
 )
 
+retry_async_api_call = create_retry_decorator(
+    max_attempts=3,
+    min_wait=1,
+    max_wait=10,
+    exceptions=ASYNC_TRANSIENT_EXCEPTIONS,
+)
+
 retry_external_service = create_retry_decorator(
     max_attempts=3,
     min_wait=2,